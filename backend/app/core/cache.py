@@ -0,0 +1,250 @@
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.local_cache import LocalTTLCache
+from app.core.redis_cache import redis_cache
+
+logger = logging.getLogger(__name__)
+
+
+class TwoTierCache:
+    """
+    In-process LRU/TTL tier in front of Redis for service read paths.
+
+    Every entry remembers the version of each tag it depends on.
+    Invalidating a tag bumps its version in Redis and publishes the tag on
+    a pub/sub channel so every worker forgets its local copies at once;
+    entries carrying an old version are treated as misses. Concurrent
+    misses for one key in a process share a single load.
+    """
+
+    def __init__(
+        self,
+        local_maxsize: int,
+        local_ttl_seconds: float,
+        default_ttl_seconds: int,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.default_ttl = default_ttl_seconds
+        self.local = LocalTTLCache(local_maxsize, local_ttl_seconds)
+
+        self.tags_key = f"{settings.REDIS_KEY_PREFIX}:cache:tags"
+        self.channel = f"{settings.REDIS_KEY_PREFIX}:cache:invalidate"
+
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, list] = {}
+        self._tag_versions: Dict[str, int] = {}
+
+        self._listener: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    # ========== Tag versions ==========
+
+    def _current_versions(self, tags: List[str]) -> Dict[str, int]:
+        """Tag versions as this worker knows them; unknown tags are read from Redis"""
+        # The invalidation listener drops tags from another thread, so the
+        # shared dict is only read under the lock
+        with self._lock:
+            versions = {t: self._tag_versions[t] for t in tags if t in self._tag_versions}
+        missing = [t for t in tags if t not in versions]
+        if missing:
+            try:
+                values = redis_cache.redis_client.hmget(self.tags_key, missing)
+            except Exception as e:
+                logger.error(f"Error reading cache tag versions: {e}")
+                values = [None] * len(missing)
+            with self._lock:
+                for tag, value in zip(missing, values):
+                    versions[tag] = self._tag_versions.setdefault(tag, int(value or 0))
+        return versions
+
+    def _is_fresh(self, entry: dict) -> bool:
+        versions = entry.get("t", {})
+        return versions == self._current_versions(list(versions))
+
+    def invalidate_tags(self, *tags: str):
+        """Bump tag versions and tell every worker to drop dependent entries"""
+        if not self.enabled or not tags:
+            return
+
+        try:
+            pipe = redis_cache.redis_client.pipeline()
+            for tag in tags:
+                pipe.hincrby(self.tags_key, tag, 1)
+            pipe.publish(self.channel, json.dumps(list(tags)))
+            versions = pipe.execute()[:len(tags)]
+        except Exception as e:
+            logger.error(f"Error invalidating cache tags {tags}: {e}")
+            # Keep this worker consistent; others fall back to local TTL
+            versions = [self._tag_versions.get(t, 0) + 1 for t in tags]
+
+        self._apply_versions(dict(zip(tags, versions)))
+
+    def _apply_versions(self, versions: Dict[str, Optional[int]]):
+        with self._lock:
+            for tag, version in versions.items():
+                if version is None:
+                    self._tag_versions.pop(tag, None)
+                elif version > self._tag_versions.get(tag, -1):
+                    self._tag_versions[tag] = version
+
+    # ========== Read / write ==========
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.local.get(key)
+        if entry is not None and self._is_fresh(entry):
+            return entry["v"]
+
+        entry = redis_cache.get(key)
+        if entry is not None and self._is_fresh(entry):
+            self.local.set(key, entry)
+            return entry["v"]
+        return None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None,
+            versions: Optional[Dict[str, int]] = None):
+        entry = {"v": value, "t": versions or {}}
+        self.local.set(key, entry)
+        redis_cache.set(key, entry, ttl_seconds=ttl_seconds or self.default_ttl)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any],
+                    ttl_seconds: Optional[int] = None, tags: Iterable[str] = ()) -> Any:
+        if not self.enabled:
+            return loader()
+
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._key_lock(key):
+            # Another thread may have filled it while we waited
+            value = self.get(key)
+            if value is not None:
+                return value
+
+            # Versions are taken before loading so a concurrent write marks the result stale
+            versions = self._current_versions(list(tags))
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl_seconds, versions)
+            return value
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        with self._lock:
+            slot = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    self._key_locks.pop(key, None)
+
+    def clear_local(self):
+        self.local.clear()
+        with self._lock:
+            self._tag_versions.clear()
+
+    # ========== Cross-worker invalidation ==========
+
+    def start_listener(self):
+        if not self.enabled or (self._listener and self._listener.is_alive()):
+            return
+        self._stopping.clear()
+        self._listener = threading.Thread(
+            target=self._listen, name="cache-invalidation", daemon=True)
+        self._listener.start()
+
+    def stop_listener(self, timeout: float = 5.0):
+        self._stopping.set()
+        if self._listener:
+            self._listener.join(timeout)
+            self._listener = None
+
+    def _listen(self):
+        while not self._stopping.is_set():
+            pubsub = None
+            try:
+                pubsub = redis_cache.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Versions may have moved while we were not subscribed
+                self.clear_local()
+                while not self._stopping.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        self._on_invalidate(json.loads(message["data"]))
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error: {e}")
+                self._stopping.wait(1.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def _on_invalidate(self, tags: List[str]):
+        # Forget the local version so the next read fetches the new one from Redis
+        self._apply_versions({tag: None for tag in tags})
+
+
+cache = TwoTierCache(
+    local_maxsize=settings.CACHE_LOCAL_MAXSIZE,
+    local_ttl_seconds=settings.CACHE_LOCAL_TTL_SECONDS,
+    default_ttl_seconds=settings.CACHE_DEFAULT_TTL_SECONDS,
+    enabled=settings.CACHE_ENABLED
+)
+
+
+def cached(key: str, ttl: Optional[int] = None, tags: Iterable[str] = ()):
+    """
+    Cache a service method's JSON-able result.
+
+    `key` and `tags` are format templates over the method's arguments
+    (the `db` session is ignored), e.g.
+    @cached(key="categories:tree:{include_inactive}", tags=["categories"]).
+    Place it under @staticmethod.
+    """
+    tags = list(tags)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not cache.enabled:
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k != "db"}
+
+            return cache.get_or_load(
+                key.format(**arguments),
+                lambda: jsonable_encoder(func(*args, **kwargs)),
+                ttl_seconds=ttl,
+                tags=[tag.format(**arguments) for tag in tags]
+            )
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def invalidate(*tags: str):
+    """Drop every cached result depending on any of the tags (call after commit)"""
+    cache.invalidate_tags(*tags)
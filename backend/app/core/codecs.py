@@ -0,0 +1,129 @@
+"""
+Value codecs for RedisCache.
+
+New entries are written as MAGIC + format byte + payload, where the
+format byte packs the codec id (high nibble) and the compression id (low
+nibble). MAGIC (0xC1) never occurs in UTF-8, so entries written by the
+old plain-JSON cache are recognised by its absence and still decode.
+"""
+import json
+import logging
+import zlib
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0xC1
+
+
+class Codec(NamedTuple):
+    id: int
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+class Compressor(NamedTuple):
+    id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+CODECS: Dict[str, Codec] = {
+    "json": Codec(
+        1, "json",
+        lambda v: json.dumps(v, ensure_ascii=False, separators=(",", ":")).encode(),
+        json.loads
+    ),
+}
+if orjson is not None:
+    CODECS["orjson"] = Codec(
+        2, "orjson",
+        # json.dumps accepted non-str keys too
+        lambda v: orjson.dumps(v, option=orjson.OPT_NON_STR_KEYS),
+        orjson.loads
+    )
+if msgpack is not None:
+    CODECS["msgpack"] = Codec(
+        3, "msgpack",
+        lambda v: msgpack.packb(v, use_bin_type=True),
+        lambda b: msgpack.unpackb(b, raw=False)
+    )
+
+COMPRESSORS: Dict[str, Compressor] = {
+    "none": Compressor(0, "none", lambda b: b, lambda b: b),
+    "zlib": Compressor(1, "zlib", lambda b: zlib.compress(b, 6), zlib.decompress),
+}
+if zstandard is not None:
+    _zstd_c = zstandard.ZstdCompressor(level=3)
+    _zstd_d = zstandard.ZstdDecompressor()
+    COMPRESSORS["zstd"] = Compressor(
+        2, "zstd", _zstd_c.compress, _zstd_d.decompress)
+if lz4_frame is not None:
+    COMPRESSORS["lz4"] = Compressor(
+        3, "lz4", lz4_frame.compress, lz4_frame.decompress)
+
+_CODECS_BY_ID = {c.id: c for c in CODECS.values()}
+_COMPRESSORS_BY_ID = {c.id: c for c in COMPRESSORS.values()}
+
+
+def _pick(registry: dict, name: str, fallback: str, kind: str):
+    if name in registry:
+        return registry[name]
+    logger.warning(f"Cache {kind} '{name}' is not installed, falling back to '{fallback}'")
+    return registry[fallback]
+
+
+class ValueSerializer:
+    """Encode with the configured codec; decode whatever format an entry was written in"""
+
+    def __init__(self, codec: str = "orjson", compression: str = "zstd", compress_min_bytes: int = 1024):
+        self.codec = _pick(CODECS, codec, "json", "codec")
+        self.compressor = _pick(COMPRESSORS, compression, "zlib", "compression")
+        self.compress_min_bytes = compress_min_bytes
+
+    def dumps(self, value: Any) -> bytes:
+        payload = self.codec.dumps(value)
+        compressor = COMPRESSORS["none"]
+        if len(payload) >= self.compress_min_bytes and self.compressor.id:
+            compressed = self.compressor.compress(payload)
+            # Small or already-dense payloads can grow; keep the raw bytes then
+            if len(compressed) < len(payload):
+                payload, compressor = compressed, self.compressor
+        return bytes((MAGIC, self.codec.id << 4 | compressor.id)) + payload
+
+    def loads(self, data: Optional[bytes]) -> Any:
+        if data is None:
+            return None
+        if isinstance(data, str):
+            data = data.encode()
+        if len(data) < 2 or data[0] != MAGIC:
+            # Legacy plain-JSON entry
+            return json.loads(data)
+
+        codec = _CODECS_BY_ID.get(data[1] >> 4)
+        compressor = _COMPRESSORS_BY_ID.get(data[1] & 0x0F)
+        if codec is None or compressor is None:
+            raise ValueError(f"Unsupported cache format byte {data[1]:#04x}")
+        return codec.loads(compressor.decompress(data[2:]))
@@ -54,6 +54,24 @@ class Settings(BaseSettings):
     ELASTIC_ACCOUNT: str
     ELASTIC_URL: str
     PRODUCT_DOCUMENT_INDEX: str
+    ES_ASYNC_POOL_MAXSIZE: int = 50
+    ES_SEARCH_TIMEOUT_SECONDS: float = 5.0
+    ES_FACET_SIZE: int = 20
+    ES_PRICE_HISTOGRAM_INTERVAL: float = 100000
+    ES_PIT_KEEP_ALIVE: str = "1m"
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_TTL_SECONDS: int = 60
+    SEARCH_CACHE_LOCAL_MAXSIZE: int = 512
+    SEARCH_CACHE_LOCAL_TTL_SECONDS: float = 10
+    SEARCH_CACHE_GENERATION_TTL_SECONDS: float = 1
+    ES_BULK_BATCH_SIZE: int = 500
+    ES_BULK_CONCURRENCY: int = 4
+    # incremental | full | off
+    ES_STARTUP_SYNC_MODE: str = "incremental"
+    ES_SYNC_FLUSH_INTERVAL_MS: int = 500
+    ES_SYNC_MAX_BATCH: int = 200
+    ES_SYNC_MAX_RETRIES: int = 5
+    ES_SYNC_RETRY_BACKOFF_MS: int = 1000
 
     # MCP
     MCP_SERVER_URL: str
@@ -84,6 +102,29 @@ class Settings(BaseSettings):
     REDIS_SOCKET_CONNECT_TIMEOUT: int
     REDIS_KEY_PREFIX: str
     REDIS_KEY_TTL: int
+    CACHE_ENABLED: bool = True
+    CACHE_LOCAL_MAXSIZE: int = 1024
+    CACHE_LOCAL_TTL_SECONDS: float = 30
+    CACHE_DEFAULT_TTL_SECONDS: int = 300
+    # json | orjson | msgpack
+    CACHE_CODEC: str = "orjson"
+    # none | zlib | zstd | lz4
+    CACHE_COMPRESSION: str = "zstd"
+    CACHE_COMPRESS_MIN_BYTES: int = 1024
+    # Auth deps: user status / role / permissions
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    # Product list totals (page mode)
+    PRODUCT_COUNT_CACHE_TTL_SECONDS: int = 60
+    # Idempotency-Key: stored responses / how long a duplicate waits before 409
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_TTL_SECONDS: int = 30
+    # Redis hot cart: idle carts expire after the TTL, changes are written
+    # to Postgres every flush interval
+    CART_STORE_ENABLED: bool = True
+    CART_STORE_TTL_SECONDS: int = 604800
+    CART_FLUSH_INTERVAL_SECONDS: float = 2
+    CART_FLUSH_BATCH: int = 200
 
     # VNPay
     VNP_TMNCODE: str
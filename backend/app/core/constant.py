@@ -1,5 +1,6 @@
 from enum import Enum
 from decimal import Decimal
+from datetime import timedelta
 
 
 class UserRole:
@@ -20,6 +21,8 @@ class OrderConstants:
     # Order number format
     ORDER_NUMBER_PREFIX = "ORD"
     ORDER_NUMBER_FORMAT = "{prefix}-{date}-{sequence:05d}"
+    # Numbers each worker takes from the sequence per round trip
+    ORDER_NUMBER_BLOCK_SIZE = 20
 
     # Limits
     MAX_ITEMS_PER_ORDER = 100
@@ -28,6 +31,11 @@ class OrderConstants:
     # Cancellable statuses
     CANCELLABLE_STATUSES = ["pending", "processing"]
 
+    # Stock held for unpaid online payments
+    STOCK_RESERVATION_TTL = timedelta(minutes=15)
+    RESERVATION_SWEEP_INTERVAL = 60  # seconds
+    RESERVATION_SWEEP_BATCH = 100
+
 # PRODUCT CONSTANTS
 
 
@@ -0,0 +1,189 @@
+import functools
+import hashlib
+import inspect
+import logging
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+import orjson
+from fastapi import Header, status
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.redis_cache import redis_cache
+from app.utils.responses import ResponseHandler
+
+logger = logging.getLogger(__name__)
+
+# Delete the claim only if it is still ours (it may have expired and been re-taken)
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Arguments that don't describe the request itself
+_IGNORED_ARGUMENTS = {"db", "background_tasks"}
+
+
+class IdempotencyStore:
+    """
+    Replays the stored response of a request already made with the same
+    Idempotency-Key.
+
+    The first request claims the key with SET NX, runs, and replaces the
+    claim with its JSON-able result; both live for ttl seconds. The claim
+    does not expire while the request runs, so a slow request is never run
+    twice. Duplicates poll for up to lock_ttl seconds, then answer 409; a
+    claim whose result could not be stored (or whose request died) keeps
+    answering 409 instead of running again. A request that raises gives
+    the key up, so the client can retry it. When Redis is unreachable at
+    claim time the request runs without the guarantee.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        lock_ttl_seconds: int,
+        poll_interval_seconds: float = 0.05,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.ttl = ttl_seconds
+        self.lock_ttl = lock_ttl_seconds
+        self.poll_interval = poll_interval_seconds
+        self.store_attempts = 3
+        self._release = None
+
+    def _key(self, scope: str, key: str) -> str:
+        return f"{settings.REDIS_KEY_PREFIX}:idempotency:{scope}:{key}"
+
+    def run(self, scope: str, key: str, fingerprint: str, func: Callable[[], Any]) -> Any:
+        full_key = self._key(scope, key)
+        claim = redis_cache.serializer.dumps(
+            {"state": "pending", "fingerprint": fingerprint, "token": uuid.uuid4().hex})
+
+        try:
+            claimed = redis_cache.redis_client.set(full_key, claim, nx=True, ex=self.ttl)
+        except Exception as e:
+            logger.error(f"Error claiming idempotency key {full_key}: {e}")
+            return func()
+
+        if not claimed:
+            return self._wait(scope, key, full_key, fingerprint, func)
+
+        try:
+            result = jsonable_encoder(func())
+        except BaseException:
+            self._give_up(full_key, claim)
+            raise
+
+        self._store(full_key, redis_cache.serializer.dumps(
+            {"state": "done", "fingerprint": fingerprint, "response": result}))
+        return result
+
+    def _store(self, full_key: str, entry: bytes):
+        """Replace the claim with the result; if that keeps failing the claim stays (409s)"""
+        for attempt in range(1, self.store_attempts + 1):
+            try:
+                redis_cache.redis_client.setex(full_key, self.ttl, entry)
+                return
+            except Exception as e:
+                logger.error(
+                    f"Error storing idempotent response {full_key} (attempt {attempt}): {e}")
+                time.sleep(self.poll_interval * attempt)
+
+    def _wait(self, scope, key, full_key, fingerprint, func):
+        deadline = time.monotonic() + self.lock_ttl
+        while True:
+            try:
+                data = redis_cache.redis_client.get(full_key)
+            except Exception as e:
+                # The first request may have gone through: don't run it again
+                logger.error(f"Error reading idempotency key {full_key}: {e}")
+                self._in_progress()
+
+            if data is None:
+                # The first request failed (or its claim expired): take over
+                return self.run(scope, key, fingerprint, func)
+
+            entry = redis_cache.serializer.loads(data)
+            if entry["fingerprint"] != fingerprint:
+                ResponseHandler.error_response(
+                    "Idempotency-Key was already used for a different request",
+                    status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            if entry["state"] == "done":
+                return entry["response"]
+            if time.monotonic() >= deadline:
+                self._in_progress()
+            time.sleep(self.poll_interval)
+
+    @staticmethod
+    def _in_progress():
+        ResponseHandler.error_response(
+            "A request with this Idempotency-Key is still being processed",
+            status.HTTP_409_CONFLICT
+        )
+
+    def _give_up(self, full_key: str, claim: bytes):
+        try:
+            if self._release is None:
+                self._release = redis_cache.redis_client.register_script(RELEASE_SCRIPT)
+            self._release(keys=[full_key], args=[claim])
+        except Exception as e:
+            logger.error(f"Error releasing idempotency key {full_key}: {e}")
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    lock_ttl_seconds=settings.IDEMPOTENCY_LOCK_TTL_SECONDS,
+    enabled=settings.IDEMPOTENCY_ENABLED
+)
+
+
+def idempotency_key_header(
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", max_length=255)
+) -> Optional[str]:
+    return idempotency_key
+
+
+def idempotent(scope: str):
+    """
+    Make a service method replay its response for a repeated Idempotency-Key.
+
+    The method is called with an extra `idempotency_key` keyword argument
+    (None runs it normally). `scope` is a format template over the method's
+    arguments that namespaces the key, e.g. "orders:create:{user_id}"; the
+    remaining arguments (except db / background_tasks) form the request
+    fingerprint. Place it under @staticmethod.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, idempotency_key: Optional[str] = None, **kwargs):
+            if not idempotency_key or not idempotency_store.enabled:
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items()
+                         if k not in _IGNORED_ARGUMENTS}
+            fingerprint = hashlib.sha256(orjson.dumps(
+                jsonable_encoder(arguments), option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+            return idempotency_store.run(
+                scope.format(**arguments),
+                idempotency_key,
+                fingerprint,
+                lambda: func(*args, **kwargs)
+            )
+
+        return wrapper
+
+    return decorator
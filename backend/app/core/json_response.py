@@ -0,0 +1,51 @@
+"""
+orjson-backed JSON responses.
+
+Routes with a response_model already serialize through pydantic's
+dump_json, which FastAPI only does while the route keeps the default
+response class, so ORJSONResponse is not the app-wide default. It is used
+where FastAPI would otherwise fall back to jsonable_encoder + json.dumps
+(exception handlers) and by schema_response(), the fast path for services
+whose output is already plain primitives shaped like the response schema.
+"""
+from decimal import Decimal
+from typing import Any, Type
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.utils.serializers import compile_projection, model_to_dict
+
+
+def _default(value: Any) -> Any:
+    """Types orjson does not serialize natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "_sa_instance_state"):
+        return model_to_dict(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def schema_response(schema: Type[BaseModel], content: Any, status_code: int = 200) -> ORJSONResponse:
+    """
+    Return content shaped like `schema` without response_model validation.
+
+    Keeps only the schema's fields (same output as the response_model would
+    give for valid data). Content that does not fit the fast path, e.g. a
+    missing required field, goes through full pydantic validation instead.
+    """
+    try:
+        body = compile_projection(schema)(content)
+    except (KeyError, TypeError, ValueError):
+        body = schema.model_validate(content).model_dump(mode="json")
+    return ORJSONResponse(body, status_code=status_code)
@@ -0,0 +1,97 @@
+import math
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+from app.core.rate_limit_config import RateLimitConfig
+
+_PERIOD_SECONDS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+
+@lru_cache(maxsize=256)
+def _parse_limit(limit_str: str) -> Tuple[int, int]:
+    count, period = limit_str.split("/")
+    return int(count), _PERIOD_SECONDS[period.lower()]
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated_at", "denied_until")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated_at = now
+        self.denied_until = 0.0
+
+
+class LocalPreLimiter:
+    """
+    Per-worker token bucket consulted before Redis.
+
+    It only ever says "no" or "maybe": a "maybe" still goes to Redis,
+    whose answer is fed back through record() so the local bucket never
+    holds more tokens than the global limit has left, and a Redis denial
+    is remembered locally until its retry_after. Floods from one client
+    are therefore rejected in-process without a Redis round trip.
+
+    Runs on the event loop thread only, so no locking.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+        self.local_denied = 0
+
+    def check(self, key: str, limit_str: str) -> Tuple[bool, Optional[int]]:
+        """(maybe_allowed, retry_after); False means reject without asking Redis"""
+        capacity, period = _parse_limit(limit_str)
+        rate = capacity / period
+        now = time.monotonic()
+        bucket_key = f"{key}|{limit_str}"
+
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = self._buckets[bucket_key] = _Bucket(capacity, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(bucket_key)
+
+        if bucket.denied_until > now:
+            self.local_denied += 1
+            return False, math.ceil(bucket.denied_until - now)
+
+        bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated_at) * rate)
+        bucket.updated_at = now
+
+        if bucket.tokens < 1:
+            self.local_denied += 1
+            return False, max(math.ceil((1 - bucket.tokens) / rate), 1)
+
+        bucket.tokens -= 1
+        return True, None
+
+    def record(self, key: str, limit_str: str, allowed: bool,
+               remaining: Optional[int], retry_after: Optional[int]):
+        """Fold Redis's authoritative answer back into the local bucket"""
+        bucket = self._buckets.get(f"{key}|{limit_str}")
+        if bucket is None:
+            return
+
+        if not allowed:
+            bucket.tokens = 0
+            if retry_after:
+                bucket.denied_until = time.monotonic() + retry_after
+        elif remaining is not None:
+            # Other workers spend the same global budget
+            bucket.tokens = min(bucket.tokens, remaining)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+local_pre_limiter = LocalPreLimiter(max_keys=RateLimitConfig.LOCAL_PRELIMIT_MAX_KEYS)
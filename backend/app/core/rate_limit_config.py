@@ -5,6 +5,14 @@ class RateLimitConfig:
     GLOBAL_RATE_LIMIT = "1000/hour"
     ERROR_MESSAGE = "Rate limit exceeded. Please try again later."
     AUTHENTICATED_MULTIPLIER = 2
+    # Tiers limited with GCRA (one value per key) instead of a sliding-window log
+    GCRA_TIERS = {RateLimitTier.RELAXED}
+    # Share of a GCRA limit that may be sent back to back; the steady rate
+    # makes up the rest, so no period admits more than the limit
+    GCRA_BURST_RATIO = 0.5
+    # Per-worker token bucket that rejects floods before they reach Redis
+    LOCAL_PRELIMIT_ENABLED = True
+    LOCAL_PRELIMIT_MAX_KEYS = 10000
 
     WHITELIST_IPS = [
         # "*",
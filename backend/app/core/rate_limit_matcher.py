@@ -0,0 +1,106 @@
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+_PARAM = "{}"
+
+
+class _Node:
+    __slots__ = ("children", "template", "limit", "has_limit", "wildcard_limit", "has_wildcard")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.template: Optional[str] = None
+        self.limit: Optional[str] = None
+        self.has_limit = False
+        self.wildcard_limit: Optional[str] = None
+        self.has_wildcard = False
+
+
+def _segments(path: str):
+    return [s for s in path.split("/") if s]
+
+
+class RouteLimitMatcher:
+    """
+    Compiled once from the app's route templates and ENDPOINT_LIMITS.
+
+    resolve(path) maps a concrete URL to its FastAPI route template
+    (/products/abc -> /products/{product_id}) and to the ENDPOINT_LIMITS
+    entry that applies: an exact entry for the template, else the deepest
+    "/prefix/*" entry. Results are memoised per path.
+    """
+
+    def __init__(self, route_paths: Iterable[str], endpoint_limits: Dict[str, Optional[str]],
+                 cache_size: int = 4096):
+        self._routes = _Node()
+        for path in route_paths:
+            node = self._routes
+            for seg in _segments(path):
+                key = _PARAM if seg.startswith("{") and seg.endswith("}") else seg
+                node = node.children.setdefault(key, _Node())
+            # First registration wins, same as Starlette's routing order
+            if node.template is None:
+                node.template = path
+
+        self._limits = _Node()
+        for endpoint, limit in endpoint_limits.items():
+            wildcard = endpoint.endswith("/*")
+            node = self._limits
+            for seg in _segments(endpoint[:-2] if wildcard else endpoint):
+                node = node.children.setdefault(seg, _Node())
+            if wildcard:
+                node.wildcard_limit, node.has_wildcard = limit, True
+            else:
+                node.limit, node.has_limit = limit, True
+
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _match_template(self, segments) -> Optional[str]:
+        def walk(node: _Node, i: int) -> Optional[str]:
+            if i == len(segments):
+                return node.template
+            static = node.children.get(segments[i])
+            if static is not None:
+                found = walk(static, i + 1)
+                if found is not None:
+                    return found
+            param = node.children.get(_PARAM)
+            if param is not None:
+                return walk(param, i + 1)
+            return None
+
+        return walk(self._routes, 0)
+
+    def _match_limit(self, path: str) -> Tuple[bool, Optional[str]]:
+        node = self._limits
+        found, limit = False, None
+        if node.has_wildcard:
+            found, limit = True, node.wildcard_limit
+
+        for seg in _segments(path):
+            node = node.children.get(seg)
+            if node is None:
+                return found, limit
+            if node.has_wildcard:
+                found, limit = True, node.wildcard_limit
+
+        if node.has_limit:
+            return True, node.limit
+        return found, limit
+
+    def _resolve(self, path: str) -> Tuple[str, bool, Optional[str]]:
+        """path -> (route template or the raw path, has endpoint limit, limit)"""
+        template = self._match_template(_segments(path)) or path
+        has_limit, limit = self._match_limit(template)
+        if not has_limit and template != path:
+            # ENDPOINT_LIMITS may spell out a concrete path
+            has_limit, limit = self._match_limit(path)
+        return template, has_limit, limit
+
+
+def scale_limit(limit: str, multiplier: float) -> str:
+    """'30/minute' x 2 -> '60/minute'"""
+    if multiplier == 1:
+        return limit
+    count, period = limit.split("/")
+    return f"{max(int(int(count) * multiplier), 1)}/{period}"
@@ -1,9 +1,10 @@
 import redis
 from redis.connection import ConnectionPool
-import json
 import logging
 from typing import Any, Optional
 from app.core.config import settings
+from app.core.codecs import ValueSerializer
+from app.core.redis_client import get_async_redis
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +13,11 @@ class RedisCache:
     def __init__(self):
         self.pool = None
         self.redis_client = None
+        self.serializer = ValueSerializer(
+            codec=settings.CACHE_CODEC,
+            compression=settings.CACHE_COMPRESSION,
+            compress_min_bytes=settings.CACHE_COMPRESS_MIN_BYTES
+        )
         self._connect()
 
     def _connect(self):
@@ -19,7 +25,8 @@ class RedisCache:
             self.pool = ConnectionPool.from_url(
                 settings.redis_url,
                 max_connections=settings.REDIS_MAX_CONNECTIONS,
-                decode_responses=True
+                # Values are binary (codec prefix + payload)
+                decode_responses=False
             )
             self.redis_client = redis.Redis(connection_pool=self.pool)
             logger.info("Redis Cache connected successfully")
@@ -28,24 +35,24 @@ class RedisCache:
             raise
 
     def get(self, key: str) -> Optional[dict]:
-        """Lấy dữ liệu từ Redis và tự động parse JSON"""
+        """Lấy dữ liệu từ Redis và tự động decode (orjson/msgpack, JSON cũ)"""
         try:
             full_key = f"{settings.REDIS_KEY_PREFIX}:cache:{key}"
             data = self.redis_client.get(full_key)
             if data:
-                return json.loads(data)
+                return self.serializer.loads(data)
             return None
         except Exception as e:
             logger.error(f"Error getting cache for {key}: {e}")
             return None
 
     def set(self, key: str, value: Any, ttl_seconds: int = 86400):
-        """Lưu dữ liệu vào Redis dưới dạng JSON, mặc định sống 24h"""
+        """Lưu dữ liệu vào Redis theo codec cấu hình, mặc định sống 24h"""
         try:
             full_key = f"{settings.REDIS_KEY_PREFIX}:cache:{key}"
-            # Chuyển dict/list thành chuỗi JSON trước khi lưu
-            json_value = json.dumps(value)
-            self.redis_client.setex(full_key, ttl_seconds, json_value)
+            # Encode + nén nếu payload lớn hơn ngưỡng
+            data = self.serializer.dumps(value)
+            self.redis_client.setex(full_key, ttl_seconds, data)
         except Exception as e:
             logger.error(f"Error setting cache for {key}: {e}")
 
@@ -58,5 +65,42 @@ class RedisCache:
         except Exception as e:
             logger.error(f"Error deleting cache for {key}: {e}")
 
+    def incr(self, key: str) -> Optional[int]:
+        """Tăng counter (generation, version...), trả về giá trị mới"""
+        try:
+            full_key = f"{settings.REDIS_KEY_PREFIX}:cache:{key}"
+            return self.redis_client.incr(full_key)
+        except Exception as e:
+            logger.error(f"Error incrementing cache counter {key}: {e}")
+            return None
+
+    # ========== Async (dùng trong request path async) ==========
+
+    async def aget(self, key: str) -> Optional[Any]:
+        try:
+            full_key = f"{settings.REDIS_KEY_PREFIX}:cache:{key}"
+            data = await get_async_redis(decode_responses=False).get(full_key)
+            if data:
+                return self.serializer.loads(data)
+            return None
+        except Exception as e:
+            logger.error(f"Error getting cache for {key}: {e}")
+            return None
+
+    async def aset(self, key: str, value: Any, ttl_seconds: int = 86400):
+        try:
+            full_key = f"{settings.REDIS_KEY_PREFIX}:cache:{key}"
+            data = self.serializer.dumps(value)
+            await get_async_redis(decode_responses=False).setex(full_key, ttl_seconds, data)
+        except Exception as e:
+            logger.error(f"Error setting cache for {key}: {e}")
+
+    async def adelete(self, key: str):
+        try:
+            full_key = f"{settings.REDIS_KEY_PREFIX}:cache:{key}"
+            await get_async_redis(decode_responses=False).delete(full_key)
+        except Exception as e:
+            logger.error(f"Error deleting cache for {key}: {e}")
+
 
 redis_cache = RedisCache()
@@ -0,0 +1,43 @@
+import asyncio
+import logging
+import weakref
+from typing import Dict
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# asyncio connections are bound to the loop that opened them, so the pool is
+# shared per event loop (one per uvicorn worker in production)
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[bool, aioredis.Redis]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def get_async_redis(decode_responses: bool = True) -> aioredis.Redis:
+    """Shared redis.asyncio client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+
+    client = clients.get(decode_responses)
+    if client is None:
+        pool = aioredis.ConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            decode_responses=decode_responses
+        )
+        client = clients[decode_responses] = aioredis.Redis(connection_pool=pool)
+    return client
+
+
+async def close_async_redis():
+    """Release the pools opened on the running event loop"""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.error(f"Error closing async Redis client: {e}")
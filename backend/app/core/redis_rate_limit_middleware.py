@@ -1,16 +1,25 @@
 from fastapi import Request, Response, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Callable, Optional
+from typing import Callable, Optional, Tuple
+from jose import JWTError
 import logging
+from app.core.enums import RateLimitTier
 from app.core.rate_limit_config import RateLimitConfig
+from app.core.rate_limit_matcher import RouteLimitMatcher, scale_limit
 from app.core.redis_rate_limiter import redis_rate_limiter
+from app.core.local_rate_limiter import local_pre_limiter
+from app.core.security import verify_access_token
 
 logger = logging.getLogger(__name__)
 
 
 class RedisRateLimitMiddleware(BaseHTTPMiddleware):
 
+    def __init__(self, app, matcher: Optional[RouteLimitMatcher] = None):
+        super().__init__(app)
+        self._matcher = matcher
+
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         client_ip = self._get_client_ip(request)
 
@@ -20,19 +29,33 @@ class RedisRateLimitMiddleware(BaseHTTPMiddleware):
         if self._is_exempt_path(request.url.path):
             return await call_next(request)
 
-        limit = self._get_rate_limit(request)
+        template, has_endpoint_limit, endpoint_limit = self._get_matcher(request).resolve(
+            request.url.path)
+        limit = self._get_rate_limit(request, has_endpoint_limit, endpoint_limit)
+        gcra = not has_endpoint_limit and self._get_tier(request) in RateLimitConfig.GCRA_TIERS
 
         if not limit:
             return await call_next(request)
 
-        key = self._generate_key(request, client_ip)
-        is_allowed, retry_after = redis_rate_limiter.is_allowed(key, limit)
+        user_id, role = self._get_principal(request)
+        limit = scale_limit(limit, self._get_multiplier(user_id, role))
+
+        key = self._generate_key(request, client_ip, template, user_id)
+
+        if RateLimitConfig.LOCAL_PRELIMIT_ENABLED:
+            maybe_allowed, retry_after = local_pre_limiter.check(key, limit)
+            if not maybe_allowed:
+                return self._create_rate_limit_response(limit, retry_after)
+
+        is_allowed, remaining, retry_after = await redis_rate_limiter.is_allowed(key, limit, gcra)
+
+        if RateLimitConfig.LOCAL_PRELIMIT_ENABLED:
+            local_pre_limiter.record(key, limit, is_allowed, remaining, retry_after)
 
         if not is_allowed:
             logger.warning(f"Rate limit exceeded: {key} on {request.url.path}")
             return self._create_rate_limit_response(limit, retry_after)
 
-        remaining = redis_rate_limiter.get_remaining(key, limit)
         response = await call_next(request)
         self._add_rate_limit_headers(response, limit, remaining)
 
@@ -55,32 +78,51 @@ class RedisRateLimitMiddleware(BaseHTTPMiddleware):
     def _is_exempt_path(self, path: str) -> bool:
         return path.endswith("/ws") or path in ["/health", "/", "/docs"]
 
-    def _get_rate_limit(self, request: Request) -> Optional[str]:
-        path = request.url.path
+    def _get_matcher(self, request: Request) -> RouteLimitMatcher:
+        # Compiled on the first request, once every router has been included
+        if self._matcher is None:
+            self._matcher = RouteLimitMatcher(
+                (route.path for route in request.app.routes if hasattr(route, "path")),
+                RateLimitConfig.ENDPOINT_LIMITS
+            )
+        return self._matcher
 
-        if path in RateLimitConfig.ENDPOINT_LIMITS:
-            return RateLimitConfig.ENDPOINT_LIMITS[path]
+    def _get_rate_limit(self, request: Request, has_endpoint_limit: bool,
+                        endpoint_limit: Optional[str]) -> Optional[str]:
+        if has_endpoint_limit:
+            return endpoint_limit
 
-        for endpoint, limit in RateLimitConfig.ENDPOINT_LIMITS.items():
-            if endpoint.endswith("/*"):
-                base_path = endpoint[:-2]
-                if path == base_path or path.startswith(base_path + "/"):
-                    return limit
+        return RateLimitConfig.TIER_LIMITS.get(self._get_tier(request))
 
-        tier = RateLimitConfig.METHOD_TIERS.get(
+    def _get_tier(self, request: Request) -> RateLimitTier:
+        return RateLimitConfig.METHOD_TIERS.get(
             request.method,
             RateLimitConfig.DEFAULT_TIER
         )
 
-        return RateLimitConfig.TIER_LIMITS.get(tier)
-
-    def _generate_key(self, request: Request, client_ip: str) -> str:
-        path = request.url.path
-        user_id = getattr(request.state, "user_id", None)
+    def _get_principal(self, request: Request) -> Tuple[Optional[str], Optional[str]]:
+        """(user_id, role) from the bearer token; only signature and expiry are checked here"""
+        auth = request.headers.get("Authorization", "")
+        if not auth.startswith("Bearer "):
+            return None, None
+        try:
+            payload = verify_access_token(auth[7:])
+        except JWTError:
+            return None, None
+        return payload.get("user_id"), payload.get("role")
+
+    def _get_multiplier(self, user_id: Optional[str], role: Optional[str]) -> float:
+        if not user_id:
+            return 1
+        return RateLimitConfig.ROLE_MULTIPLIERS.get(role, RateLimitConfig.AUTHENTICATED_MULTIPLIER)
+
+    def _generate_key(self, request: Request, client_ip: str, template: str,
+                      user_id: Optional[str] = None) -> str:
+        route = f"{request.method}:{template}"
 
         if user_id:
-            return f"user:{user_id}:{path}"
-        return f"ip:{client_ip}:{path}"
+            return f"user:{user_id}:{route}"
+        return f"ip:{client_ip}:{route}"
 
     def _create_rate_limit_response(self, limit: str, retry_after: int) -> JSONResponse:
         return JSONResponse(
@@ -101,7 +143,8 @@ class RedisRateLimitMiddleware(BaseHTTPMiddleware):
             }
         )
 
-    def _add_rate_limit_headers(self, response: Response, limit: str, remaining: int):
+    def _add_rate_limit_headers(self, response: Response, limit: str, remaining: Optional[int]):
         response.headers["X-RateLimit-Limit"] = limit.split("/")[0]
-        response.headers["X-RateLimit-Remaining"] = str(max(0, remaining - 1))
+        if remaining is not None:
+            response.headers["X-RateLimit-Remaining"] = str(max(0, remaining))
         response.headers["X-RateLimit-Policy"] = limit
@@ -1,18 +1,74 @@
 import redis
 from redis.connection import ConnectionPool
+import math
 import time
+import uuid
+import weakref
 import logging
 from typing import Tuple, Optional
 from app.core.config import settings
+from app.core.rate_limit_config import RateLimitConfig
+from app.core.redis_client import get_async_redis
 
 logger = logging.getLogger(__name__)
 
+# Sliding window log: prune, count and record in one atomic step.
+# KEYS[1] = zset, ARGV = now_ms, window_ms, limit, unique member
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+local count = redis.call('ZCARD', key)
+
+if count >= limit then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    local retry = window
+    if oldest[2] then
+        retry = tonumber(oldest[2]) + window - now
+    end
+    return {0, 0, retry}
+end
+
+redis.call('ZADD', key, now, ARGV[4])
+redis.call('PEXPIRE', key, window + 60000)
+return {1, limit - count - 1, 0}
+"""
+
+# GCRA: one theoretical-arrival-time per key, O(1) memory at any rate.
+# KEYS[1] = tat, ARGV = now_ms, emission_interval_ms, burst
+GCRA_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local emission = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local tolerance = emission * burst
+
+local tat = tonumber(redis.call('GET', key) or now)
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + emission
+local allow_at = new_tat - tolerance
+if allow_at > now then
+    return {0, 0, allow_at - now}
+end
+
+redis.call('SET', key, new_tat, 'PX', new_tat - now)
+return {1, math.floor((tolerance - (new_tat - now)) / emission), 0}
+"""
+
 
 class RedisRateLimiter:
 
     def __init__(self):
         self.pool = None
         self.redis_client = None
+        # Registered scripts per async client (there is one client per event loop)
+        self._scripts = weakref.WeakKeyDictionary()
         self._connect()
 
     def _connect(self):
@@ -62,64 +118,91 @@ class RedisRateLimiter:
     def _get_redis_key(self, key: str) -> str:
         return f"{settings.REDIS_KEY_PREFIX}:{key}"
 
-    def is_allowed(self, key: str, limit_str: str) -> Tuple[bool, Optional[int]]:
+    @property
+    def async_client(self):
+        """Non-blocking client for the request path; the sync one serves admin/maintenance calls"""
+        return get_async_redis()
+
+    def _script(self, client, source: str):
+        """Script object for `source` on `client`, registered (and hashed) once"""
+        scripts = self._scripts.setdefault(client, {})
+        script = scripts.get(source)
+        if script is None:
+            script = scripts[source] = client.register_script(source)
+        return script
+
+    def _gcra_params(self, max_requests: int, period_ms: int) -> Tuple[int, int]:
+        """
+        (emission_interval_ms, burst) for a GCRA limit.
+
+        Any period admits at most burst + period / emission - 1 requests,
+        so the steady rate covers what the burst leaves of max_requests.
+        """
+        burst = min(max(int(max_requests * RateLimitConfig.GCRA_BURST_RATIO), 1), max_requests)
+        return math.ceil(period_ms / (max_requests - burst + 1)), burst
+
+    async def is_allowed(self, key: str, limit_str: str,
+                         gcra: bool = False) -> Tuple[bool, Optional[int], Optional[int]]:
+        """
+        Check and count a request atomically -> (allowed, remaining, retry_after)
+
+        gcra: use GCRA (O(1) memory per key) instead of the sliding-window log
+        """
         if not limit_str:
-            return True, None
+            return True, None, None
 
         try:
             max_requests, period_seconds = self._parse_limit(limit_str)
             redis_key = self._get_redis_key(key)
+            client = self.async_client
+            now_ms = int(time.time() * 1000)
+            period_ms = period_seconds * 1000
+
+            if gcra:
+                script = self._script(client, GCRA_SCRIPT)
+                allowed, remaining, retry_ms = await script(
+                    keys=[f"{redis_key}:gcra"],
+                    args=[now_ms, *self._gcra_params(max_requests, period_ms)]
+                )
+            else:
+                script = self._script(client, SLIDING_WINDOW_SCRIPT)
+                allowed, remaining, retry_ms = await script(
+                    keys=[redis_key],
+                    args=[now_ms, period_ms, max_requests,
+                          f"{now_ms}-{uuid.uuid4().hex[:8]}"]
+                )
 
-            now = time.time()
-            window_start = now - period_seconds
-
-            pipe = self.redis_client.pipeline()
-            pipe.zremrangebyscore(redis_key, 0, window_start)
-            pipe.zcard(redis_key)
-            results = pipe.execute()
-            current_count = results[1]
-
-            if current_count >= max_requests:
-                oldest_entries = self.redis_client.zrange(
-                    redis_key, 0, 0, withscores=True)
-
-                if oldest_entries:
-                    oldest_timestamp = oldest_entries[0][1]
-                    retry_after = int(oldest_timestamp +
-                                      period_seconds - now) + 1
-                    return False, max(retry_after, 1)
-
-                return False, period_seconds
-
-            pipe = self.redis_client.pipeline()
-            pipe.zadd(redis_key, {str(now): now})
-            pipe.expire(redis_key, period_seconds + 60)
-            pipe.execute()
-
-            return True, None
+            if allowed:
+                return True, int(remaining), None
+            return False, 0, max(math.ceil(int(retry_ms) / 1000), 1)
 
         except redis.RedisError as e:
             logger.error(f"Redis error in is_allowed: {e}")
-            return True, None
+            return True, None, None
         except Exception as e:
             logger.error(f"Error in is_allowed: {e}")
-            return True, None
+            return True, None, None
 
-    def get_remaining(self, key: str, limit_str: str) -> int:
+    async def get_remaining(self, key: str, limit_str: str, gcra: bool = False) -> int:
+        """Read-only peek; the request path gets remaining from is_allowed"""
         if not limit_str:
             return float('inf')
 
         try:
             max_requests, period_seconds = self._parse_limit(limit_str)
             redis_key = self._get_redis_key(key)
+            now_ms = int(time.time() * 1000)
 
-            now = time.time()
-            window_start = now - period_seconds
+            if gcra:
+                emission_ms, burst = self._gcra_params(max_requests, period_seconds * 1000)
+                tat = await self.async_client.get(f"{redis_key}:gcra")
+                backlog = max(int(tat or 0) - now_ms, 0)
+                return max(0, burst - math.ceil(backlog / emission_ms))
 
-            pipe = self.redis_client.pipeline()
-            pipe.zremrangebyscore(redis_key, 0, window_start)
+            pipe = self.async_client.pipeline()
+            pipe.zremrangebyscore(redis_key, 0, now_ms - period_seconds * 1000)
             pipe.zcard(redis_key)
-            results = pipe.execute()
+            results = await pipe.execute()
 
             current_count = results[1]
             return max(0, max_requests - current_count)
@@ -131,7 +214,8 @@ class RedisRateLimiter:
     def reset(self, key: str):
         try:
             redis_key = self._get_redis_key(key)
-            self.redis_client.delete(redis_key)
+            # Sliding window zset and GCRA arrival time
+            self.redis_client.delete(redis_key, f"{redis_key}:gcra")
             logger.info(f"Reset rate limit for key: {key}")
         except Exception as e:
             logger.error(f"Error in reset: {e}")
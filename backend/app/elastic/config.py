@@ -1,12 +1,17 @@
 # from elasticsearch import Elasticsearch
+import copy
 import urllib3
+from datetime import datetime, timezone
+from typing import List
 from app.core.config import settings
 from opensearchpy import OpenSearch as Elasticsearch
+from opensearchpy import AsyncOpenSearch
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 ELASTIC_PASSWORD = settings.ELASTIC_PASSWORD
 ELASTIC_ACCOUNT = settings.ELASTIC_ACCOUNT
 ELASTIC_URL = settings.ELASTIC_URL
+# Read/write alias; physical indices are versioned behind it
 PRODUCT_INDEX = settings.PRODUCT_DOCUMENT_INDEX
 
 es_client = Elasticsearch(
@@ -17,112 +22,182 @@ es_client = Elasticsearch(
     ssl_show_warn=False
 )
 
+# Async client for request-path search (aiohttp connection pool)
+async_es_client = AsyncOpenSearch(
+    hosts=[ELASTIC_URL],
+    http_auth=(ELASTIC_ACCOUNT, ELASTIC_PASSWORD),
+    use_ssl=True,
+    verify_certs=False,
+    ssl_show_warn=False,
+    maxsize=settings.ES_ASYNC_POOL_MAXSIZE,
+    timeout=settings.ES_SEARCH_TIMEOUT_SECONDS
+)
 
-# Create product index
-def create_product_index():
-    """create index mapping if not exist"""
-    if not es_client.indices.exists(index=PRODUCT_INDEX):
-        es_client.indices.create(
-            index=PRODUCT_INDEX,
-            body={
-                "settings": {
-                    "analysis": {
-                        "normalizer": {
-                            "lowercase_normalizer": {
-                                "type": "custom",
-                                "filter": ["lowercase"]
-                            }
-                        }
+
+async def close_async_es_client():
+    await async_es_client.close()
+
+
+PRODUCT_INDEX_BODY = {
+    "settings": {
+        "analysis": {
+            "normalizer": {
+                "lowercase_normalizer": {
+                    "type": "custom",
+                    "filter": ["lowercase"]
+                }
+            }
+        }
+    },
+    "mappings": {
+        "properties": {
+            "id": {"type": "keyword"},
+            "name": {
+                "type": "text",
+                "analyzer": "standard",
+                "fields": {
+                    "keyword": {
+                        "type": "keyword",
+                        "normalizer": "lowercase_normalizer"
                     }
-                },
-                "mappings": {
-                    "properties": {
-                        "id": {"type": "keyword"},
-                        "name": {
-                            "type": "text",
-                            "analyzer": "standard",
-                            "fields": {
-                                "keyword": {
-                                    "type": "keyword",
-                                    "normalizer": "lowercase_normalizer"
-                                }
-                            }
-                        },
-                        "slug": {"type": "keyword"},
-                        "price": {"type": "double"},
-                        "stock_quantity": {"type": "integer"},
-                        "product_image": {"type": "text"},
-                        "is_available": {"type": "boolean"},
-                        "brand_name": {
-                            "type": "text",
-                            "fields": {
-                                "keyword": {
-                                    "type": "keyword",
-                                    "normalizer": "lowercase_normalizer"
-                                }
-                            }
-                        },
-                        "category_name": {
-                            "type": "text",
-                            "fields": {
-                                "keyword": {
-                                    "type": "keyword",
-                                    "normalizer": "lowercase_normalizer"
-                                }
-                            }
-                        },
-                        "concerns": {
-                            "type": "text",
-                            "fields": {
-                                "keyword": {
-                                    "type": "keyword",
-                                    "normalizer": "lowercase_normalizer"
-                                }
-                            }
-                        },
-                        "skin_types": {
-                            "type": "keyword",
-                            "normalizer": "lowercase_normalizer"
-                        },
-                        "benefits": {
-                            "type": "text",
-                            "fields": {
-                                "keyword": {
-                                    "type": "keyword",
-                                    "normalizer": "lowercase_normalizer"
-                                }
-                            }
-                        },
-                        "tags": {
-                            "type": "text",
-                            "fields": {
-                                "keyword": {
-                                    "type": "keyword",
-                                    "normalizer": "lowercase_normalizer"
-                                }
-                            }
-                        },
-                        "description": {
-                            "type": "text",
-                            "fields": {
-                                "keyword": {
-                                    "type": "keyword",
-                                    "normalizer": "lowercase_normalizer"
-                                }
-                            }
-                        },
-                        "rating_average": {"type": "float"}
+                }
+            },
+            "slug": {"type": "keyword"},
+            "price": {"type": "double"},
+            "stock_quantity": {"type": "integer"},
+            "product_image": {"type": "text"},
+            "is_available": {"type": "boolean"},
+            "brand_name": {
+                "type": "text",
+                "fields": {
+                    "keyword": {
+                        "type": "keyword",
+                        "normalizer": "lowercase_normalizer"
                     }
                 }
-            }
-        )
+            },
+            "category_name": {
+                "type": "text",
+                "fields": {
+                    "keyword": {
+                        "type": "keyword",
+                        "normalizer": "lowercase_normalizer"
+                    }
+                }
+            },
+            # Ids of the product's category and all its ancestors
+            "category_path": {"type": "keyword"},
+            "concerns": {
+                "type": "text",
+                "fields": {
+                    "keyword": {
+                        "type": "keyword",
+                        "normalizer": "lowercase_normalizer"
+                    }
+                }
+            },
+            "skin_types": {
+                "type": "keyword",
+                "normalizer": "lowercase_normalizer"
+            },
+            "benefits": {
+                "type": "text",
+                "fields": {
+                    "keyword": {
+                        "type": "keyword",
+                        "normalizer": "lowercase_normalizer"
+                    }
+                }
+            },
+            "tags": {
+                "type": "text",
+                "fields": {
+                    "keyword": {
+                        "type": "keyword",
+                        "normalizer": "lowercase_normalizer"
+                    }
+                }
+            },
+            "description": {
+                "type": "text",
+                "fields": {
+                    "keyword": {
+                        "type": "keyword",
+                        "normalizer": "lowercase_normalizer"
+                    }
+                }
+            },
+            "rating_average": {"type": "float"},
+            "updated_at": {"type": "date"}
+        }
+    }
+}
+
+
+def new_product_index_name() -> str:
+    """Versioned physical index name, e.g. products_20250101120000"""
+    return f"{PRODUCT_INDEX}_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}"
+
+
+def get_aliased_indices() -> List[str]:
+    """Physical indices currently behind the product alias"""
+    if not es_client.indices.exists_alias(name=PRODUCT_INDEX):
+        return []
+    return list(es_client.indices.get_alias(name=PRODUCT_INDEX).keys())
+
+
+def create_versioned_product_index(index_name: str):
+    """Create a physical index tuned for bulk loading (refresh disabled)"""
+    body = copy.deepcopy(PRODUCT_INDEX_BODY)
+    body["settings"]["refresh_interval"] = "-1"
+    es_client.indices.create(index=index_name, body=body)
+
+
+def swap_product_alias(new_index: str):
+    """
+    Atomically point the product alias at new_index.
+
+    Old versioned indices are detached in the same update_aliases call and
+    dropped afterwards. A legacy concrete index that still owns the alias
+    name is removed in the same atomic action.
+    """
+    es_client.indices.put_settings(
+        index=new_index, body={"index": {"refresh_interval": None}})
+    es_client.indices.refresh(index=new_index)
+
+    old_indices = [i for i in get_aliased_indices() if i != new_index]
+    actions = [{"remove": {"index": i, "alias": PRODUCT_INDEX}}
+               for i in old_indices]
+
+    if not old_indices and es_client.indices.exists(index=PRODUCT_INDEX):
+        actions.append({"remove_index": {"index": PRODUCT_INDEX}})
+
+    actions.append({"add": {"index": new_index, "alias": PRODUCT_INDEX}})
+    es_client.indices.update_aliases(body={"actions": actions})
+
+    for index_name in old_indices:
+        es_client.indices.delete(index=index_name, ignore_unavailable=True)
+        print(f"[Elastic] Deleted old index: {index_name}")
+
+    print(f"[Elastic] Alias {PRODUCT_INDEX} -> {new_index}")
+
 
+def create_product_index() -> bool:
+    """
+    Make sure the product alias resolves to an index.
 
-def reset_product_index():
-    """Delete index if exists and recreate it (Clean slate)"""
+    Returns True when a fresh, empty index had to be created.
+    """
     if es_client.indices.exists(index=PRODUCT_INDEX):
-        es_client.indices.delete(index=PRODUCT_INDEX)
-        print(f"[Elastic] Deleted old index: {PRODUCT_INDEX}")
+        return False
 
-    create_product_index()
-    print(f"[Elastic] Created new index: {PRODUCT_INDEX}")
+    index_name = new_product_index_name()
+    es_client.indices.create(
+        index=index_name,
+        body={
+            **PRODUCT_INDEX_BODY,
+            "aliases": {PRODUCT_INDEX: {}}
+        }
+    )
+    print(f"[Elastic] Created index {index_name} (alias {PRODUCT_INDEX})")
+    return True
@@ -1,56 +1,191 @@
+from datetime import datetime
+from itertools import chain
+from typing import Iterator, Optional
 from sqlalchemy import event
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import settings
 from app.db.database import SessionLocal
-from app.models.product import Product
-from app.elastic.config import create_product_index, reset_product_index
-from app.elastic.service import index_product, delete_product, product_to_doc
+from app.models.product import Product, ProductImage
+from app.elastic.config import (
+    PRODUCT_INDEX,
+    close_async_es_client,
+    create_product_index,
+    create_versioned_product_index,
+    es_client,
+    new_product_index_name,
+    swap_product_alias
+)
+from app.elastic.service import bulk_index_products, get_index_watermark
+from app.elastic.sync_queue import product_sync_queue
+from app.elastic.search_cache import search_cache
 
+_DIRTY_PRODUCTS_KEY = "es_dirty_product_ids"
 
-def sync_all_products():
-    """Synchronize all products from Database to Elasticsearch (Runs on app startup)."""
+
+def iter_products(
+    db: Session,
+    batch_size: int,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False
+) -> Iterator[Product]:
+    """
+    Stream products in keyset-paginated batches ordered by id.
+
+    Relationships are loaded per batch with selectinload and the session is
+    cleared between batches, so memory stays bounded by batch_size.
+    """
+    last_id = None
+
+    while True:
+        query = db.query(Product).options(
+            selectinload(Product.brand),
+            selectinload(Product.category),
+            selectinload(Product.tags),
+            selectinload(Product.images)
+        )
+
+        if not include_deleted:
+            query = query.filter(Product.deleted_at.is_(None))
+
+        if updated_since is not None:
+            query = query.filter(Product.updated_at >= updated_since)
+
+        if last_id is not None:
+            query = query.filter(Product.id > last_id)
+
+        batch = query.order_by(Product.id).limit(batch_size).all()
+        if not batch:
+            return
+
+        yield from batch
+
+        last_id = batch[-1].id
+        db.expunge_all()
+
+        if len(batch) < batch_size:
+            return
+
+
+def rebuild_product_index(batch_size: Optional[int] = None) -> str:
+    """
+    Full reindex: build a new versioned index, then swap the alias.
+
+    Search keeps serving the previous index until the swap.
+    """
+    batch_size = batch_size or settings.ES_BULK_BATCH_SIZE
+    index_name = new_product_index_name()
+    create_versioned_product_index(index_name)
+
+    db = SessionLocal()
     try:
-        reset_product_index()
-    except Exception as e:
-        print(f"[Elastic Error] Could not reset index: {e}")
-        return
+        succeeded, failed = bulk_index_products(
+            iter_products(db, batch_size),
+            index=index_name,
+            chunk_size=batch_size
+        )
+    finally:
+        db.close()
+
+    swap_product_alias(index_name)
+    search_cache.bump_generation()
+    print(f"Full sync completed: {succeeded} products ({failed} failed)")
+    return index_name
+
+
+def sync_changed_products(batch_size: Optional[int] = None) -> int:
+    """
+    Incremental sync: push only rows whose updated_at is at or after the
+    newest document already in the index. Soft-deleted rows are removed.
+    """
+    batch_size = batch_size or settings.ES_BULK_BATCH_SIZE
+    updated_since = get_index_watermark(PRODUCT_INDEX)
 
     db = SessionLocal()
+    try:
+        succeeded, failed = bulk_index_products(
+            iter_products(
+                db,
+                batch_size,
+                updated_since=updated_since,
+                include_deleted=updated_since is not None
+            ),
+            index=PRODUCT_INDEX,
+            chunk_size=batch_size
+        )
+    finally:
+        db.close()
+
+    if succeeded:
+        # Make the changes searchable before cached results are dropped
+        es_client.indices.refresh(index=PRODUCT_INDEX)
+        search_cache.bump_generation()
+    print(
+        f"Incremental sync completed: {succeeded} products since "
+        f"{updated_since or 'beginning'} ({failed} failed)")
+    return succeeded
+
+
+def sync_all_products():
+    """Synchronize products from Database to Elasticsearch (Runs on app startup)."""
+    mode = settings.ES_STARTUP_SYNC_MODE
+
+    if mode == "off":
+        return
+
     try:
         print("Checking data sync...")
-        products = db.query(Product).options(
-            joinedload(Product.brand),
-            joinedload(Product.category),
-            joinedload(Product.tags),
-            joinedload(Product.images)
-        ).all()
-
-        count = 0
-        for p in products:
-            index_product(p)
-            count += 1
-
-        print(f"Full sync completed: {count} products")
+        if mode == "full":
+            rebuild_product_index()
+        else:
+            # An empty index has no watermark, so this loads everything
+            sync_changed_products()
     except Exception as e:
         print(f"Sync warning: {e}")
-    finally:
-        db.close()
 
 
-def register_es_events():
-    """Register SQLAlchemy event listeners for real-time Elasticsearch synchronization."""
+def _collect_dirty_products(session: Session, flush_context):
+    """Remember which products this transaction touched"""
+    dirty = session.info.setdefault(_DIRTY_PRODUCTS_KEY, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Product):
+            dirty.add(obj.id)
+        elif isinstance(obj, ProductImage):
+            dirty.add(obj.product_id)
 
-    @event.listens_for(Product, 'after_insert')
-    def after_insert(mapper, connection, target):
-        index_product(target)
 
-    @event.listens_for(Product, 'after_update')
-    def after_update(mapper, connection, target):
-        index_product(target)
+def mark_products_dirty(session: Session, product_ids):
+    """Re-index products whose document changed without touching the Product row"""
+    session.info.setdefault(_DIRTY_PRODUCTS_KEY, set()).update(product_ids)
 
-    @event.listens_for(Product, 'after_delete')
-    def after_delete(mapper, connection, target):
-        delete_product(str(target.id))
 
+def _enqueue_dirty_products(session: Session):
+    dirty = session.info.pop(_DIRTY_PRODUCTS_KEY, None)
+    if dirty:
+        product_sync_queue.enqueue(dirty)
+
+
+def _discard_dirty_products(session: Session):
+    session.info.pop(_DIRTY_PRODUCTS_KEY, None)
+
+
+def _invalidate_search_cache(product_ids):
+    search_cache.bump_generation()
+
+
+def register_es_events():
+    """
+    Register SQLAlchemy session hooks for Elasticsearch synchronization.
+
+    Touched product ids are collected on flush and only handed to the sync
+    queue once the transaction commits; rolled-back work is discarded.
+    """
+    if not event.contains(Session, "after_flush", _collect_dirty_products):
+        event.listen(Session, "after_flush", _collect_dirty_products)
+        event.listen(Session, "after_commit", _enqueue_dirty_products)
+        event.listen(Session, "after_rollback", _discard_dirty_products)
+        product_sync_queue.add_flush_listener(_invalidate_search_cache)
+
+    product_sync_queue.start()
     print("Real-time sync listener active")
 
 
@@ -59,3 +194,9 @@ async def init_elasticsearch():
     create_product_index()
     sync_all_products()
     register_es_events()
+
+
+async def close_elasticsearch():
+    """Flush pending product changes and release the async search pool."""
+    product_sync_queue.stop()
+    await close_async_es_client()
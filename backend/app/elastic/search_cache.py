@@ -0,0 +1,147 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.local_cache import LocalTTLCache
+from app.core.redis_cache import redis_cache
+from app.elastic.service import FACET_FIELDS, _normalize_list
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCache:
+    """
+    Result cache for product search: in-process LRU in front of Redis.
+
+    Keys embed a generation number that the ES sync path bumps on every
+    product change, so invalidation is a single INCR and stale entries
+    simply age out. Workers re-read the generation at most once per
+    generation_ttl, which is in line with ES's own refresh delay.
+    """
+
+    GENERATION_KEY = "search:generation"
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        local_maxsize: int,
+        local_ttl_seconds: float,
+        generation_ttl_seconds: float,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.ttl = ttl_seconds
+        self.generation_ttl = generation_ttl_seconds
+        self.local = LocalTTLCache(local_maxsize, min(local_ttl_seconds, ttl_seconds))
+
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._generation_read_at: Optional[float] = None
+        self._local_hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+
+    # ========== Keys ==========
+
+    @staticmethod
+    def make_key(params: dict) -> str:
+        """Canonical hash so equivalent queries share one entry"""
+        canonical = {}
+        for name, value in params.items():
+            if name == "keyword":
+                value = " ".join(value.lower().split()) if value else None
+            elif name in FACET_FIELDS:
+                value = sorted(set(_normalize_list(value))) or None
+            elif name in ("min_price", "max_price", "price_interval") and value is not None:
+                value = float(value)
+            if value is not None:
+                canonical[name] = value
+
+        raw = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    async def generation(self) -> int:
+        now = time.monotonic()
+        if (self._generation_read_at is not None
+                and now - self._generation_read_at < self.generation_ttl):
+            return self._generation
+
+        value = await redis_cache.aget(self.GENERATION_KEY)
+        with self._lock:
+            self._generation = int(value or 0)
+            self._generation_read_at = now
+            return self._generation
+
+    def bump_generation(self):
+        """Invalidate every cached search in O(1); called from the sync worker thread"""
+        value = redis_cache.incr(self.GENERATION_KEY)
+        with self._lock:
+            if value is not None:
+                self._generation = value
+                self._generation_read_at = time.monotonic()
+            else:
+                # Redis unavailable: at least drop this worker's copies
+                self.local.clear()
+
+    # ========== Read / write ==========
+
+    async def get(self, params: dict) -> Optional[Any]:
+        key = f"search:{await self.generation()}:{self.make_key(params)}"
+
+        value = self.local.get(key)
+        if value is not None:
+            self._count("_local_hits")
+            return value
+
+        value = await redis_cache.aget(key)
+        if value is not None:
+            self._count("_redis_hits")
+            self.local.set(key, value)
+            return value
+
+        self._count("_misses")
+        return None
+
+    async def set(self, params: dict, value: Any):
+        key = f"search:{await self.generation()}:{self.make_key(params)}"
+        self.local.set(key, value)
+        await redis_cache.aset(key, value, ttl_seconds=self.ttl)
+
+    def clear_local(self):
+        self.local.clear()
+        with self._lock:
+            self._generation_read_at = None
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    # ========== Metrics ==========
+
+    def metrics(self) -> dict:
+        """Counters are per worker process"""
+        with self._lock:
+            hits = self._local_hits + self._redis_hits
+            lookups = hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "generation": self._generation,
+                "local_size": len(self.local),
+                "local_hits": self._local_hits,
+                "redis_hits": self._redis_hits,
+                "misses": self._misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+search_cache = SearchCache(
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+    local_maxsize=settings.SEARCH_CACHE_LOCAL_MAXSIZE,
+    local_ttl_seconds=settings.SEARCH_CACHE_LOCAL_TTL_SECONDS,
+    generation_ttl_seconds=settings.SEARCH_CACHE_GENERATION_TTL_SECONDS,
+    enabled=settings.SEARCH_CACHE_ENABLED
+)
@@ -1,7 +1,31 @@
-from typing import Iterable, List, Optional
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
 
+from opensearchpy import helpers
+
+from app.core.config import settings
 from app.models.product import Product
-from app.elastic.config import es_client, PRODUCT_INDEX
+from app.elastic.config import es_client, async_es_client, PRODUCT_INDEX
+
+# Facet name -> keyword field used for both filtering and aggregation
+FACET_FIELDS = {
+    "brand": "brand_name.keyword",
+    "category": "category_name.keyword",
+    "skin_types": "skin_types",
+    "concerns": "concerns.keyword",
+    "benefits": "benefits.keyword",
+    "tags": "tags.keyword",
+}
+
+# Relevance first, id as the unique tiebreaker search_after needs
+CURSOR_SORT = [{"_score": "desc"}, {"id": "asc"}]
+
+
+def category_path_ids(p: Product) -> List[str]:
+    """Category ids from the root down to the product's own category"""
+    if p.category is not None and p.category.path:
+        return [category_id for category_id in p.category.path.split("/") if category_id]
+    return [p.category_id] if p.category_id else []
 
 
 def product_to_doc(p: Product):
@@ -25,15 +49,78 @@ def product_to_doc(p: Product):
         "is_available": p.is_available,
         "brand_name": p.brand.name if p.brand else "",
         "category_name": p.category.name if p.category else "",
+        "category_path": category_path_ids(p),
         "concerns": p.concerns if p.concerns else [],
         "skin_types": p.skin_types if p.skin_types else [],
         "benefits": p.benefits if p.benefits else [],
         "tags": [t.name for t in p.tags] if p.tags else [],
         "description": p.description,
-        "rating_average": float(p.rating_average) if p.rating_average else 0
+        "rating_average": float(p.rating_average) if p.rating_average else 0,
+        "updated_at": p.updated_at.isoformat() if p.updated_at else None
+    }
+
+
+def product_to_action(p: Product, index: str = PRODUCT_INDEX) -> dict:
+    """Convert SQLAlchemy Model -> _bulk action (soft-deleted rows are removed)"""
+    if p.deleted_at is not None:
+        return {"_op_type": "delete", "_index": index, "_id": str(p.id)}
+
+    return {
+        "_op_type": "index",
+        "_index": index,
+        "_id": str(p.id),
+        "_source": product_to_doc(p)
     }
 
 
+def bulk_index_products(
+    products: Iterable[Product],
+    index: str = PRODUCT_INDEX,
+    chunk_size: Optional[int] = None,
+    thread_count: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Ship products through the _bulk API.
+
+    Returns (succeeded, failed). Deleting a document that is not in the
+    index counts as success.
+    """
+    actions = (product_to_action(p, index) for p in products)
+    succeeded = failed = 0
+
+    for ok, info in helpers.parallel_bulk(
+        es_client,
+        actions,
+        thread_count=thread_count or settings.ES_BULK_CONCURRENCY,
+        chunk_size=chunk_size or settings.ES_BULK_BATCH_SIZE,
+        raise_on_error=False,
+        raise_on_exception=False
+    ):
+        if ok or info.get("delete", {}).get("status") == 404:
+            succeeded += 1
+        else:
+            failed += 1
+            print(f"Bulk indexing failed: {info}")
+
+    return succeeded, failed
+
+
+def get_index_watermark(index: str = PRODUCT_INDEX) -> Optional[datetime]:
+    """Latest updated_at stored in the index (None if unknown)"""
+    response = es_client.search(
+        index=index,
+        body={
+            "size": 0,
+            "aggs": {"last_updated": {"max": {"field": "updated_at"}}}
+        }
+    )
+    value = response.get("aggregations", {}).get("last_updated", {})
+    if value.get("value") is None:
+        return None
+    last_updated = datetime.fromtimestamp(value["value"] / 1000, tz=timezone.utc)
+    return last_updated.replace(tzinfo=None)
+
+
 def index_product(product: Product):
     """Upsert a product"""
     try:
@@ -52,7 +139,7 @@ def delete_product(product_id: str):
         pass
 
 
-def search_products_query(
+def build_search_body(
     keyword,
     min_price,
     max_price,
@@ -64,7 +151,13 @@ def search_products_query(
     concerns: Optional[Iterable[str]] = None,
     benefits: Optional[Iterable[str]] = None,
     tags: Optional[Iterable[str]] = None,
-    is_available: Optional[bool] = True
+    category_id: Optional[str] = None,
+    is_available: Optional[bool] = True,
+    include_facets: bool = False,
+    price_interval: Optional[float] = None,
+    cursor_mode: bool = False,
+    search_after: Optional[list] = None,
+    pit_id: Optional[str] = None
 ):
     """Logic Query DSL"""
     query_conditions = []
@@ -96,33 +189,27 @@ def search_products_query(
         filter_conditions.append({"range": {"price": {"gte": min_price}}})
     if max_price is not None:
         filter_conditions.append({"range": {"price": {"lte": max_price}}})
+    if category_id:
+        # Matches the category and every subcategory under it
+        filter_conditions.append({"term": {"category_path": category_id}})
 
-    brand_values = _normalize_list(brand)
-    if brand_values:
-        filter_conditions.append(_build_terms_filter("brand_name.keyword", brand_values))
-
-    category_values = _normalize_list(category)
-    if category_values:
-        filter_conditions.append(_build_terms_filter("category_name.keyword", category_values))
-
-    skin_type_values = _normalize_list(skin_types)
-    if skin_type_values:
-        filter_conditions.append(_build_terms_filter("skin_types", skin_type_values))
+    facet_filters = {}
+    for name, values in (
+        ("brand", brand),
+        ("category", category),
+        ("skin_types", skin_types),
+        ("concerns", concerns),
+        ("benefits", benefits),
+        ("tags", tags),
+    ):
+        cleaned = _normalize_list(values)
+        if cleaned:
+            facet_filters[name] = _build_terms_filter(FACET_FIELDS[name], cleaned)
 
-    concern_values = _normalize_list(concerns)
-    if concern_values:
-        filter_conditions.append(_build_terms_filter("concerns.keyword", concern_values))
-
-    benefit_values = _normalize_list(benefits)
-    if benefit_values:
-        filter_conditions.append(_build_terms_filter("benefits.keyword", benefit_values))
-
-    tag_values = _normalize_list(tags)
-    if tag_values:
-        filter_conditions.append(_build_terms_filter("tags.keyword", tag_values))
+    if not include_facets:
+        filter_conditions.extend(facet_filters.values())
 
     body = {
-        "from": (page - 1) * limit,
         "size": limit,
         "query": {
             "bool": {
@@ -132,9 +219,105 @@ def search_products_query(
         }
     }
 
+    if cursor_mode:
+        # search_after keeps deep pages as cheap as page 1; only page 1 pays for the total
+        body["sort"] = CURSOR_SORT
+        if search_after:
+            body["search_after"] = search_after
+            body["track_total_hits"] = False
+        if pit_id:
+            body["pit"] = {"id": pit_id, "keep_alive": settings.ES_PIT_KEEP_ALIVE}
+    else:
+        body["from"] = (page - 1) * limit
+
+    if include_facets:
+        # Facet selections go to post_filter so each facet's counts ignore its own selection
+        if facet_filters:
+            body["post_filter"] = {"bool": {"filter": list(facet_filters.values())}}
+        body["aggs"] = build_facet_aggs(facet_filters, price_interval)
+
+    return body
+
+
+def build_facet_aggs(facet_filters: dict, price_interval: Optional[float] = None) -> dict:
+    """Terms aggs per facet, each scoped by the other facets' selections"""
+    aggs = {}
+    for name, field in FACET_FIELDS.items():
+        others = [f for other, f in facet_filters.items() if other != name]
+        aggs[name] = {
+            "filter": {"bool": {"filter": others}},
+            "aggs": {
+                "values": {"terms": {"field": field, "size": settings.ES_FACET_SIZE}}
+            }
+        }
+
+    aggs["price"] = {
+        "filter": {"bool": {"filter": list(facet_filters.values())}},
+        "aggs": {
+            "values": {
+                "histogram": {
+                    "field": "price",
+                    "interval": price_interval or settings.ES_PRICE_HISTOGRAM_INTERVAL,
+                    "min_doc_count": 1
+                }
+            }
+        }
+    }
+    return aggs
+
+
+def parse_facets(aggregations: Optional[dict], price_interval: Optional[float] = None) -> dict:
+    """ES aggregations -> {facet: [{value, count}], price: [{from, to, count}]}"""
+    aggregations = aggregations or {}
+    interval = price_interval or settings.ES_PRICE_HISTOGRAM_INTERVAL
+
+    facets = {}
+    for name in FACET_FIELDS:
+        buckets = aggregations.get(name, {}).get("values", {}).get("buckets", [])
+        facets[name] = [
+            {"value": b["key"], "count": b["doc_count"]} for b in buckets
+        ]
+
+    price_buckets = aggregations.get("price", {}).get("values", {}).get("buckets", [])
+    facets["price"] = [
+        {"from": b["key"], "to": b["key"] + interval, "count": b["doc_count"]}
+        for b in price_buckets
+    ]
+    return facets
+
+
+def search_products_query(keyword, min_price, max_price, limit, page, **filters):
+    """Blocking search (admin / maintenance paths)"""
+    body = build_search_body(keyword, min_price, max_price, limit, page, **filters)
     return es_client.search(index=PRODUCT_INDEX, body=body)
 
 
+async def async_search_products_query(keyword, min_price, max_price, limit, page, **filters):
+    """Non-blocking search used by the public search endpoint"""
+    body = build_search_body(keyword, min_price, max_price, limit, page, **filters)
+    return await async_es_client.search(
+        # A PIT already pins the index; passing one alongside it is rejected
+        index=None if "pit" in body else PRODUCT_INDEX,
+        body=body,
+        request_timeout=settings.ES_SEARCH_TIMEOUT_SECONDS
+    )
+
+
+async def open_search_pit() -> str:
+    """Open a point-in-time on the product alias for consistent deep paging"""
+    response = await async_es_client.create_pit(
+        index=PRODUCT_INDEX, keep_alive=settings.ES_PIT_KEEP_ALIVE)
+    return response["pit_id"]
+
+
+async def close_search_pit(pit_id: str):
+    """Release a PIT early; it would expire on its own after keep_alive"""
+    try:
+        await async_es_client.delete_pit(body={"pit_id": [pit_id]})
+    except Exception as e:
+        print(f"Failed to close PIT: {e}")
+
+
 def _normalize_list(values: Optional[Iterable[str]]) -> List[str]:
     if not values:
         return []
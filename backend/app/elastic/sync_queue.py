@@ -0,0 +1,255 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from opensearchpy import helpers
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.product import Product
+from app.elastic.config import es_client, PRODUCT_INDEX
+from app.elastic.service import product_to_action
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingChange:
+    __slots__ = ("enqueued_at", "attempts", "not_before")
+
+    def __init__(self, enqueued_at: float, attempts: int = 0, not_before: float = 0.0):
+        self.enqueued_at = enqueued_at
+        self.attempts = attempts
+        self.not_before = not_before
+
+
+class ProductSyncQueue:
+    """
+    Outbox-style queue of dirty product ids.
+
+    Ids are recorded after the DB transaction commits, duplicates coalesce
+    into one pending entry, and a background thread pushes them to _bulk
+    every flush_interval or as soon as max_batch ids are waiting. Failed ids
+    are retried with exponential backoff and dropped after max_retries.
+    """
+
+    def __init__(
+        self,
+        flush_interval_ms: int,
+        max_batch: int,
+        max_retries: int,
+        retry_backoff_ms: int,
+        max_backoff_ms: int = 60000
+    ):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000
+        self.max_backoff = max_backoff_ms / 1000
+
+        self._pending: "OrderedDict[str, _PendingChange]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._flush_listeners = []
+
+        self._in_flight = 0
+        self._flushed_total = 0
+        self._failed_total = 0
+        self._retried_total = 0
+        self._dropped_total = 0
+        self._last_flush_at: Optional[datetime] = None
+        self._last_batch_lag_ms: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+    # ========== Producer side ==========
+
+    def enqueue(self, product_ids: Iterable[str]):
+        now = time.monotonic()
+        with self._cond:
+            for product_id in product_ids:
+                if product_id and product_id not in self._pending:
+                    self._pending[product_id] = _PendingChange(now)
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+
+    def add_flush_listener(self, callback):
+        """callback(product_ids) runs after every successful flush"""
+        self._flush_listeners.append(callback)
+
+    # ========== Worker lifecycle ==========
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="es-sync-worker", daemon=True)
+        self._thread.start()
+        logger.info("ES sync worker started")
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the worker after a final flush of whatever is pending"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info("ES sync worker stopped")
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if batch:
+                self.flush(batch)
+
+    def _next_batch(self) -> Optional[Dict[str, _PendingChange]]:
+        """Block until a batch is due; None means shut down"""
+        with self._cond:
+            while not self._pending and not self._stopping:
+                self._cond.wait()
+
+            if self._stopping and not self._pending:
+                return None
+
+            if not self._stopping and len(self._pending) < self.max_batch:
+                self._cond.wait(self.flush_interval)
+
+            now = time.monotonic()
+            batch: Dict[str, _PendingChange] = {}
+            for product_id, change in list(self._pending.items()):
+                if len(batch) >= self.max_batch:
+                    break
+                if change.not_before <= now or self._stopping:
+                    batch[product_id] = self._pending.pop(product_id)
+
+            if not batch and not self._stopping:
+                # Only backed-off retries are waiting
+                next_due = min(c.not_before for c in self._pending.values())
+                self._cond.wait(max(0.0, next_due - now))
+
+            self._in_flight = len(batch)
+            return batch
+
+    # ========== Flushing ==========
+
+    def flush(self, batch: Dict[str, _PendingChange]):
+        """Load the batch from Postgres and push it through _bulk"""
+        failed_ids: List[str] = []
+        try:
+            actions = self._build_actions(list(batch.keys()))
+            # wait_for: the changes are searchable before the flush listeners
+            # bump the search cache generation
+            for ok, info in helpers.streaming_bulk(
+                es_client,
+                actions,
+                chunk_size=self.max_batch,
+                raise_on_error=False,
+                raise_on_exception=False,
+                refresh="wait_for"
+            ):
+                op, result = next(iter(info.items()))
+                if not ok and not (op == "delete" and result.get("status") == 404):
+                    failed_ids.append(result.get("_id"))
+                    self._last_error = str(result.get("error"))
+        except Exception as e:
+            logger.error(f"ES sync flush failed: {e}")
+            self._last_error = str(e)
+            failed_ids = list(batch.keys())
+
+        failed = set(failed_ids)
+        succeeded = [pid for pid in batch if pid not in failed]
+        self._record_flush(batch, succeeded, failed_ids)
+
+        if succeeded:
+            for callback in self._flush_listeners:
+                try:
+                    callback(succeeded)
+                except Exception as e:
+                    logger.error(f"ES sync flush listener failed: {e}")
+
+    def _build_actions(self, product_ids: List[str]) -> List[dict]:
+        db = SessionLocal()
+        try:
+            products = db.query(Product).options(
+                selectinload(Product.brand),
+                selectinload(Product.category),
+                selectinload(Product.tags),
+                selectinload(Product.images)
+            ).filter(Product.id.in_(product_ids)).all()
+
+            actions = [product_to_action(p, PRODUCT_INDEX) for p in products]
+            found = {p.id for p in products}
+        finally:
+            db.close()
+
+        # Hard-deleted rows no longer exist in Postgres
+        actions.extend(
+            {"_op_type": "delete", "_index": PRODUCT_INDEX, "_id": pid}
+            for pid in product_ids if pid not in found
+        )
+        return actions
+
+    def _record_flush(self, batch: Dict[str, _PendingChange], succeeded: List[str], failed_ids: List[str]):
+        now = time.monotonic()
+        with self._cond:
+            self._in_flight = 0
+            self._flushed_total += len(succeeded)
+            self._last_flush_at = datetime.now(timezone.utc)
+            if succeeded:
+                oldest = min(batch[pid].enqueued_at for pid in succeeded)
+                self._last_batch_lag_ms = round((now - oldest) * 1000, 1)
+
+            for product_id in failed_ids:
+                change = batch.get(product_id)
+                if change is None:
+                    continue
+                self._failed_total += 1
+                change.attempts += 1
+
+                if change.attempts > self.max_retries:
+                    self._dropped_total += 1
+                    logger.error(
+                        f"ES sync gave up on product {product_id} after {change.attempts} attempts")
+                    continue
+
+                backoff = min(self.retry_backoff * 2 ** (change.attempts - 1),
+                              self.max_backoff)
+                change.not_before = now + backoff
+                self._retried_total += 1
+                # A newer change for the same id supersedes the retry
+                self._pending.setdefault(product_id, change)
+
+    # ========== Metrics ==========
+
+    def metrics(self) -> dict:
+        now = time.monotonic()
+        with self._cond:
+            oldest = min((c.enqueued_at for c in self._pending.values()), default=None)
+            return {
+                "queue_depth": len(self._pending),
+                "in_flight": self._in_flight,
+                "oldest_pending_age_ms": round((now - oldest) * 1000, 1) if oldest is not None else 0,
+                "last_batch_lag_ms": self._last_batch_lag_ms,
+                "flushed_total": self._flushed_total,
+                "failed_total": self._failed_total,
+                "retried_total": self._retried_total,
+                "dropped_total": self._dropped_total,
+                "last_flush_at": self._last_flush_at,
+                "last_error": self._last_error,
+                "worker_alive": bool(self._thread and self._thread.is_alive()),
+            }
+
+
+product_sync_queue = ProductSyncQueue(
+    flush_interval_ms=settings.ES_SYNC_FLUSH_INTERVAL_MS,
+    max_batch=settings.ES_SYNC_MAX_BATCH,
+    max_retries=settings.ES_SYNC_MAX_RETRIES,
+    retry_backoff_ms=settings.ES_SYNC_RETRY_BACKOFF_MS
+)
@@ -2,12 +2,13 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+import asyncio
 import time
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from app.elastic.controller import init_elasticsearch
+from app.elastic.controller import init_elasticsearch, close_elasticsearch
 from app.core.config import settings, close_checkpointer
-from app.routes import auth, account, users, role, brands, categories, products, tags, carts, orders, chat, media, chat_streaming, notifications, wishlist, reviews, analytics, payment, documents, recommendation
+from app.routes import auth, account, users, role, brands, categories, products, tags, carts, orders, chat, media, chat_streaming, notifications, wishlist, reviews, analytics, payment, documents, recommendation, search
 from app.utils.exceptions import (
     http_exception_handler,
     validation_exception_handler,
@@ -18,6 +19,10 @@ from app.utils.exceptions import (
 from app.agent.mcp_manager import mcp_manager
 from app.agent.agent import get_unified_agent
 from app.core.redis_rate_limit_middleware import RedisRateLimitMiddleware
+from app.core.cache import cache
+from app.core.redis_client import close_async_redis
+from app.services.stock import run_reservation_sweeper
+from app.services.cart_store import cart_store, run_cart_flusher
 import logging
 
 logging.basicConfig(
@@ -30,12 +35,22 @@ load_dotenv()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    cache.start_listener()
+    reservation_sweeper = asyncio.create_task(run_reservation_sweeper())
+    cart_flusher = asyncio.create_task(run_cart_flusher())
     await init_elasticsearch()
     await mcp_manager.get_all_tools()
     await get_unified_agent()
     yield
 
     print("Server Shutting down...")
+    reservation_sweeper.cancel()
+    cart_flusher.cancel()
+    if cart_store.enabled:
+        await asyncio.to_thread(cart_store.drain)
+    await close_elasticsearch()
+    cache.stop_listener()
+    await close_async_redis()
     await mcp_manager.close()
     await close_checkpointer()
 
@@ -106,6 +121,7 @@ app.include_router(analytics.router)
 app.include_router(payment.router)
 app.include_router(documents.router)
 app.include_router(recommendation.router)
+app.include_router(search.router)
 
 
 @app.get("/")
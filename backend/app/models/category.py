@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, Integer, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
@@ -20,6 +20,9 @@ class Category(Base, AuditMixin):
     image_url = Column(String(500), nullable=True)
     display_order = Column(Integer, default=0)
     is_active = Column(Boolean, default=True, nullable=False, index=True)
+    # Materialized path "/<root id>/.../<own id>/": a subtree is every row
+    # whose path starts with the node's path
+    path = Column(String(1000), nullable=True)
 
     # Self-referential relationship (parent-child)
     parent = relationship("Category", remote_side=[id], backref="children")
@@ -27,5 +30,10 @@ class Category(Base, AuditMixin):
     # Relationships
     products = relationship("Product", back_populates="category")
 
+    __table_args__ = (
+        # text_pattern_ops lets LIKE 'prefix%' use the index
+        Index("ix_categories_path", "path", postgresql_ops={"path": "text_pattern_ops"}),
+    )
+
     def __repr__(self):
         return f"<Category {self.name}>"
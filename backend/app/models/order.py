@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Numeric, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Numeric, Text, ForeignKey, DateTime
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
@@ -34,6 +34,9 @@ class Order(Base, TimestampMixin):
     shipping_address = Column(JSONB, nullable=True)
     notes = Column(Text, nullable=True)
 
+    # Unpaid online orders give their stock back after this time
+    reservation_expires_at = Column(DateTime, nullable=True, index=True)
+
     # Relationships
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order",
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, String, Text, Boolean, Integer, Numeric, ForeignKey, Table, ARRAY, DateTime
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from decimal import Decimal
 from datetime import datetime, timezone
 from app.db.database import Base
@@ -84,6 +84,9 @@ class Product(Base, AuditMixin):
     wishlists = relationship("Wishlist", back_populates="product")
     product_views = relationship("ProductView", back_populates="product")
 
+    # Filled only by list queries (with_expression), see products/loading.py
+    primary_image_url = query_expression()
+
     def __repr__(self):
         return f"<Product {self.name}>"
 
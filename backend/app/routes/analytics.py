@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import date
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.schemas.analytics.requests import AnalyticsPeriod, DateRangeParams
 from app.schemas.analytics.responses import (
     OverviewResponse,
@@ -38,7 +38,7 @@ def get_overview(
     end_date: Optional[date] = Query(
         None, description="Custom range end (YYYY-MM-DD). Overrides period."),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission()),
+    current_user: Principal = Depends(require_permission()),
 ):
     """
     KPI overview cards: Revenue, Orders, New Customers, Avg Order Value.
@@ -55,7 +55,7 @@ def get_revenue(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission()),
+    current_user: Principal = Depends(require_permission()),
 ):
     """
     Revenue analytics with daily trend line (excludes cancelled orders).
@@ -72,7 +72,7 @@ def get_orders(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission()),
+    current_user: Principal = Depends(require_permission()),
 ):
     """
     Order analytics: daily trend, breakdown by status (pie chart),
@@ -91,7 +91,7 @@ def get_top_selling_products(
     limit: int = Query(
         10, ge=1, le=50, description="Max number of products to return"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission()),
+    current_user: Principal = Depends(require_permission()),
 ):
     """
     Top N selling products ranked by units sold within the period.
@@ -106,7 +106,7 @@ def get_low_stock_products(
     threshold: int = Query(10, ge=0, description="Stock quantity threshold"),
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission()),
+    current_user: Principal = Depends(require_permission()),
 ):
     """
     Products at or below the stock threshold, sorted by quantity ascending.
@@ -124,7 +124,7 @@ def get_customers(
     top_limit: int = Query(
         10, ge=1, le=50, description="Number of top spenders to return"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission()),
+    current_user: Principal = Depends(require_permission()),
 ):
     """
     Customer analytics: total, new vs returning, daily growth trend,
@@ -141,7 +141,7 @@ def get_category_revenue(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission()),
+    current_user: Principal = Depends(require_permission()),
 ):
     """
     Revenue breakdown by product category (pie / donut chart data).
@@ -158,7 +158,7 @@ def get_brand_revenue(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission()),
+    current_user: Principal = Depends(require_permission()),
 ):
     """
     Revenue breakdown by brand (horizontal bar chart data).
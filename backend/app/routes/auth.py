@@ -4,7 +4,7 @@ from app.db.database import get_db
 from app.schemas.auth import *
 from app.services.auth import AuthService
 from app.utils.deps import get_current_active_user
-from app.models.user import User
+from app.utils.principal import Principal
 from app.core.config import settings
 from app.utils.responses import ResponseHandler
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -99,7 +99,7 @@ def forgot_password(
 @router.post("/2fa/setup")
 def setup_2fa(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Setup 2FA - generates TOTP secret and QR code URI"""
     return AuthService.setup_2fa(db, current_user.id)
@@ -109,7 +109,7 @@ def setup_2fa(
 def enable_2fa(
     data: Enable2FARequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Enable 2FA after verifying TOTP code"""
     return AuthService.enable_2fa(db, current_user.id, data.totp_code)
@@ -119,7 +119,7 @@ def enable_2fa(
 def disable_2fa(
     data: Disable2FARequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Disable 2FA using TOTP or OTP verification"""
     return AuthService.disable_2fa(
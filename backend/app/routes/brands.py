@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import require_permission
 from app.services.brands import BrandService
 from app.schemas.brands import (
@@ -33,7 +33,7 @@ def get_all_brands(
 @router.get("/stats", response_model=BrandStatsResponse)
 def get_brand_statistics(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Get brand statistics (Admin only)
@@ -57,7 +57,7 @@ def get_brand_detail(
 def create_brand(
     data: BrandCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Create new brand (Admin only)
@@ -70,7 +70,7 @@ def update_brand(
     brand_id: str,
     data: BrandUpdateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Update brand (Admin only)
@@ -82,7 +82,7 @@ def update_brand(
 def delete_brand(
     brand_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Delete brand (Admin only)
@@ -95,7 +95,7 @@ def delete_brand(
 def toggle_brand_status(
     brand_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Toggle brand active/inactive status (Admin only)
@@ -1,8 +1,10 @@
+from typing import Optional
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
+from app.core.idempotency import idempotency_key_header
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import get_current_user
 from app.services.carts import CartService
 from app.schemas.carts import AddToCartRequest, UpdateCartItemRequest, CartResponse
@@ -14,7 +16,7 @@ router = APIRouter(prefix="/cart", tags=["Cart"])
 @router.get("", response_model=APIResponse[CartResponse])
 def get_cart(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get user's cart"""
     return CartService.get_cart(db, current_user.id)
@@ -24,7 +26,8 @@ def get_cart(
 def add_to_cart(
     data: AddToCartRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
 ):
     """Add item to cart"""
     return CartService.add_to_cart(
@@ -32,7 +35,8 @@ def add_to_cart(
         current_user.id,
         data.product_id,
         data.variant_id,
-        data.quantity
+        data.quantity,
+        idempotency_key=idempotency_key
     )
 
 
@@ -41,26 +45,32 @@ def update_cart_item(
     item_id: str,
     data: UpdateCartItemRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
 ):
     """Update cart item quantity"""
-    return CartService.update_cart_item(db, current_user.id, item_id, data.quantity)
+    return CartService.update_cart_item(
+        db, current_user.id, item_id, data.quantity, idempotency_key=idempotency_key)
 
 
 @router.delete("/items/{item_id}", response_model=APIResponse[CartResponse])
 def remove_cart_item(
     item_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
 ):
     """Remove item from cart"""
-    return CartService.remove_cart_item(db, current_user.id, item_id)
+    return CartService.remove_cart_item(
+        db, current_user.id, item_id, idempotency_key=idempotency_key)
 
 
 @router.delete("", response_model=APIResponse[CartResponse])
 def clear_cart(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
 ):
     """Clear all items from cart"""
-    return CartService.clear_cart(db, current_user.id)
+    return CartService.clear_cart(
+        db, current_user.id, idempotency_key=idempotency_key)
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import require_permission
 from app.services.categories import CategoryService
 from app.schemas.categories import (
@@ -48,7 +48,7 @@ def get_category_tree(
 @router.get("/stats", response_model=CategoryStatsResponse)
 def get_category_statistics(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Get category statistics (Admin only)
@@ -72,7 +72,7 @@ def get_category_detail(
 def create_category(
     data: CategoryCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Create new category (Admin only)
@@ -85,7 +85,7 @@ def update_category(
     category_id: str,
     data: CategoryUpdateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Update category (Admin only)
@@ -97,7 +97,7 @@ def update_category(
 def delete_category(
     category_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Delete category (Admin only)
@@ -110,7 +110,7 @@ def delete_category(
 def toggle_category_status(
     category_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Toggle category active/inactive status (Admin only)
@@ -123,7 +123,7 @@ def move_category(
     category_id: str,
     data: CategoryMoveRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Move category to different parent (Admin only)
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Query, Header
 from sqlalchemy.orm import Session
 from typing import Tuple
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import get_current_user, get_current_user_with_token
 from app.agent.chat_service import ChatService
 from app.schemas.chat import ChatRequest, ChatResponse
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/chat", tags=["AI Chat"])
 @router.post("", response_model=APIResponse[ChatResponse])
 async def send_message(
     data: ChatRequest,
-    user_and_token: Tuple[User, str] = Depends(get_current_user_with_token),
+    user_and_token: Tuple[Principal, str] = Depends(get_current_user_with_token),
     db: Session = Depends(get_db),
 ):
     """
@@ -40,7 +40,7 @@ def get_conversations(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get user's conversation list"""
     return ChatService.get_conversations(db, current_user.id, page, limit)
@@ -50,7 +50,7 @@ def get_conversations(
 def get_conversation_detail(
     conversation_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get conversation with all messages"""
     return ChatService.get_conversation_detail(db, current_user.id, conversation_id)
@@ -60,7 +60,7 @@ def get_conversation_detail(
 def delete_conversation(
     conversation_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete a conversation"""
     return ChatService.delete_conversation(db, current_user.id, conversation_id)
@@ -3,7 +3,7 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Tuple
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.models.conversation import Conversation
 from app.utils.deps import get_current_user_with_token
 from app.schemas.chat import ChatRequest
@@ -18,7 +18,7 @@ router = APIRouter(prefix="/chat", tags=["Chat Streaming"])
 async def stream_message(
     conversation_id: str,
     data: ChatRequest,
-    user_and_token: Tuple[User, str] = Depends(get_current_user_with_token),
+    user_and_token: Tuple[Principal, str] = Depends(get_current_user_with_token),
     db: Session = Depends(get_db)
 ):
     user, token = user_and_token
@@ -61,7 +61,7 @@ async def stream_message(
 @router.post("/messages/stream")
 async def stream_new_conversation(
     data: ChatRequest,
-    user_and_token: Tuple[User, str] = Depends(get_current_user_with_token),
+    user_and_token: Tuple[Principal, str] = Depends(get_current_user_with_token),
     db: Session = Depends(get_db)
 ):
     user, token = user_and_token
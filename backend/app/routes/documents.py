@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
-from app.models.user import User
+from app.utils.principal import Principal
 from app.services.document import DocumentService
 from app.schemas.documents.requests import UploadDocumentRequest, FAQSearchRequest
 from app.schemas.documents.responses import (
@@ -24,7 +24,7 @@ async def upload_document(
     title: str = Form(...),
     description: Optional[str] = Form(None),
     document_group_id: Optional[UUID] = Form(None),
-    current_user: User = Depends(require_permission),
+    current_user: Principal = Depends(require_permission),
     db: Session = Depends(get_db)
 ):
     """
@@ -56,7 +56,7 @@ async def upload_document(
 
 @router.get("", response_model=DocumentListResponse)
 def get_all_documents(
-    current_user: User = Depends(require_permission),
+    current_user: Principal = Depends(require_permission),
     db: Session = Depends(get_db)
 ):
     """List all active documents (admin view)."""
@@ -66,7 +66,7 @@ def get_all_documents(
 @router.delete("/{document_id}")
 def delete_document(
     document_id: UUID,
-    current_user: User = Depends(require_permission),
+    current_user: Principal = Depends(require_permission),
     db: Session = Depends(get_db)
 ):
     """Deactivate a document and all its chunks."""
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Body
 from typing import List
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import require_permission
 from app.services.media import media_service
 from app.schemas.media import (
@@ -22,7 +22,7 @@ async def upload_files(
         ...,
         description="Multiple files (max 100, each max 5MB)"
     ),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
 
     return await media_service.upload_files(files)
@@ -31,7 +31,7 @@ async def upload_files(
 @router.post("/images/upload/presigned-url", response_model=PresignedUploadFileResponse)
 async def create_presigned_url(
     body: PresignedUploadFileRequest,
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return media_service.get_presigned_url(
         filename=body.filename,
@@ -42,7 +42,7 @@ async def create_presigned_url(
 @router.delete("/file")
 async def delete_file(
     file_url: str = Body(..., embed=True, description="Full S3 URL"),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
 
     # Extract S3 key from URL
@@ -61,6 +61,6 @@ async def delete_file(
 @router.post("/images/upload/presigned-urls", response_model=PresignedUploadFilesResponse)
 async def create_presigned_urls(
     body: PresignedUploadFilesRequest,
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return media_service.get_presigned_urls(body.files)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Query, Path, WebSocket
 from sqlalchemy.orm import Session
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import get_current_user, require_permission
 from app.services.notifications import NotificationService
 from app.schemas.notifications import (
@@ -24,7 +24,7 @@ def get_my_notifications(
     limit: int = Query(20, ge=1, le=50),
     unread_only: bool = Query(False),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return NotificationService.get_user_notifications(db, current_user.id, page, limit, unread_only)
 
@@ -32,24 +32,24 @@ def get_my_notifications(
 @router.get("/stats", response_model=NotificationStatsResponse)
 def get_my_notification_stats(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return NotificationService.get_notification_stats(db, current_user.id)
 
 
 @router.post("/ws-ticket", response_model=WsTicketResponse)
-def create_ws_ticket(
+async def create_ws_ticket(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    return NotificationService.create_ws_ticket(db, current_user.id)
+    return await NotificationService.create_ws_ticket(db, current_user.id)
 
 
 @router.post("/mark-read", response_model=MessageResponse)
 def mark_notifications_as_read(
     data: MarkAsReadRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return NotificationService.mark_as_read(db, current_user.id, data)
 
@@ -57,7 +57,7 @@ def mark_notifications_as_read(
 @router.post("/mark-all-read", response_model=MessageResponse)
 def mark_all_as_read(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return NotificationService.mark_all_as_read(db, current_user.id)
 
@@ -66,7 +66,7 @@ def mark_all_as_read(
 def delete_notification(
     notification_id: str = Path(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return NotificationService.delete_notification(db, current_user.id, notification_id)
 
@@ -74,7 +74,7 @@ def delete_notification(
 @router.delete("/clear/read", response_model=MessageResponse)
 def delete_all_read_notifications(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return NotificationService.delete_all_read(db, current_user.id)
 
@@ -83,7 +83,7 @@ def delete_all_read_notifications(
 async def create_notification(
     data: NotificationCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return await NotificationService.create_notification(db, data)
 
@@ -92,13 +92,13 @@ async def create_notification(
 async def broadcast_notification(
     data: BroadcastNotificationRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return await NotificationService.broadcast_notification(db, data)
 
 
 @router.get("/admin/online-users")
-def get_online_users(current_user: User = Depends(require_permission())):
+def get_online_users(current_user: Principal = Depends(require_permission())):
     return NotificationService.get_online_users()
 
 
@@ -106,7 +106,7 @@ def get_online_users(current_user: User = Depends(require_permission())):
 def get_user_connection_status(
     db: Session = Depends(get_db),
     user_id: str = Path(...),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return NotificationService.get_user_connection_status(db, user_id)
 
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, Query, BackgroundTasks
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from app.core.idempotency import idempotency_key_header
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import get_current_user, require_permission
 from app.services.oders import OrderService
 from app.schemas.orders import (
@@ -22,12 +23,14 @@ def create_order(
     data: CreateOrderRequest,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
 ):
     """
     Create order from cart
 
-    Customer endpoint - Creates order and clears cart
+    Customer endpoint - Creates order and clears cart. Retries sent with
+    the same Idempotency-Key header get the first response back.
     """
     return OrderService.create_order(
         db,
@@ -36,6 +39,7 @@ def create_order(
         data.payment_method,
         background_tasks,
         data.notes,
+        idempotency_key=idempotency_key
     )
 
 
@@ -44,7 +48,7 @@ def get_my_orders(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get my orders
@@ -60,7 +64,7 @@ def get_all_orders_admin(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Get all orders (Admin)
@@ -73,7 +77,7 @@ def get_all_orders_admin(
 @router.get("/stats", response_model=APIResponse[OrderStatsResponse])
 def get_order_stats_admin(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Get order statistics (Admin)
@@ -87,7 +91,7 @@ def get_order_stats_admin(
 def get_order_detail(
     order_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get order detail
@@ -101,7 +105,7 @@ def get_order_detail(
 def get_order_detail_admin(
     order_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Get order detail (Admin)
@@ -115,7 +119,7 @@ def get_order_detail_admin(
 def cancel_order(
     order_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Cancel order
@@ -130,7 +134,7 @@ def update_order_status_admin(
     order_id: str,
     data: UpdateOrderStatusRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Update order status (Admin)
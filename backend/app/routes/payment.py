@@ -1,8 +1,10 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
+from app.core.idempotency import idempotency_key_header
 from app.db.database import get_db
 from app.services.payment import VNPayService
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import get_current_user
 from app.schemas.payment import (
     CreatePaymentRequest,
@@ -18,7 +20,8 @@ router = APIRouter(prefix="/payment", tags=["Payment"])
 def create_vnpay_payment(
     payload: CreatePaymentRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
 ):
     """
     Create VNPay payment URL
@@ -29,7 +32,8 @@ def create_vnpay_payment(
         db=db,
         order_id=payload.order_id,
         bank_code=payload.bank_code,
-        language=payload.language
+        language=payload.language,
+        idempotency_key=idempotency_key
     )
 
 
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.schemas.common import APIResponse
+from app.core.json_response import schema_response
 from app.utils.deps import require_permission
 from app.services.products import (
     ProductService,
@@ -36,7 +37,7 @@ router = APIRouter(prefix="/products", tags=["Products"])
 
 # ========== Main Product CRUD ==========
 @router.get("/search")
-def search_api(
+async def search_api(
     q: Optional[str] = Query(
         None, description="Từ khóa tìm kiếm (VD: kem chống nắng da dầu)"),
     min_price: Optional[float] = None,
@@ -47,15 +48,27 @@ def search_api(
     concerns: Optional[List[str]] = Query(None, description="Skin concerns"),
     benefits: Optional[List[str]] = Query(None, description="Benefits"),
     tags: Optional[List[str]] = Query(None, description="Tags"),
+    category_id: Optional[str] = Query(
+        None, description="Category id, including its subcategories"),
     is_available: Optional[bool] = Query(
         True, description="Only available products"),
+    facets: bool = Query(
+        False, description="Include facet counts and price histogram"),
+    price_interval: Optional[float] = Query(
+        None, gt=0, description="Price histogram bucket width"),
+    pagination: Literal["page", "cursor"] = Query(
+        "page", description="page: from/size, cursor: search_after"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous response"),
+    pit: bool = Query(
+        False, description="Pin cursor pagination to a point-in-time snapshot"),
     page: int = 1,
     limit: int = 20
 ):
     """
     API tìm kiếm thông minh bằng Elasticsearch
     """
-    return ProductService.search_products_with_es(
+    return await ProductService.search_products_with_es(
         keyword=q,
         min_price=min_price,
         max_price=max_price,
@@ -65,7 +78,13 @@ def search_api(
         concerns=concerns,
         benefits=benefits,
         tags=tags,
+        category_id=category_id,
         is_available=is_available,
+        include_facets=facets,
+        price_interval=price_interval,
+        cursor=cursor,
+        cursor_mode=pagination == "cursor",
+        use_pit=pit,
         page=page,
         limit=limit
     )
@@ -82,14 +101,19 @@ def get_all_products(
     """
     page = filters.pop('page')
     limit = filters.pop('limit')
+    cursor_mode = filters.pop('pagination') == "cursor"
+    cursor = filters.pop('cursor')
+    include_total = filters.pop('include_total')
 
-    return ProductService.get_all_products(db, filters, page, limit)
+    return schema_response(ProductListResponse, ProductService.get_all_products(
+        db, filters, page, limit,
+        cursor=cursor, cursor_mode=cursor_mode, include_total=include_total))
 
 
 @router.get("/stats", response_model=ProductStatsResponse)
 def get_product_statistics(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Get product statistics (Admin only)"""
     return ProductService.get_product_stats(db)
@@ -101,7 +125,7 @@ def update_product_stock(
     product_id: str,
     data: UpdateStockRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Update product stock quantity (Admin only)"""
     return ProductService.update_stock(db, product_id, data, current_user.id)
@@ -111,7 +135,7 @@ def update_product_stock(
 def get_low_stock_products(
     threshold: int = Query(10, ge=1),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Get products with low stock (Admin only)"""
     return ProductStockService.get_low_stock(db, threshold)
@@ -120,7 +144,7 @@ def get_low_stock_products(
 @router.get("/out-of-stock", response_model=ProductListResponse)
 def get_out_of_stock_products(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Get out of stock products (Admin only)"""
     return ProductStockService.get_out_of_stock(db)
@@ -133,7 +157,7 @@ def get_featured_products(
     db: Session = Depends(get_db)
 ):
     """Get featured products - Public endpoint"""
-    return ProductDiscoveryService.get_featured(db, limit)
+    return schema_response(APIResponse[List[ProductListItem]], ProductDiscoveryService.get_featured(db, limit))
 
 
 @router.get("/trending", response_model=APIResponse[List[ProductListItem]])
@@ -143,7 +167,7 @@ def get_trending_products(
     db: Session = Depends(get_db)
 ):
     """Get trending products - Public endpoint"""
-    return ProductDiscoveryService.get_trending(db, days, limit)
+    return schema_response(APIResponse[List[ProductListItem]], ProductDiscoveryService.get_trending(db, days, limit))
 
 
 @router.get("/new-arrivals", response_model=APIResponse[List[ProductListItem]])
@@ -151,10 +175,18 @@ def get_new_arrivals(
     days: int = Query(30, ge=1, le=90),
     limit: int = Query(10, ge=1, le=50),
     page: int = Query(1, ge=1),
+    pagination: Literal["page", "cursor"] = Query(
+        "page", description="page: OFFSET, cursor: keyset pagination"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous response"),
+    include_total: Optional[bool] = Query(
+        None, description="Include total count (default: page mode only)"),
     db: Session = Depends(get_db)
 ):
     """Get new arrival products - Public endpoint"""
-    return ProductDiscoveryService.get_new_arrivals(db, days, limit, page)
+    return schema_response(APIResponse[List[ProductListItem]], ProductDiscoveryService.get_new_arrivals(
+        db, days, limit, page,
+        cursor=cursor, cursor_mode=pagination == "cursor", include_total=include_total))
 
 
 @router.get("/on-sale", response_model=APIResponse[List[ProductListItem]])
@@ -163,7 +195,7 @@ def get_products_on_sale(
     db: Session = Depends(get_db)
 ):
     """Get products on sale - Public endpoint"""
-    return ProductDiscoveryService.get_on_sale(db, limit)
+    return schema_response(APIResponse[List[ProductListItem]], ProductDiscoveryService.get_on_sale(db, limit))
 
 
 @router.get("/by-brand/{brand_slug}", response_model=APIResponse[List[ProductListItem]])
@@ -171,10 +203,18 @@ def get_products_by_brand(
     brand_slug: str,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    pagination: Literal["page", "cursor"] = Query(
+        "page", description="page: OFFSET, cursor: keyset pagination"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous response"),
+    include_total: Optional[bool] = Query(
+        None, description="Include total count (default: page mode only)"),
     db: Session = Depends(get_db)
 ):
     """Get products by brand slug - Public endpoint"""
-    return ProductDiscoveryService.get_by_brand(db, brand_slug, page, limit)
+    return schema_response(APIResponse[List[ProductListItem]], ProductDiscoveryService.get_by_brand(
+        db, brand_slug, page, limit,
+        cursor=cursor, cursor_mode=pagination == "cursor", include_total=include_total))
 
 
 @router.get("/by-category/{category_slug}", response_model=APIResponse[List[ProductListItem]])
@@ -182,10 +222,18 @@ def get_products_by_category(
     category_slug: str,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    pagination: Literal["page", "cursor"] = Query(
+        "page", description="page: OFFSET, cursor: keyset pagination"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous response"),
+    include_total: Optional[bool] = Query(
+        None, description="Include total count (default: page mode only)"),
     db: Session = Depends(get_db)
 ):
     """Get products by category slug - Public endpoint"""
-    return ProductDiscoveryService.get_by_category(db, category_slug, page, limit)
+    return schema_response(APIResponse[List[ProductListItem]], ProductDiscoveryService.get_by_category(
+        db, category_slug, page, limit,
+        cursor=cursor, cursor_mode=pagination == "cursor", include_total=include_total))
 
 
 @router.get("/{product_id}/related", response_model=APIResponse[List[ProductListItem]])
@@ -195,7 +243,7 @@ def get_related_products(
     db: Session = Depends(get_db)
 ):
     """Get related/similar products - Public endpoint"""
-    return ProductDiscoveryService.get_related(db, product_id, limit)
+    return schema_response(APIResponse[List[ProductListItem]], ProductDiscoveryService.get_related(db, product_id, limit))
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
@@ -204,7 +252,7 @@ def get_product_detail(
     db: Session = Depends(get_db)
 ):
     """Get product detail by ID - Public endpoint"""
-    return ProductService.get_product_by_id(db, product_id)
+    return schema_response(ProductResponse, ProductService.get_product_by_id(db, product_id))
 
 
 @router.get("/{product_slug}/slug", response_model=ProductResponse)
@@ -213,14 +261,14 @@ def get_product_detail_by_slug(
     db: Session = Depends(get_db)
 ):
     """Get product detail by SLUG - Public endpoint"""
-    return ProductService.get_product_by_slug(db, product_slug)
+    return schema_response(ProductResponse, ProductService.get_product_by_slug(db, product_slug))
 
 
 @router.post("", response_model=ProductResponse, status_code=201)
 def create_product(
     data: ProductCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Create new product (Admin only)"""
     return ProductService.create_product(db, data, current_user.id)
@@ -231,7 +279,7 @@ def update_product(
     product_id: str,
     data: ProductUpdateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Update product (Admin only)"""
     return ProductService.update_product(db, product_id, data, current_user.id)
@@ -241,7 +289,7 @@ def update_product(
 def delete_product(
     product_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Delete product (Admin only)"""
     return ProductService.delete_product(db, product_id, current_user.id)
@@ -251,7 +299,7 @@ def delete_product(
 def toggle_product_availability(
     product_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Toggle product availability (Admin only)"""
     return ProductService.toggle_availability(db, product_id, current_user.id)
@@ -261,7 +309,7 @@ def toggle_product_availability(
 def toggle_product_featured(
     product_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Toggle product featured status (Admin only)"""
     return ProductService.toggle_featured(db, product_id, current_user.id)
@@ -273,7 +321,7 @@ def add_tags_to_product(
     product_id: str,
     data: AddTagsRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Add tags to product (Admin only)"""
     return ProductService.add_tags(db, product_id, data)
@@ -284,7 +332,7 @@ def remove_tag_from_product(
     product_id: str,
     tag_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Remove tag from product (Admin only)"""
     return ProductService.remove_tag(db, product_id, tag_id)
@@ -296,7 +344,7 @@ def add_product_image(
     product_id: str,
     data: ProductImageCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Add image to product (Admin only)"""
     return ProductImageService.add_image(db, product_id, data)
@@ -308,7 +356,7 @@ def update_product_image(
     image_id: str,
     data: ProductImageUpdateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Update product image (Admin only)"""
     return ProductImageService.update_image(db, product_id, image_id, data)
@@ -319,7 +367,7 @@ def delete_product_image(
     product_id: str,
     image_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Delete product image (Admin only)"""
     return ProductImageService.delete_image(db, product_id, image_id)
@@ -340,7 +388,7 @@ def add_product_variant(
     product_id: str,
     data: ProductVariantCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Add variant to product (Admin only)"""
     return ProductVariantService.add_variant(db, product_id, data, current_user.id)
@@ -352,7 +400,7 @@ def update_product_variant(
     variant_id: str,
     data: ProductVariantUpdateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Update product variant (Admin only)"""
     return ProductVariantService.update_variant(db, product_id, variant_id, data, current_user.id)
@@ -363,7 +411,7 @@ def delete_product_variant(
     product_id: str,
     variant_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Delete product variant (Admin only)"""
     return ProductVariantService.delete_variant(db, product_id, variant_id, current_user.id)
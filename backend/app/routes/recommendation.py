@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from typing import Tuple
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import get_current_user_with_token
 from app.services.recommendation import RecommendationService
 
@@ -17,7 +17,7 @@ def recommend_from_history(
         5, ge=1, le=10, description="Related products per source product"),
     max_results: int = Query(
         10, ge=1, le=20, description="Max products to return"),
-    user_and_token: Tuple[User, str] = Depends(get_current_user_with_token),
+    user_and_token: Tuple[Principal, str] = Depends(get_current_user_with_token),
     db: Session = Depends(get_db),
 ):
     """
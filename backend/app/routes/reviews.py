@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import get_current_user
 from app.services.reviews import ReviewService
 from app.schemas.common import APIResponse, MessageResponse
@@ -23,7 +23,7 @@ def create_review(
     product_id: str,
     data: CreateReviewRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return ReviewService.create_review(db, current_user.id, product_id, data)
 
@@ -51,7 +51,7 @@ def update_review(
     review_id: str,
     data: UpdateReviewRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return ReviewService.update_review(db, current_user.id, review_id, data)
 
@@ -60,7 +60,7 @@ def update_review(
 def delete_review(
     review_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return ReviewService.delete_review(db, current_user.id, review_id)
 
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Query, Path
 from sqlalchemy.orm import Session
 from typing import Optional, Union
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import require_permission
 from app.services.role import RoleService, PermissionService
 from app.schemas.roles import (
@@ -35,7 +35,7 @@ def get_all_roles(
     include_permissions: bool = Query(
         False, description="Include permissions in response"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return RoleService.get_all_roles(
         db=db,
@@ -50,7 +50,7 @@ def get_all_roles(
 @router.get("/stats", response_model=RoleStatsResponse)
 def get_role_statistics(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return RoleService.get_role_stats(db)
 
@@ -59,7 +59,7 @@ def get_role_statistics(
 def get_role_by_id(
     role_id: str = Path(..., description="Role ID"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return RoleService.get_role_by_id(db, role_id)
 
@@ -68,7 +68,7 @@ def get_role_by_id(
 def create_role(
     data: RoleCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return RoleService.create_role(db, data, current_user.id)
 
@@ -78,7 +78,7 @@ def update_role(
     role_id: str = Path(..., description="Role ID"),
     data: RoleUpdateRequest = ...,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return RoleService.update_role(db, role_id, data, current_user.id)
 
@@ -87,7 +87,7 @@ def update_role(
 def delete_role(
     role_id: str = Path(..., description="Role ID"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return RoleService.delete_role(db, role_id, current_user.id)
 
@@ -97,7 +97,7 @@ def assign_permissions_to_role(
     role_id: str = Path(..., description="Role ID"),
     data: AssignPermissionsRequest = ...,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return RoleService.assign_permissions(db, role_id, data, current_user.id)
 
@@ -107,7 +107,7 @@ def remove_permissions_from_role(
     role_id: str = Path(..., description="Role ID"),
     data: RemovePermissionsRequest = ...,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return RoleService.remove_permissions(db, role_id, data, current_user.id)
 
@@ -122,7 +122,7 @@ def get_all_permissions(
     method: Optional[str] = Query(
         None, description="Filter by HTTP method (GET, POST, PUT, DELETE, PATCH)"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return PermissionService.get_all_permissions(
         db=db,
@@ -137,7 +137,7 @@ def get_all_permissions(
 @router.get("/permissions/grouped")
 def get_permissions_by_module(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return PermissionService.get_permissions_by_module(db)
 
@@ -146,7 +146,7 @@ def get_permissions_by_module(
 def get_permission_by_id(
     permission_id: str = Path(..., description="Permission ID"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return PermissionService.get_permission_by_id(db, permission_id)
 
@@ -155,7 +155,7 @@ def get_permission_by_id(
 def create_permission(
     data: PermissionCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return PermissionService.create_permission(db, data, current_user.id)
 
@@ -165,7 +165,7 @@ def update_permission(
     permission_id: str = Path(..., description="Permission ID"),
     data: PermissionUpdateRequest = ...,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return PermissionService.update_permission(db, permission_id, data, current_user.id)
 
@@ -174,6 +174,6 @@ def update_permission(
 def delete_permission(
     permission_id: str = Path(..., description="Permission ID"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     return PermissionService.delete_permission(db, permission_id, current_user.id)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from app.utils.principal import Principal
+from app.utils.deps import require_permission
+from app.utils.responses import ResponseHandler
+from app.elastic.sync_queue import product_sync_queue
+from app.elastic.search_cache import search_cache
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/sync/metrics")
+def get_sync_metrics(
+    current_user: Principal = Depends(require_permission())
+):
+    """Elasticsearch sync queue depth and lag (Admin only)"""
+    return ResponseHandler.success(
+        message="Search sync metrics retrieved successfully",
+        data=product_sync_queue.metrics()
+    )
+
+
+@router.get("/cache/metrics")
+def get_cache_metrics(
+    current_user: Principal = Depends(require_permission())
+):
+    """Product search cache hit/miss counters for this worker (Admin only)"""
+    return ResponseHandler.success(
+        message="Search cache metrics retrieved successfully",
+        data=search_cache.metrics()
+    )
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import require_permission
 from app.services.tag import TagService
 from app.schemas.tags import (
@@ -42,7 +42,7 @@ def get_popular_tags(
 @router.get("/stats", response_model=TagStatsResponse)
 def get_tag_statistics(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Get tag statistics (Admin only)
@@ -78,7 +78,7 @@ def get_tag_detail(
 def create_tag(
     data: TagCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Create new tag (Admin only)
@@ -91,7 +91,7 @@ def update_tag(
     tag_id: str,
     data: TagUpdateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Update tag (Admin only)
@@ -103,7 +103,7 @@ def update_tag(
 def delete_tag(
     tag_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Delete tag (Admin only)
@@ -118,7 +118,7 @@ def merge_tags(
     source_tag_id: str = Query(..., description="Tag to merge from"),
     target_tag_id: str = Query(..., description="Tag to merge into"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Merge source tag into target tag (Admin only)
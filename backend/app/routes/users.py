@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, Query, Path
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.schemas.users import UserListResponse, UserDetailResponse, UserCreateRequest, UserUpdateRequest, MessageResponse
@@ -19,7 +19,7 @@ def get_all_users(
     role: Optional[str] = Query(None, description="Filter by role name"),
     status: Optional[str] = Query(None, description="Filter by status"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
    Get list of users with pagination and filters
@@ -36,7 +36,7 @@ def get_all_users(
 @router.get("/stats")
 def get_user_statistics(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Get user statistics
@@ -48,7 +48,7 @@ def get_user_statistics(
 def get_user_by_id(
     user_id: str = Path(..., description="User ID"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Get user details by ID
@@ -60,7 +60,7 @@ def get_user_by_id(
 def create_user(
     data: UserCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Create new user
@@ -73,7 +73,7 @@ def update_user(
     data: UserUpdateRequest,
     user_id: str = Path(..., description="User ID"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Update user information"""
     return UserService.update_user(db, user_id, data, current_user.id)
@@ -83,7 +83,7 @@ def update_user(
 def delete_user(
     user_id: str = Path(..., description="User ID"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """Delete User (soft)"""
     return UserService.delete_user(db, user_id, current_user.id)
@@ -93,7 +93,7 @@ def delete_user(
 def toggle_user_status(
     user_id: str = Path(..., description="User ID"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission())
+    current_user: Principal = Depends(require_permission())
 ):
     """
     Toggle user status (ACTIVE <-> INACTIVE)
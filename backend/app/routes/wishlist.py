@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.database import get_db
-from app.models.user import User
+from app.utils.principal import Principal
 from app.utils.deps import get_current_user
 from app.services.wishlist import WishlistService
 from app.schemas.common import APIResponse, MessageResponse
@@ -17,7 +17,7 @@ def list_wishlist(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return WishlistService.list_items(db, current_user.id, page, limit)
 
@@ -26,7 +26,7 @@ def list_wishlist(
 def add_wishlist_item(
     data: AddWishlistRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return WishlistService.add_item(db, current_user.id, data.product_id)
 
@@ -35,6 +35,6 @@ def add_wishlist_item(
 def remove_wishlist_item(
     product_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return WishlistService.remove_item(db, current_user.id, product_id)
@@ -60,6 +60,7 @@ class CategoryData(BaseModel):
     updated_at: datetime
     product_count: Optional[int] = 0
     children_count: Optional[int] = 0
+    subtree_product_count: Optional[int] = 0
 
     class Config(BaseConfig):
         pass
@@ -76,6 +77,7 @@ class CategoryTreeNode(BaseModel):
     display_order: int
     is_active: bool
     product_count: int
+    subtree_product_count: int = 0
     children: List['CategoryTreeNode'] = []
 
     class Config(BaseConfig):
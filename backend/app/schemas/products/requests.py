@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, model_validator
-from typing import Optional, List
+from typing import Literal, Optional, List
 from decimal import Decimal
 from fastapi import Query
 from app.core.enums import SkinType, SkinConcern, ProductBenefit
@@ -33,7 +33,13 @@ def get_product_filters(
         "created_at", description="Sort by: created_at, price, rating, popularity, name"),
     sort_order: str = Query("desc", description="Sort order: asc or desc"),
     page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(20, ge=1, le=100, description="Items per page")
+    limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    pagination: Literal["page", "cursor"] = Query(
+        "page", description="page: OFFSET, cursor: keyset on sort column + id"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous response"),
+    include_total: Optional[bool] = Query(
+        None, description="Include total count (default: page mode only)")
 ) -> dict:
     """Dependency to extract product filters from query params"""
 
@@ -61,7 +67,10 @@ def get_product_filters(
         "sort_by": sort_by,
         "sort_order": sort_order,
         "page": page,
-        "limit": limit
+        "limit": limit,
+        "pagination": pagination,
+        "cursor": cursor,
+        "include_total": include_total
     }
 
 
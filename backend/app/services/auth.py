@@ -145,7 +145,8 @@ class AuthService:
         # Generate tokens
         access_token = create_access_token({
             "user_id": user.id,
-            "role_id": user.role_id
+            "role_id": user.role_id,
+            "role": user.role.name if user.role else None
         })
 
         refresh_token = create_refresh_token({"user_id": user.id})
@@ -221,7 +222,8 @@ class AuthService:
         # Generate new tokens
         new_access_token = create_access_token({
             "user_id": user.id,
-            "role_id": user.role_id
+            "role_id": user.role_id,
+            "role": user.role.name if user.role else None
         })
 
         new_refresh_token = create_refresh_token({"user_id": user.id})
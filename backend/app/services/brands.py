@@ -8,10 +8,12 @@ from app.models.brand import Brand
 from app.models.product import Product
 from app.utils.responses import ResponseHandler
 from app.utils.serializers import model_to_dict
+from app.core.cache import cached, invalidate
 
 
 class BrandService:
     @staticmethod
+    @cached(key="brands:all:{include_inactive}", tags=["brands", "products"])
     def get_all_brands(db: Session, include_inactive: bool = False):
         """Get all brands"""
 
@@ -89,6 +91,7 @@ class BrandService:
 
         db.add(brand)
         db.commit()
+        invalidate("brands")
         db.refresh(brand)
 
         return ResponseHandler.create_success("Brand", brand.id, brand)
@@ -125,6 +128,7 @@ class BrandService:
         brand.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate("brands")
         db.refresh(brand)
 
         return ResponseHandler.update_success("Brand", brand_id, brand)
@@ -157,6 +161,7 @@ class BrandService:
         brand.deleted_by_id = deleted_by_id
 
         db.commit()
+        invalidate("brands")
 
         return ResponseHandler.delete_success("Brand", brand_id)
 
@@ -177,6 +182,7 @@ class BrandService:
         brand.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate("brands")
         db.refresh(brand)
 
         status = "active" if brand.is_active else "inactive"
@@ -0,0 +1,458 @@
+"""
+Hot copy of each user's cart in Redis, written back to Postgres in the background.
+
+A cart is one hash per user ({prefix}:cart:{user_id}) holding everything the
+cart response needs, with product name, slug, image and price denormalized
+into each line, so reads and mutations don't touch the database:
+
+    meta                              {"id": cart id, "created_at": ...}
+    updated_at                        cart updated_at
+    line:{product_id}:{variant_id|-}  item id of that product / variant
+    item:{item_id}                    line document (JSON)
+    ref:{item_id}                     the line:... field pointing at it
+    qty:{item_id}                     quantity (HINCRBY)
+    at:{item_id}                      item updated_at
+
+Mutations are Lua scripts, so each one is atomic per cart: adding checks the
+stock limit against the HINCRBY result and backs its increment out when it
+goes over. Every mutation adds the user to the {prefix}:cart:dirty set;
+the flusher pops users from it and writes their snapshot to carts /
+cart_items. While the store is enabled Redis is the authoritative copy;
+checkout flushes the cart before reading cart_items and discards it
+before committing.
+
+A cart that isn't in Redis (first use, or expired after ttl seconds
+without writes) raises CartNotLoaded and is copied in from the database.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis_cache import redis_cache
+from app.db.database import SessionLocal
+from app.models.cart import Cart, CartItem
+
+logger = logging.getLogger(__name__)
+
+# Copy a cart in from the database unless a request already did
+LOAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return {1}
+"""
+
+# ARGV: line field, new item id, item document, quantity, available stock,
+#       now, ttl, user id
+ADD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return {-1} end
+local id = redis.call('HGET', KEYS[1], ARGV[1])
+local created = not id
+if created then
+    id = ARGV[2]
+    redis.call('HSET', KEYS[1], ARGV[1], id, 'item:' .. id, ARGV[3], 'ref:' .. id, ARGV[1])
+end
+local added = tonumber(ARGV[4])
+local qty = redis.call('HINCRBY', KEYS[1], 'qty:' .. id, added)
+if qty > tonumber(ARGV[5]) then
+    if created then
+        redis.call('HDEL', KEYS[1], ARGV[1], 'item:' .. id, 'ref:' .. id, 'qty:' .. id)
+    else
+        redis.call('HINCRBY', KEYS[1], 'qty:' .. id, -added)
+    end
+    return {0, qty - added}
+end
+redis.call('HSET', KEYS[1], 'at:' .. id, ARGV[6], 'updated_at', ARGV[6])
+redis.call('EXPIRE', KEYS[1], ARGV[7])
+redis.call('SADD', KEYS[2], ARGV[8])
+return {1, qty, redis.call('HGETALL', KEYS[1])}
+"""
+
+# ARGV: item id, quantity, now, ttl, user id
+UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return {-1} end
+if redis.call('HEXISTS', KEYS[1], 'item:' .. ARGV[1]) == 0 then return {0} end
+redis.call('HSET', KEYS[1], 'qty:' .. ARGV[1], ARGV[2], 'at:' .. ARGV[1], ARGV[3], 'updated_at', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('SADD', KEYS[2], ARGV[5])
+return {1, redis.call('HGETALL', KEYS[1])}
+"""
+
+# ARGV: item id, now, ttl, user id
+REMOVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return {-1} end
+local line = redis.call('HGET', KEYS[1], 'ref:' .. ARGV[1])
+if not line then return {0} end
+local id = ARGV[1]
+redis.call('HDEL', KEYS[1], line, 'item:' .. id, 'ref:' .. id, 'qty:' .. id, 'at:' .. id)
+redis.call('HSET', KEYS[1], 'updated_at', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('SADD', KEYS[2], ARGV[4])
+return {1, redis.call('HGETALL', KEYS[1])}
+"""
+
+# ARGV: now, ttl, user id
+CLEAR_SCRIPT = """
+local meta = redis.call('HGET', KEYS[1], 'meta')
+if not meta then return {-1} end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], 'meta', meta, 'updated_at', ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('SADD', KEYS[2], ARGV[3])
+return {1, redis.call('HGETALL', KEYS[1])}
+"""
+
+_SCRIPTS = {
+    "load": LOAD_SCRIPT,
+    "add": ADD_SCRIPT,
+    "update": UPDATE_SCRIPT,
+    "remove": REMOVE_SCRIPT,
+    "clear": CLEAR_SCRIPT,
+}
+
+_MISSING = -1
+
+
+class CartNotLoaded(Exception):
+    """The user's cart is not in Redis yet; load it from the database and retry"""
+
+
+def primary_image_url(product) -> Optional[str]:
+    """Primary image of a product, else its first image"""
+    return next(
+        (img.image_url for img in product.images if img.is_primary),
+        product.images[0].image_url if product.images else None
+    )
+
+
+def _iso(value: Optional[datetime]) -> str:
+    return (value or datetime.now(timezone.utc)).isoformat()
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class CartStore:
+
+    def __init__(self, ttl_seconds: int, flush_batch: int, enabled: bool = True):
+        self.enabled = enabled
+        self.ttl = ttl_seconds
+        self.flush_batch = flush_batch
+        self.retry_attempts = 3
+        self._scripts = {}
+
+    def _key(self, user_id: str) -> str:
+        return f"{settings.REDIS_KEY_PREFIX}:cart:{user_id}"
+
+    def _dirty_key(self) -> str:
+        return f"{settings.REDIS_KEY_PREFIX}:cart:dirty"
+
+    def _run(self, name: str, user_id: str, args: list):
+        script = self._scripts.get(name)
+        if script is None:
+            script = self._scripts[name] = redis_cache.redis_client.register_script(
+                _SCRIPTS[name])
+        result = script(keys=[self._key(user_id), self._dirty_key()], args=args)
+        if result[0] == _MISSING:
+            raise CartNotLoaded(user_id)
+        return result
+
+    # DOCUMENTS
+    @staticmethod
+    def _line(product_id: str, variant_id: Optional[str]) -> str:
+        return f"line:{product_id}:{variant_id or '-'}"
+
+    @staticmethod
+    def _item_doc(item_id: str, product, variant, price: Decimal, created_at: datetime) -> bytes:
+        return orjson.dumps({
+            "id": item_id,
+            "product_id": product.id,
+            "variant_id": variant.id if variant else None,
+            "product_slug": product.slug,
+            "product_name": product.name,
+            "product_image": primary_image_url(product),
+            "variant_name": variant.name if variant else None,
+            "price": str(price),
+            "created_at": _iso(created_at)
+        })
+
+    @staticmethod
+    def _parse(fields: Dict[str, bytes]) -> Optional[dict]:
+        """Cart snapshot from the hash fields; items oldest first"""
+        if "meta" not in fields:
+            return None
+
+        items = []
+        for field, value in fields.items():
+            if not field.startswith("item:"):
+                continue
+            item_id = field[len("item:"):]
+            item = orjson.loads(value)
+            item["quantity"] = int(fields[f"qty:{item_id}"])
+            item["price"] = Decimal(item["price"])
+            item["created_at"] = datetime.fromisoformat(item["created_at"])
+            updated_at = fields.get(f"at:{item_id}")
+            item["updated_at"] = datetime.fromisoformat(
+                _text(updated_at)) if updated_at else item["created_at"]
+            items.append(item)
+        items.sort(key=lambda item: item["created_at"])
+
+        meta = orjson.loads(fields["meta"])
+        return {
+            "id": meta["id"],
+            "created_at": datetime.fromisoformat(meta["created_at"]),
+            "updated_at": datetime.fromisoformat(_text(fields["updated_at"])),
+            "items": items
+        }
+
+    @staticmethod
+    def _fields(raw) -> Dict[str, bytes]:
+        """HGETALL result (dict, or flat list from a script) keyed by str"""
+        if isinstance(raw, dict):
+            pairs = raw.items()
+        else:
+            pairs = zip(raw[::2], raw[1::2])
+        return {_text(field): value for field, value in pairs}
+
+    @staticmethod
+    def _format(user_id: str, snapshot: dict) -> dict:
+        """Same shape as CartService._format_cart"""
+        items_data = []
+        subtotal = Decimal('0.00')
+
+        for item in snapshot["items"]:
+            item_subtotal = item["price"] * item["quantity"]
+            subtotal += item_subtotal
+
+            items_data.append({
+                "id": item["id"],
+                "product_id": item["product_id"],
+                "variant_id": item["variant_id"],
+                "quantity": item["quantity"],
+                "price": float(item["price"]),
+                "product_name": item["product_name"],
+                "product_slug": item["product_slug"],
+                "product_image": item["product_image"],
+                "variant_name": item["variant_name"],
+                "subtotal": float(item_subtotal),
+                "created_at": item["created_at"],
+                "updated_at": item["updated_at"]
+            })
+
+        return {
+            "id": snapshot["id"],
+            "user_id": user_id,
+            "items": items_data,
+            "total_items": len(items_data),
+            "subtotal": float(subtotal),
+            "created_at": snapshot["created_at"],
+            "updated_at": snapshot["updated_at"]
+        }
+
+    def _cart_data(self, user_id: str, raw) -> dict:
+        return self._format(user_id, self._parse(self._fields(raw)))
+
+    # READS
+    def snapshot(self, user_id: str) -> Optional[dict]:
+        """Parsed cart, or None when it isn't in Redis"""
+        return self._parse(self._fields(
+            redis_cache.redis_client.hgetall(self._key(user_id))))
+
+    def get(self, user_id: str) -> dict:
+        snapshot = self.snapshot(user_id)
+        if snapshot is None:
+            raise CartNotLoaded(user_id)
+        return self._format(user_id, snapshot)
+
+    def get_item(self, user_id: str, item_id: str) -> Optional[dict]:
+        snapshot = self.snapshot(user_id)
+        if snapshot is None:
+            raise CartNotLoaded(user_id)
+        return next((item for item in snapshot["items"] if item["id"] == item_id), None)
+
+    # MUTATIONS
+    def load(self, user_id: str, cart: Cart):
+        """Copy a cart (items, products, variants and images loaded) into Redis"""
+        fields = [
+            "meta", orjson.dumps({"id": cart.id, "created_at": _iso(cart.created_at)}),
+            "updated_at", _iso(cart.updated_at),
+        ]
+        for item in cart.items:
+            line = self._line(item.product_id, item.variant_id)
+            fields += [
+                line, item.id,
+                f"item:{item.id}", self._item_doc(
+                    item.id, item.product, item.variant, item.price, item.created_at),
+                f"ref:{item.id}", line,
+                f"qty:{item.id}", item.quantity,
+                f"at:{item.id}", _iso(item.updated_at),
+            ]
+        self._run("load", user_id, [self.ttl, *fields])
+
+    def add_item(
+        self,
+        user_id: str,
+        item_id: str,
+        product,
+        variant,
+        price: Decimal,
+        quantity: int,
+        available_stock: int
+    ) -> Tuple[bool, int, Optional[dict]]:
+        """
+        Add quantity to the product / variant line, creating it as item_id.
+        Returns (added, quantity now in cart, cart data); nothing changes
+        when the line would go over available_stock.
+        """
+        now = datetime.now(timezone.utc)
+        result = self._run("add", user_id, [
+            self._line(product.id, variant.id if variant else None),
+            item_id,
+            self._item_doc(item_id, product, variant, price, now),
+            quantity,
+            available_stock,
+            now.isoformat(),
+            self.ttl,
+            user_id
+        ])
+        if not result[0]:
+            return False, result[1], None
+        return True, result[1], self._cart_data(user_id, result[2])
+
+    def set_quantity(self, user_id: str, item_id: str, quantity: int) -> Optional[dict]:
+        """Cart data, or None when the item is not in the cart"""
+        result = self._run("update", user_id, [
+            item_id, quantity, datetime.now(timezone.utc).isoformat(), self.ttl, user_id])
+        return self._cart_data(user_id, result[1]) if result[0] else None
+
+    def remove_item(self, user_id: str, item_id: str) -> Optional[dict]:
+        """Cart data, or None when the item is not in the cart"""
+        result = self._run("remove", user_id, [
+            item_id, datetime.now(timezone.utc).isoformat(), self.ttl, user_id])
+        return self._cart_data(user_id, result[1]) if result[0] else None
+
+    def clear(self, user_id: str) -> dict:
+        result = self._run("clear", user_id, [
+            datetime.now(timezone.utc).isoformat(), self.ttl, user_id])
+        return self._cart_data(user_id, result[1])
+
+    def discard(self, user_id: str):
+        """
+        Drop the Redis cart so the next request loads it from the database.
+        Retried; raises if Redis keeps failing, since a stale copy would
+        outrank the database.
+        """
+        for attempt in range(1, self.retry_attempts + 1):
+            try:
+                redis_cache.redis_client.delete(self._key(user_id))
+                return
+            except Exception as e:
+                if attempt == self.retry_attempts:
+                    raise
+                logger.warning(f"Error discarding cart of {user_id} (attempt {attempt}): {e}")
+
+    # WRITE-BEHIND
+    def flush(self, db: Session, user_id: str) -> bool:
+        """
+        Write the Redis cart of a user to carts / cart_items in db's
+        transaction. The carts row is locked before Redis is read, so
+        concurrent flushes apply snapshots in the order they were taken.
+        Returns False when there is nothing to write.
+        """
+        cart = db.query(Cart).filter(
+            Cart.user_id == user_id).with_for_update().first()
+        if not cart:
+            return False
+
+        snapshot = self.snapshot(user_id)
+        if snapshot is None or snapshot["id"] != cart.id:
+            return False
+
+        rows = [
+            {
+                "id": item["id"],
+                "cart_id": cart.id,
+                "product_id": item["product_id"],
+                "product_slug": item["product_slug"],
+                "variant_id": item["variant_id"],
+                "quantity": item["quantity"],
+                "price": item["price"],
+                "created_at": item["created_at"],
+                "updated_at": item["updated_at"]
+            }
+            for item in snapshot["items"]
+        ]
+
+        db.query(CartItem).filter(
+            CartItem.cart_id == cart.id,
+            CartItem.id.notin_([row["id"] for row in rows])
+        ).delete(synchronize_session=False)
+
+        if rows:
+            stmt = pg_insert(CartItem).values(rows)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[CartItem.id],
+                set_={
+                    "quantity": stmt.excluded.quantity,
+                    "updated_at": stmt.excluded.updated_at
+                }
+            ))
+
+        cart.updated_at = snapshot["updated_at"]
+        db.flush()
+        return True
+
+    def flush_dirty(self) -> int:
+        """Flush up to flush_batch changed carts; failed ones stay dirty"""
+        user_ids: List[bytes] = redis_cache.redis_client.spop(
+            self._dirty_key(), self.flush_batch) or []
+
+        flushed = 0
+        for raw in user_ids:
+            user_id = _text(raw)
+            db = SessionLocal()
+            try:
+                self.flush(db, user_id)
+                db.commit()
+                flushed += 1
+            except Exception:
+                db.rollback()
+                logger.exception("Flushing cart of %s failed", user_id)
+                redis_cache.redis_client.sadd(self._dirty_key(), user_id)
+            finally:
+                db.close()
+        return flushed
+
+    def drain(self):
+        """Flush every changed cart (on shutdown)"""
+        while self.flush_dirty():
+            pass
+
+
+cart_store = CartStore(
+    ttl_seconds=settings.CART_STORE_TTL_SECONDS,
+    flush_batch=settings.CART_FLUSH_BATCH,
+    enabled=settings.CART_STORE_ENABLED
+)
+
+
+async def run_cart_flusher(interval: float = settings.CART_FLUSH_INTERVAL_SECONDS):
+    """Write changed Redis carts to the database every interval seconds until cancelled"""
+    while True:
+        if cart_store.enabled:
+            try:
+                flushed = await asyncio.to_thread(cart_store.flush_dirty)
+                if flushed:
+                    logger.info("Flushed %d carts", flushed)
+            except Exception:
+                logger.exception("Cart flush failed")
+        await asyncio.sleep(interval)
@@ -1,10 +1,12 @@
 import uuid
 from decimal import Decimal
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.models.cart import Cart, CartItem
 from app.models.product import Product, ProductVariant
 from app.utils.responses import ResponseHandler
+from app.core.idempotency import idempotent
+from app.services.cart_store import CartNotLoaded, cart_store, primary_image_url
 
 
 class CartService:
@@ -18,10 +20,7 @@ class CartService:
 
         for item in cart.items:
             # Get primary image
-            primary_image = next(
-                (img.image_url for img in item.product.images if img.is_primary),
-                item.product.images[0].image_url if item.product.images else None
-            )
+            primary_image = primary_image_url(item.product)
 
             item_subtotal = item.price * item.quantity
             subtotal += item_subtotal
@@ -69,9 +68,62 @@ class CartService:
 
         return cart
 
+    # Redis cart (cart_store)
+    @staticmethod
+    def _from_store(db: Session, user_id: str, operation):
+        """Run a cart_store operation, copying the cart into Redis first if needed"""
+        try:
+            return operation()
+        except CartNotLoaded:
+            # Locking the carts row waits out a checkout in progress, so
+            # lines it is about to delete are not loaded back into Redis
+            cart = db.query(Cart).options(
+                joinedload(Cart.items).joinedload(
+                    CartItem.product).selectinload(Product.images),
+                joinedload(Cart.items).joinedload(CartItem.variant),
+            ).filter(Cart.user_id == user_id).with_for_update(of=Cart).first()
+
+            cart_store.load(user_id, cart or CartService.get_or_create_cart(db, user_id))
+            return operation()
+
+    @staticmethod
+    def _get_purchasable(db: Session, product_id: str, variant_id: str = None):
+        """Available product (and variant, if given) or 404"""
+        product = db.query(Product).options(
+            selectinload(Product.images)
+        ).filter(
+            Product.id == product_id,
+            Product.deleted_at.is_(None),
+            Product.is_available == True
+        ).first()
+
+        if not product:
+            ResponseHandler.not_found_error("Product", product_id)
+
+        # If variant specified, verify it exists
+        variant = None
+        if variant_id:
+            variant = db.query(ProductVariant).filter(
+                ProductVariant.id == variant_id,
+                ProductVariant.product_id == product_id,
+                ProductVariant.deleted_at.is_(None)
+            ).first()
+
+            if not variant:
+                ResponseHandler.not_found_error("Variant", variant_id)
+
+        return product, variant
+
     @staticmethod
     def get_cart(db: Session, user_id: str):
         """Get user's cart with items"""
+        if cart_store.enabled:
+            return ResponseHandler.success(
+                message="Cart retrieved successfully!",
+                data=CartService._from_store(
+                    db, user_id, lambda: cart_store.get(user_id))
+            )
+
         cart = db.query(Cart).options(
             joinedload(Cart.items).joinedload(CartItem.product),
             joinedload(Cart.items).joinedload(CartItem.variant),
@@ -90,33 +142,15 @@ class CartService:
         )
 
     @staticmethod
+    @idempotent("cart:add:{user_id}")
     def add_to_cart(db: Session, user_id: str, product_id: str, variant_id: str = None, quantity: int = 1):
         """Add item to cart"""
 
-        # Get or create cart
-        cart = CartService.get_or_create_cart(db, user_id)
+        # Get or create cart (a Redis cart is created when it is loaded)
+        cart = None if cart_store.enabled else CartService.get_or_create_cart(db, user_id)
 
-        # Verify product exists
-        product = db.query(Product).filter(
-            Product.id == product_id,
-            Product.deleted_at.is_(None),
-            Product.is_available == True
-        ).first()
-
-        if not product:
-            ResponseHandler.not_found_error("Product", product_id)
-
-        # If variant specified, verify it exists
-        variant = None
-        if variant_id:
-            variant = db.query(ProductVariant).filter(
-                ProductVariant.id == variant_id,
-                ProductVariant.product_id == product_id,
-                ProductVariant.deleted_at.is_(None)
-            ).first()
-
-            if not variant:
-                ResponseHandler.not_found_error("Variant", variant_id)
+        # Verify product / variant exist
+        product, variant = CartService._get_purchasable(db, product_id, variant_id)
 
         # Check stock
         available_stock = variant.stock_quantity if variant else product.stock_quantity
@@ -124,6 +158,21 @@ class CartService:
             ResponseHandler.bad_request(
                 f"Only {available_stock} items available in stock")
 
+        price = variant.sale_price if variant and variant.sale_price else variant.price if variant else product.sale_price if product.sale_price else product.price
+
+        if cart_store.enabled:
+            # Stock limit is checked atomically against the quantity in the cart
+            added, in_cart, cart_data = CartService._from_store(
+                db, user_id, lambda: cart_store.add_item(
+                    user_id, str(uuid.uuid4()), product, variant, price,
+                    quantity, available_stock))
+
+            if not added:
+                ResponseHandler.bad_request(
+                    f"Cannot add {quantity} more. Only {available_stock - in_cart} items available")
+
+            return ResponseHandler.success(message="Item added to cart", data=cart_data)
+
         # Check if item already in cart
         existing_item = db.query(CartItem).filter(
             CartItem.cart_id == cart.id,
@@ -146,8 +195,6 @@ class CartService:
             db.refresh(existing_item)
         else:
             # Add new item
-            price = variant.sale_price if variant and variant.sale_price else variant.price if variant else product.sale_price if product.sale_price else product.price
-
             cart_item = CartItem(
                 id=str(uuid.uuid4()),
                 cart_id=cart.id,
@@ -172,9 +219,37 @@ class CartService:
         return ResponseHandler.success(message=message, data=cart_data)
 
     @staticmethod
+    @idempotent("cart:update:{user_id}")
     def update_cart_item(db: Session, user_id: str, item_id: str, quantity: int):
         """Update cart item quantity"""
 
+        if cart_store.enabled:
+            item = CartService._from_store(
+                db, user_id, lambda: cart_store.get_item(user_id, item_id))
+            if not item:
+                ResponseHandler.not_found_error("Cart item", item_id)
+
+            # Check stock
+            if item["variant_id"]:
+                available_stock = db.query(ProductVariant.stock_quantity).filter(
+                    ProductVariant.id == item["variant_id"]).scalar()
+            else:
+                available_stock = db.query(Product.stock_quantity).filter(
+                    Product.id == item["product_id"]).scalar()
+
+            if quantity > (available_stock or 0):
+                ResponseHandler.bad_request(
+                    f"Only {available_stock or 0} items available in stock")
+
+            cart_data = cart_store.set_quantity(user_id, item_id, quantity)
+            if cart_data is None:
+                ResponseHandler.not_found_error("Cart item", item_id)
+
+            return ResponseHandler.success(
+                message="Cart item updated",
+                data=cart_data
+            )
+
         # Get cart item
         cart_item = db.query(CartItem).join(Cart).filter(
             CartItem.id == item_id,
@@ -212,8 +287,20 @@ class CartService:
         )
 
     @staticmethod
+    @idempotent("cart:remove:{user_id}")
     def remove_cart_item(db: Session, user_id: str, item_id: str):
         """Remove item from cart"""
+        if cart_store.enabled:
+            cart_data = CartService._from_store(
+                db, user_id, lambda: cart_store.remove_item(user_id, item_id))
+            if cart_data is None:
+                ResponseHandler.not_found_error("Cart item", item_id)
+
+            return ResponseHandler.success(
+                message="Item removed from cart",
+                data=cart_data
+            )
+
         # Get cart item
         cart_item = db.query(CartItem).join(Cart).filter(
             CartItem.id == item_id,
@@ -238,9 +325,17 @@ class CartService:
         )
 
     @staticmethod
+    @idempotent("cart:clear:{user_id}")
     def clear_cart(db: Session, user_id: str):
         """Clear all items from cart"""
 
+        if cart_store.enabled:
+            return ResponseHandler.success(
+                message="Cart cleared",
+                data=CartService._from_store(
+                    db, user_id, lambda: cart_store.clear(user_id))
+            )
+
         cart = db.query(Cart).filter(Cart.user_id == user_id).first()
 
         if not cart:
@@ -3,53 +3,128 @@ Category service
 """
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, select, update
 from typing import Optional
 
 from app.models.category import Category
 from app.models.product import Product
 from app.utils.responses import ResponseHandler
 from app.utils.serializers import model_to_dict
+from app.core.cache import cached, invalidate
+from app.elastic.controller import mark_products_dirty
+
+
+def category_path(category_id: str, parent: Optional[Category] = None) -> str:
+    """Materialized path of a category placed under `parent` (None: root)"""
+    if parent is None:
+        return f"/{category_id}/"
+    if not parent.path:
+        # A child of an un-backfilled parent is not a root
+        raise ValueError(f"Category {parent.id} has no path, run rebuild_paths first")
+    return f"{parent.path}{category_id}/"
+
+
+def category_subtree_ids(category: Category):
+    """SELECT of the ids of a category and all of its non-deleted descendants"""
+    if not category.path:
+        # Not backfilled yet (see CategoryService.rebuild_paths)
+        return select(Category.id).where(Category.id == category.id)
+    return select(Category.id).where(
+        Category.path.like(f"{category.path}%"),
+        Category.deleted_at.is_(None)
+    )
 
 
 class CategoryService:
 
+    @staticmethod
+    @cached(key="categories:counts", tags=["categories", "products"])
+    def _category_counts(db: Session):
+        """
+        product_count, children_count and subtree_product_count per category id.
+
+        One query with both counts grouped in subqueries; subtree counts are
+        rolled up from the parent links (all non-deleted descendants).
+        """
+        product_counts = select(
+            Product.category_id.label("category_id"),
+            func.count(Product.id).label("count")
+        ).group_by(Product.category_id).subquery()
+
+        child = aliased(Category)
+        children_counts = select(
+            child.parent_id.label("parent_id"),
+            func.count(child.id).label("count")
+        ).where(child.deleted_at.is_(None)).group_by(child.parent_id).subquery()
+
+        rows = db.query(
+            Category.id,
+            Category.parent_id,
+            func.coalesce(product_counts.c.count, 0),
+            func.coalesce(children_counts.c.count, 0)
+        ).outerjoin(
+            product_counts, product_counts.c.category_id == Category.id
+        ).outerjoin(
+            children_counts, children_counts.c.parent_id == Category.id
+        ).filter(
+            Category.deleted_at.is_(None)
+        ).all()
+
+        parents = {}
+        counts = {}
+        for category_id, parent_id, product_count, children_count in rows:
+            parents[category_id] = parent_id
+            counts[category_id] = {
+                "product_count": product_count,
+                "children_count": children_count,
+                "subtree_product_count": product_count
+            }
+
+        # Add each category's products to all of its ancestors
+        for category_id, parent_id in parents.items():
+            product_count = counts[category_id]["product_count"]
+            seen = {category_id}
+            while parent_id in counts and parent_id not in seen:
+                counts[parent_id]["subtree_product_count"] += product_count
+                seen.add(parent_id)
+                parent_id = parents[parent_id]
+
+        return counts
+
+    @staticmethod
+    def _counts_for(counts: dict, category_id: str) -> dict:
+        return counts.get(category_id) or {
+            "product_count": 0, "children_count": 0, "subtree_product_count": 0
+        }
+
     @staticmethod
     def get_all_categories(db: Session, include_inactive: bool = False):
         """Get all categories as flat list"""
 
-        query = db.query(
-            Category,
-            func.count(Product.id).label('product_count')
-        ).outerjoin(Product).filter(
+        query = db.query(Category).filter(
             Category.deleted_at.is_(None)
         )
 
         if not include_inactive:
             query = query.filter(Category.is_active == True)
 
-        results = query.group_by(Category.id).order_by(
+        results = query.order_by(
             Category.parent_id.asc().nullsfirst(),
             Category.display_order.asc(),
             Category.name.asc()
         ).all()
 
-        # Serialize
-        categories = []
-        for category, product_count in results:
-            # Count children
-            children_count = db.query(func.count(Category.id)).filter(
-                Category.parent_id == category.id,
-                Category.deleted_at.is_(None)
-            ).scalar()
+        counts = CategoryService._category_counts(db)
 
-            cat_dict = {
+        # Serialize
+        categories = [
+            {
                 **model_to_dict(category),
-                "product_count": product_count,
-                "children_count": children_count
+                **CategoryService._counts_for(counts, category.id)
             }
-            categories.append(cat_dict)
+            for category in results
+        ]
 
         return ResponseHandler.success(
             message="Categories retrieved successfully",
@@ -60,32 +135,34 @@ class CategoryService:
         )
 
     @staticmethod
+    @cached(key="categories:tree:{include_inactive}", tags=["categories", "products"])
     def get_category_tree(db: Session, include_inactive: bool = False):
         """Get categories as hierarchical tree"""
 
-        query = db.query(
-            Category,
-            func.count(Product.id).label('product_count')
-        ).outerjoin(Product).filter(
+        query = db.query(Category).filter(
             Category.deleted_at.is_(None)
         )
 
         if not include_inactive:
             query = query.filter(Category.is_active == True)
 
-        results = query.group_by(Category.id).order_by(
+        results = query.order_by(
             Category.display_order.asc(),
             Category.name.asc()
         ).all()
 
+        counts = CategoryService._category_counts(db)
+
         # Build tree
         categories_map = {}
         root_categories = []
 
-        for category, product_count in results:
+        for category in results:
+            category_counts = CategoryService._counts_for(counts, category.id)
             cat_dict = {
                 **model_to_dict(category),
-                "product_count": product_count,
+                "product_count": category_counts["product_count"],
+                "subtree_product_count": category_counts["subtree_product_count"],
                 "children": []
             }
 
@@ -109,29 +186,20 @@ class CategoryService:
     def get_category_by_id(db: Session, category_id: str):
         """Get category by ID"""
 
-        result = db.query(
-            Category,
-            func.count(Product.id).label('product_count')
-        ).outerjoin(Product).filter(
+        category = db.query(Category).filter(
             Category.id == category_id,
             Category.deleted_at.is_(None)
-        ).group_by(Category.id).first()
+        ).first()
 
-        if not result:
+        if not category:
             ResponseHandler.not_found_error("Category", category_id)
 
-        category, product_count = result
-
-        # Count children
-        children_count = db.query(func.count(Category.id)).filter(
-            Category.parent_id == category_id,
-            Category.deleted_at.is_(None)
-        ).scalar()
+        counts = CategoryService._counts_for(
+            CategoryService._category_counts(db), category_id)
 
         cat_dict = {
             **model_to_dict(category),
-            "product_count": product_count,
-            "children_count": children_count
+            **counts
         }
 
         return ResponseHandler.get_single_success("Category", category_id, cat_dict)
@@ -150,6 +218,7 @@ class CategoryService:
             ResponseHandler.already_exists_error("Category", "slug")
 
         # Validate parent
+        parent = None
         if data.parent_id:
             parent = db.query(Category).filter(
                 Category.id == data.parent_id,
@@ -160,11 +229,15 @@ class CategoryService:
                 ResponseHandler.not_found_error(
                     "Parent category", data.parent_id)
 
+        CategoryService._ensure_paths(db, parent)
+
         # Create
         now = datetime.now(timezone.utc)
+        category_id = str(uuid.uuid4())
         category = Category(
-            id=str(uuid.uuid4()),
+            id=category_id,
             parent_id=data.parent_id,
+            path=category_path(category_id, parent),
             name=data.name,
             slug=data.slug,
             description=data.description,
@@ -178,6 +251,7 @@ class CategoryService:
 
         db.add(category)
         db.commit()
+        invalidate("categories")
         db.refresh(category)
 
         return ResponseHandler.create_success("Category", category.id, category)
@@ -206,6 +280,7 @@ class CategoryService:
                 ResponseHandler.already_exists_error("Category", "slug")
 
         # Validate parent
+        parent = None
         if data.parent_id:
             if data.parent_id == category_id:
                 ResponseHandler.bad_request(
@@ -222,6 +297,10 @@ class CategoryService:
 
         # Update
         update_data = data.model_dump(exclude_unset=True)
+        moved = "parent_id" in update_data and update_data["parent_id"] != category.parent_id
+        if moved:
+            CategoryService._move_subtree(db, category, parent)
+
         for key, value in update_data.items():
             setattr(category, key, value)
 
@@ -229,6 +308,11 @@ class CategoryService:
         category.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        if moved:
+            # A moved subtree changes which products each ancestor lists
+            invalidate("categories", "products")
+        else:
+            invalidate("categories")
         db.refresh(category)
 
         return ResponseHandler.update_success("Category", category_id, category)
@@ -280,6 +364,7 @@ class CategoryService:
         category.deleted_by_id = deleted_by_id
 
         db.commit()
+        invalidate("categories")
 
         return ResponseHandler.delete_success("Category", category_id)
 
@@ -336,6 +421,7 @@ class CategoryService:
         category.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate("categories")
         db.refresh(category)
 
         status = "active" if category.is_active else "inactive"
@@ -358,6 +444,7 @@ class CategoryService:
             ResponseHandler.not_found_error("Category", category_id)
 
         # Validate new parent
+        parent = None
         if new_parent_id:
             if new_parent_id == category_id:
                 ResponseHandler.bad_request(
@@ -373,11 +460,13 @@ class CategoryService:
                     "Parent category", new_parent_id)
 
         # Move
+        CategoryService._move_subtree(db, category, parent)
         category.parent_id = new_parent_id
         category.updated_by_id = updated_by_id
         category.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate("categories", "products")
         db.refresh(category)
 
         return ResponseHandler.success(
@@ -385,6 +474,74 @@ class CategoryService:
             data=category
         )
 
+    @staticmethod
+    def _move_subtree(db: Session, category: Category, parent: Optional[Category]):
+        """Rewrite the paths of `category` and its descendants for a new parent"""
+        CategoryService._ensure_paths(db, category, parent)
+        old_path = category.path
+        new_path = category_path(category.id, parent)
+
+        if parent is not None and parent.path.startswith(old_path):
+            ResponseHandler.bad_request(
+                "Category cannot be moved under its own subcategory")
+
+        # Their ES documents carry the category path; looked up while the
+        # subtree still has old_path
+        product_ids = db.query(Product.id).filter(
+            Product.category_id.in_(category_subtree_ids(category))
+        ).all()
+
+        db.query(Category).filter(
+            Category.path.like(f"{old_path}%")
+        ).update(
+            {Category.path: func.concat(new_path, func.substr(Category.path, len(old_path) + 1))},
+            synchronize_session=False
+        )
+        mark_products_dirty(db, [product_id for (product_id,) in product_ids])
+
+        category.path = new_path
+
+    @staticmethod
+    def _ensure_paths(db: Session, *categories: Optional[Category]):
+        """Backfill paths with rebuild_paths when any of `categories` has none yet"""
+        pending = [c for c in categories if c is not None]
+        if any(not c.path for c in pending):
+            CategoryService.rebuild_paths(db)
+            for c in pending:
+                db.refresh(c)
+
+    @staticmethod
+    def rebuild_paths(db: Session) -> int:
+        """Recompute every category path from parent_id (backfill/repair), returns rows changed"""
+        rows = db.query(Category.id, Category.parent_id, Category.path).all()
+        parents = {category_id: parent_id for category_id, parent_id, _ in rows}
+        paths = {}
+
+        def resolve(category_id):
+            chain = []
+            while category_id is not None and category_id not in paths:
+                if category_id in chain:
+                    # parent_id cycle: cut it at this node
+                    break
+                chain.append(category_id)
+                category_id = parents.get(category_id)
+            prefix = paths.get(category_id, "/")
+            for node in reversed(chain):
+                prefix = paths[node] = f"{prefix}{node}/"
+
+        for category_id in parents:
+            resolve(category_id)
+
+        changed = [
+            {"id": category_id, "path": paths[category_id]}
+            for category_id, _, path in rows if path != paths[category_id]
+        ]
+        if changed:
+            db.execute(update(Category), changed)
+            db.commit()
+            invalidate("categories", "products")
+        return len(changed)
+
     @staticmethod
     def get_category_stats(db: Session):
         """Get category statistics"""
@@ -21,7 +21,7 @@ from app.utils.responses import ResponseHandler
 from app.websocket.manager import notification_manager
 from app.db.database import get_db
 from app.core.config import settings
-from app.core.redis_rate_limiter import redis_rate_limiter
+from app.core.redis_client import get_async_redis
 
 logger = logging.getLogger(__name__)
 
@@ -427,10 +427,10 @@ class NotificationService:
         return ResponseHandler.success("Connection status retrieved", data)
 
     @staticmethod
-    def create_ws_ticket(db: Session, user_id: str):
+    async def create_ws_ticket(db: Session, user_id: str):
         ticket = str(uuid.uuid4())
         key = f"{settings.REDIS_KEY_PREFIX}:{NotificationService._WS_TICKET_PREFIX}:{ticket}"
-        redis_rate_limiter.redis_client.setex(
+        await get_async_redis().setex(
             key, NotificationService._WS_TICKET_TTL_SECONDS, user_id
         )
         expires_at = datetime.now(timezone.utc) + timedelta(
@@ -442,13 +442,10 @@ class NotificationService:
         )
 
     @staticmethod
-    def consume_ws_ticket(ticket: str) -> str | None:
+    async def consume_ws_ticket(ticket: str) -> str | None:
         key = f"{settings.REDIS_KEY_PREFIX}:{NotificationService._WS_TICKET_PREFIX}:{ticket}"
-        user_id = redis_rate_limiter.redis_client.get(key)
-        if user_id:
-            redis_rate_limiter.redis_client.delete(key)
-            return user_id
-        return None
+        # GETDEL: a ticket can only be redeemed once, even under a race
+        return await get_async_redis().getdel(key)
 
     @staticmethod
     async def handle_websocket_connection(websocket: WebSocket):
@@ -486,7 +483,7 @@ class NotificationService:
     @staticmethod
     async def _authenticate_websocket(websocket: WebSocket, ticket: str):
         try:
-            user_id = NotificationService.consume_ws_ticket(ticket)
+            user_id = await NotificationService.consume_ws_ticket(ticket)
             if not user_id:
                 await websocket.send_json({"type": "error", "message": "Invalid or expired ticket"})
                 await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
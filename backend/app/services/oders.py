@@ -2,7 +2,7 @@ import uuid
 from decimal import Decimal
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, insert
 from fastapi import BackgroundTasks
 from app.models.order import Order, OrderItem
 from app.models.cart import Cart, CartItem
@@ -11,7 +11,11 @@ from app.models.product import Product
 from app.utils.responses import ResponseHandler
 from app.core.enums import OrderStatus, PaymentStatus, PaymentMethod, NotificationType
 from app.core.constant import OrderConstants
+from app.core.idempotency import idempotent
+from app.services.cart_store import cart_store
 from app.services.notification_events import NotificationEventEmitter
+from app.services.order_numbers import order_number_generator
+from app.services.stock import StockLine, StockService
 from app.utils.email import send_order_confirmation_email
 
 
@@ -33,14 +37,7 @@ class OrderService:
     @staticmethod
     def _generate_order_number(db: Session) -> str:
         """Generate unique order number"""
-        order_count = db.query(func.count(Order.id)).scalar()
-        date_str = datetime.now().strftime('%Y%m%d')
-
-        return OrderConstants.ORDER_NUMBER_FORMAT.format(
-            prefix=OrderConstants.ORDER_NUMBER_PREFIX,
-            date=date_str,
-            sequence=order_count + 1
-        )
+        return order_number_generator.next(db)
 
     @staticmethod
     def _format_order_list_item(order: Order):
@@ -83,10 +80,9 @@ class OrderService:
         }
 
     @staticmethod
-    def _format_order_detail(order: Order):
-        """Format order detail"""
-
-        items_data = [
+    def _format_order_items(items):
+        """Format order items (ORM objects)"""
+        return [
             {
                 "id": item.id,
                 "product_id": item.product_id,
@@ -98,9 +94,16 @@ class OrderService:
                 "unit_price": float(item.unit_price),
                 "subtotal": float(item.subtotal)
             }
-            for item in order.items
+            for item in items
         ]
 
+    @staticmethod
+    def _format_order_detail(order: Order, items_data: list = None):
+        """Format order detail (items_data: already formatted items, skips order.items)"""
+
+        if items_data is None:
+            items_data = OrderService._format_order_items(order.items)
+
         return {
             "id": order.id,
             "order_number": order.order_number,
@@ -120,33 +123,33 @@ class OrderService:
         }
 
     @staticmethod
-    def _trigger_confirmation_email(background_tasks: BackgroundTasks, user: User, order: Order):
+    def _trigger_confirmation_email(background_tasks: BackgroundTasks, user: User, order_data: dict):
         """
         Prepare email context and add to background tasks.
         """
-        shipping_address = order.shipping_address or {}
+        shipping_address = order_data["shipping_address"] or {}
         ship_info = f"{shipping_address.get('address', '')}, {shipping_address.get('city', '')} - SĐT: {shipping_address.get('phone', '')}"
 
         email_items = [
             {
-                "name": item.product_name,
-                "variant": item.variant_name if item.variant_name else "",
-                "quantity": item.quantity,
-                "price": float(item.unit_price)
-            } for item in order.items
+                "name": item["product_name"],
+                "variant": item["variant_name"] if item["variant_name"] else "",
+                "quantity": item["quantity"],
+                "price": item["unit_price"]
+            } for item in order_data["items"]
         ]
 
         email_context = {
             "app_name": "Cosmetic Store",
             "full_name": user.full_name,
-            "order_number": order.order_number,
-            "created_at": order.created_at.strftime("%d/%m/%Y %H:%M"),
-            "payment_method": order.payment_method.upper(),
+            "order_number": order_data["order_number"],
+            "created_at": order_data["created_at"].strftime("%d/%m/%Y %H:%M"),
+            "payment_method": order_data["payment_method"].upper(),
             "items": email_items,
-            "subtotal": float(order.subtotal),
-            "shipping_fee": float(order.shipping_fee),
-            "discount": float(order.discount),
-            "total_amount": float(order.total),
+            "subtotal": order_data["subtotal"],
+            "shipping_fee": order_data["shipping_fee"],
+            "discount": order_data["discount"],
+            "total_amount": order_data["total"],
             "shipping_address": ship_info
         }
 
@@ -158,6 +161,7 @@ class OrderService:
 
     # CUSTOMER ENDPOINTS
     @staticmethod
+    @idempotent("orders:create:{user_id}")
     def create_order(db: Session,
                      user_id: str,
                      shipping_address: dict,
@@ -176,6 +180,11 @@ class OrderService:
             ResponseHandler.not_found_error(
                 "User with this ", user_id + " not found")
 
+        # The Redis cart is the authoritative copy: write it to cart_items
+        # (under the carts row lock) before reading them
+        if cart_store.enabled:
+            cart_store.flush(db, user_id)
+
         # Get user's cart with items
         cart = db.query(Cart).options(
             joinedload(Cart.items).joinedload(CartItem.product),
@@ -191,7 +200,8 @@ class OrderService:
                 f"Cannot create order with more than {OrderConstants.MAX_ITEMS_PER_ORDER} items"
             )
 
-        # Validate stock for all items
+        # Fail fast on the loaded stock; the reservation below is what
+        # actually guarantees it under concurrent checkouts
         for cart_item in cart.items:
             if cart_item.variant:
                 available_stock = cart_item.variant.stock_quantity
@@ -214,8 +224,24 @@ class OrderService:
         discount = Decimal('0.00')  # Can add coupon logic later
         total = subtotal + shipping_fee - discount
 
+        # Take the stock atomically before writing anything else
+        stock_lines = [
+            StockLine(cart_item.product_id, cart_item.variant_id, cart_item.quantity)
+            for cart_item in cart.items
+        ]
+        short_lines = StockService.reserve(db, stock_lines)
+        if short_lines:
+            # Read the line before rollback expires the cart and its items
+            short_item = cart.items[stock_lines.index(short_lines[0])]
+            product_id, product_name = short_item.product_id, short_item.product.name
+            db.rollback()
+            ResponseHandler.bad_request(
+                f"Insufficient stock for {product_name} (product id '{product_id}')"
+            )
+
         # Generate order number
         order_number = OrderService._generate_order_number(db)
+        now = datetime.now(timezone.utc)
 
         # Create order
         order = Order(
@@ -231,45 +257,72 @@ class OrderService:
             total=total,
             shipping_address=shipping_address,
             notes=notes,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
+            # Online payments hold the stock only until the reservation runs out
+            reservation_expires_at=(
+                now + OrderConstants.STOCK_RESERVATION_TTL
+                if payment_method == PaymentMethod.VNPAY.value else None
+            ),
+            created_at=now,
+            updated_at=now
         )
 
         db.add(order)
         db.flush()
 
-        # Create order items (snapshot)
-        for cart_item in cart.items:
-            order_item = OrderItem(
-                id=str(uuid.uuid4()),
-                order_id=order.id,
-                product_id=cart_item.product_id,
-                product_slug=cart_item.product_slug,
-                variant_id=cart_item.variant_id,
-                product_name=cart_item.product.name,
-                variant_name=cart_item.variant.name if cart_item.variant else None,
-                quantity=cart_item.quantity,
-                unit_price=cart_item.price,
-                subtotal=cart_item.price * cart_item.quantity,
-                created_at=datetime.now(timezone.utc),
-                updated_at=datetime.now(timezone.utc)
-            )
-            db.add(order_item)
-
-            # Deduct stock
-            if cart_item.variant:
-                cart_item.variant.stock_quantity -= cart_item.quantity
-            else:
-                cart_item.product.stock_quantity -= cart_item.quantity
+        # Create order items (snapshot) in one multi-row INSERT
+        item_rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "order_id": order.id,
+                "product_id": cart_item.product_id,
+                "product_slug": cart_item.product_slug,
+                "variant_id": cart_item.variant_id,
+                "product_name": cart_item.product.name,
+                "variant_name": cart_item.variant.name if cart_item.variant else None,
+                "quantity": cart_item.quantity,
+                "unit_price": cart_item.price,
+                "subtotal": cart_item.price * cart_item.quantity,
+                "created_at": now,
+                "updated_at": now
+            }
+            for cart_item in cart.items
+        ]
+        db.execute(insert(OrderItem), item_rows)
 
         # Clear cart
-        db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
+        db.query(CartItem).filter(CartItem.cart_id == cart.id).delete(
+            synchronize_session=False)
 
+        # Response and email come from the rows above, not a re-fetch
+        order_data = OrderService._format_order_detail(order, [
+            {
+                "id": row["id"],
+                "product_id": row["product_id"],
+                "product_slug": row["product_slug"],
+                "variant_id": row["variant_id"],
+                "product_name": row["product_name"],
+                "variant_name": row["variant_name"],
+                "quantity": row["quantity"],
+                "unit_price": float(row["unit_price"]),
+                "subtotal": float(row["subtotal"])
+            }
+            for row in item_rows
+        ])
+
+        # Only sent once the request succeeds, so it can be queued before commit
+        OrderService._trigger_confirmation_email(background_tasks, user, order_data)
+
+        # Drop the Redis cart before commit, while the carts row is still
+        # locked: it then reloads from the committed cart_items, and the
+        # flusher can't write the bought lines back. Fails the checkout if
+        # Redis is down.
+        if cart_store.enabled:
+            cart_store.discard(user_id)
+
+        # Detach the order so commit does not expire it; the notification
+        # below then reads its loaded columns without reloading it
+        db.expunge(order)
         db.commit()
-        db.refresh(order)
-
-        # Format response
-        order_data = OrderService._format_order_detail(order)
 
         # Push Notification
         NotificationEventEmitter.emit(
@@ -279,9 +332,6 @@ class OrderService:
             send_websocket=True
         )
 
-        # Send Email
-        OrderService._trigger_confirmation_email(background_tasks, user, order)
-
         return ResponseHandler.create_success("Order", order.id, order_data)
 
     def get_user_orders(db: Session, user_id: str, page: int = 1, limit: int = 20):
@@ -379,14 +429,11 @@ class OrderService:
             )
 
         # Restore stock
-        for item in order.items:
-            if item.variant:
-                item.variant.stock_quantity += item.quantity
-            else:
-                item.product.stock_quantity += item.quantity
+        StockService.release(db, StockService.order_lines(order))
 
         # Update status
         order.status = OrderStatus.CANCELLED.value
+        order.reservation_expires_at = None
         order.updated_at = datetime.now(timezone.utc)
 
         db.commit()
@@ -451,11 +498,8 @@ class OrderService:
 
         # If cancelling, restore stock
         if status == OrderStatus.CANCELLED.value and order.status != OrderStatus.CANCELLED.value:
-            for item in order.items:
-                if item.variant:
-                    item.variant.stock_quantity += item.quantity
-                else:
-                    item.product.stock_quantity += item.quantity
+            StockService.release(db, StockService.order_lines(order))
+            order.reservation_expires_at = None
 
         # Update status
         old_status = order.status
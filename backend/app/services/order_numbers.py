@@ -0,0 +1,69 @@
+import threading
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Sequence, func, select
+from sqlalchemy.orm import Session
+from app.core.constant import OrderConstants
+from app.db.database import Base
+from app.models.order import Order
+
+ORDER_NUMBER_SEQUENCE = Sequence(
+    "order_number_seq",
+    start=1,
+    increment=OrderConstants.ORDER_NUMBER_BLOCK_SIZE,
+    metadata=Base.metadata
+)
+
+
+class OrderNumberGenerator:
+    """
+    Order numbers from a Postgres sequence, handed out in blocks.
+
+    Each nextval reserves block_size numbers (the sequence increments by
+    that much), which this process then hands out locally, so most orders
+    need no database round trip and concurrent workers never share a
+    number. Numbers left in a block when the process stops are skipped.
+    """
+
+    def __init__(self, sequence: Sequence, block_size: int):
+        self.sequence = sequence
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._ready = False
+
+    def _ensure_sequence(self, db: Session):
+        """Create the sequence on first use, continuing after existing orders"""
+        if self._ready:
+            return
+        # Own transaction, so the DDL survives the caller rolling back
+        with db.get_bind().begin() as conn:
+            if not conn.dialect.has_sequence(conn, self.sequence.name):
+                self.sequence.create(conn, checkfirst=True)
+                # Numbers from the old COUNT(*) scheme went up to the order count
+                existing = conn.execute(select(func.count(Order.id))).scalar()
+                if existing:
+                    conn.execute(select(func.setval(self.sequence.name, existing)))
+        self._ready = True
+
+    def next_sequence(self, db: Session) -> int:
+        with self._lock:
+            if self._next >= self._end:
+                self._ensure_sequence(db)
+                start = db.execute(select(self.sequence.next_value())).scalar_one()
+                self._next, self._end = start, start + self.block_size
+            value = self._next
+            self._next += 1
+            return value
+
+    def next(self, db: Session, now: Optional[datetime] = None) -> str:
+        return OrderConstants.ORDER_NUMBER_FORMAT.format(
+            prefix=OrderConstants.ORDER_NUMBER_PREFIX,
+            date=(now or datetime.now()).strftime('%Y%m%d'),
+            sequence=self.next_sequence(db)
+        )
+
+
+order_number_generator = OrderNumberGenerator(
+    ORDER_NUMBER_SEQUENCE, OrderConstants.ORDER_NUMBER_BLOCK_SIZE)
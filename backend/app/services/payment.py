@@ -5,7 +5,9 @@ from datetime import datetime, timezone
 from typing import Dict, Optional
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.idempotency import idempotent
 from app.models.order import Order
+from app.services.stock import StockService
 from app.utils.responses import ResponseHandler
 from app.core.enums import PaymentStatus
 from app.core.enums import VNPaymentStatus, OrderStatus
@@ -74,6 +76,7 @@ class VNPayService:
         }
 
     @staticmethod
+    @idempotent("payment:vnpay:{order_id}")
     def create_payment_url(
         db: Session,
         order_id: str,
@@ -102,6 +105,10 @@ class VNPayService:
         if order.payment_status == PaymentStatus.PAID.value:
             ResponseHandler.bad_request("Order already paid")
 
+        # Cancelled or past its reservation: the stock is no longer held
+        if order.status == OrderStatus.CANCELLED.value:
+            ResponseHandler.bad_request("Order has been cancelled")
+
         # Build VNPay parameters
         amount = int(order.total * 100)
         create_date = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
@@ -207,10 +214,10 @@ class VNPayService:
             if not is_valid:
                 return VNPayService._build_ipn_response("97", "Invalid signature")
 
-            # Get order
+            # Get order, locked so the reservation sweeper skips it meanwhile
             order_number = callback_params.get("vnp_TxnRef")
             order = db.query(Order).filter(
-                Order.order_number == order_number).first()
+                Order.order_number == order_number).with_for_update().first()
 
             if not order:
                 return VNPayService._build_ipn_response("01", "Order not found")
@@ -230,8 +237,22 @@ class VNPayService:
 
             if response_code == "00" and transaction_status == "00":
                 # Payment successful
+                if order.status == OrderStatus.CANCELLED.value:
+                    # Paid after the sweeper cancelled it: take the stock
+                    # again if it is still there. Orders cancelled by the
+                    # customer / an admin (or without stock) stay cancelled
+                    # for refund. The savepoint keeps the order row locked.
+                    if order.reservation_expires_at is not None:
+                        savepoint = db.begin_nested()
+                        if StockService.reserve(db, StockService.order_lines(order)):
+                            savepoint.rollback()
+                        else:
+                            savepoint.commit()
+                            order.status = OrderStatus.PENDING.value
+                else:
+                    order.status = OrderStatus.PENDING.value
                 order.payment_status = PaymentStatus.PAID.value
-                order.status = OrderStatus.PENDING.value
+                order.reservation_expires_at = None
             else:
                 # Payment failed
                 order.payment_status = PaymentStatus.FAILED.value
@@ -46,23 +46,31 @@ def format_product_variant(variant):
     }
 
 
+# Product columns left out of list items (and not loaded by list queries)
+LIST_ITEM_EXCLUDE = ['deleted_at', 'created_by_id', 'updated_by_id', 'deleted_by_id',
+                     'description', 'how_to_use', 'ingredients',
+                     'brand_id', 'category_id']
+
+
+def get_primary_image_url(product):
+    """Primary image URL, else the first image"""
+    # List queries select it directly instead of loading product.images
+    if "primary_image_url" in vars(product):
+        return product.primary_image_url
+
+    if not product.images:
+        return None
+    primary = next((img for img in product.images if img.is_primary), None)
+    return primary.image_url if primary else product.images[0].image_url
+
+
 def format_product_list_item(product):
     """Format product for list view"""
-    primary_image = None
-    if product.images:
-        primary = next((img for img in product.images if img.is_primary), None)
-        primary_image = primary.image_url if primary else product.images[0].image_url
-
     return {
-        **model_to_dict(
-            product,
-            exclude=['deleted_at', 'created_by_id', 'updated_by_id', 'deleted_by_id',
-                     'description', 'how_to_use', 'ingredients',
-                     'brand_id', 'category_id']
-        ),
+        **model_to_dict(product, exclude=LIST_ITEM_EXCLUDE),
         "brand": format_brand(product.brand),
         "category": format_category(product.category),
-        "product_image": primary_image,
+        "product_image": get_primary_image_url(product),
         "tags": [format_tag(tag) for tag in product.tags]
     }
 
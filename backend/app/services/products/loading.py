@@ -0,0 +1,54 @@
+"""
+Loader options for product list views.
+
+Joined-loading both images and tags multiplies rows per product and
+forces SQLAlchemy to wrap LIMIT queries in a subquery. List views only
+need the columns format_product_list_item emits, brand/category names,
+tags and one image URL, so they load exactly that:
+
+- load_only() of the emitted columns (plus the brand/category FKs)
+- brand/category as many-to-one joins (one row each, no fan-out)
+- tags through selectinload (one extra IN query per page)
+- the primary image URL as a correlated LIMIT 1 subquery, evaluated
+  only for the rows the page returns, instead of the images collection
+"""
+from functools import lru_cache
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload, load_only, with_expression
+
+from app.models.brand import Brand
+from app.models.category import Category
+from app.models.product import Product, ProductImage, Tag
+from .helpers import LIST_ITEM_EXCLUDE
+
+# Same choice as get_primary_image_url(): primary first, then display order
+PRIMARY_IMAGE_URL = (
+    select(ProductImage.image_url)
+    .where(ProductImage.product_id == Product.id)
+    .order_by(ProductImage.is_primary.desc(), ProductImage.display_order, ProductImage.id)
+    .limit(1)
+    .correlate(Product)
+    .scalar_subquery()
+)
+
+
+@lru_cache(maxsize=1)
+def _list_columns():
+    keep = [
+        getattr(Product, column.key) for column in Product.__table__.columns
+        if column.key not in LIST_ITEM_EXCLUDE
+    ]
+    # FKs are needed to attach brand/category
+    return tuple(keep + [Product.brand_id, Product.category_id])
+
+
+def product_list_options():
+    """Query options for queries whose rows go through format_product_list_item"""
+    return (
+        load_only(*_list_columns()),
+        joinedload(Product.brand).load_only(Brand.id, Brand.name, Brand.slug),
+        joinedload(Product.category).load_only(Category.id, Category.name, Category.slug),
+        selectinload(Product.tags).load_only(Tag.id, Tag.name, Tag.slug),
+        with_expression(Product.primary_image_url, PRIMARY_IMAGE_URL),
+    )
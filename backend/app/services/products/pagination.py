@@ -0,0 +1,98 @@
+import hashlib
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import asc, desc, func, tuple_
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.product import Product
+from app.utils.cursor import encode_cursor, decode_cursor
+
+# Stand-ins for NULLs in nullable sort columns, keyed by sort_by
+KEYSET_NULL_VALUES = {
+    "rating": 0,
+    "popularity": 0,
+}
+
+
+def count_products(query, cache_name: Optional[str] = None, params: Optional[dict] = None) -> int:
+    """
+    COUNT for a product list query.
+
+    Eager loads, list-view columns and ORDER BY are dropped so the count
+    only selects product ids. With cache_name the result is cached per
+    filter set and dropped on any product write.
+    """
+    def load():
+        return query.enable_eagerloads(False).with_entities(Product.id).order_by(None).count()
+
+    if cache_name is None:
+        return load()
+
+    raw = json.dumps(params or {}, sort_keys=True, default=str)
+    key = f"products:count:{cache_name}:{hashlib.sha1(raw.encode()).hexdigest()}"
+    return cache.get_or_load(
+        key, load, ttl_seconds=settings.PRODUCT_COUNT_CACHE_TTL_SECONDS, tags=["products"])
+
+
+def _parse_value(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(str(value))
+    return python_type(value)
+
+
+def keyset_page(
+    query,
+    column,
+    descending: bool,
+    limit: int,
+    cursor: Optional[str] = None,
+    null_value: Any = None
+) -> Tuple[List[Product], Optional[str]]:
+    """
+    One page ordered by (column, Product.id), continuing after `cursor`.
+
+    Uses a row-value comparison instead of OFFSET, so every page costs the
+    same. null_value stands in for NULLs in nullable sort columns so the
+    comparison never skips rows. Raises ValueError for a bad cursor.
+    """
+    sort_key = func.coalesce(column, null_value) if null_value is not None else column
+    order = desc if descending else asc
+
+    if cursor:
+        last = decode_cursor(cursor)
+        try:
+            last_value = _parse_value(column, last["v"])
+            last_id = str(last["id"])
+        except (KeyError, TypeError, ArithmeticError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+
+        boundary = tuple_(sort_key, Product.id)
+        query = query.filter(
+            boundary < tuple_(last_value, last_id) if descending
+            else boundary > tuple_(last_value, last_id)
+        )
+
+    # One extra row tells whether another page exists
+    rows = query.order_by(order(sort_key), order(Product.id)).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row = rows[-1]
+        value = getattr(last_row, column.key)
+        if value is None:
+            value = null_value
+        next_cursor = encode_cursor({
+            "v": value.isoformat() if isinstance(value, datetime) else value,
+            "id": last_row.id
+        })
+    return rows, next_cursor
@@ -1,11 +1,51 @@
 from datetime import datetime, timezone, timedelta
-from sqlalchemy.orm import Session, joinedload
+from typing import Optional
+from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from app.models.product import Product
 from app.models.brand import Brand
 from app.models.category import Category
 from app.utils.responses import ResponseHandler
+from app.services.categories import category_subtree_ids
 from .helpers import format_product_list_item
+from .loading import product_list_options
+from .pagination import count_products, keyset_page
+
+
+def _paginated_list(query, resource_name: str, sort_column, page: int, limit: int,
+                    cursor: Optional[str], cursor_mode: bool, include_total: Optional[bool],
+                    count_name: str, count_params: dict, null_value=None):
+    """Page (OFFSET) or cursor (keyset on sort_column desc + id) response for a list query"""
+    cursor_mode = cursor_mode or cursor is not None
+    total = None
+    if include_total or (include_total is None and not cursor_mode):
+        total = count_products(query, count_name, count_params)
+
+    if cursor_mode:
+        try:
+            products, next_cursor = keyset_page(
+                query, sort_column, True, limit, cursor, null_value=null_value)
+        except ValueError:
+            ResponseHandler.bad_request("Invalid cursor")
+
+        return ResponseHandler.get_cursor_list_success(
+            resource_name=resource_name,
+            data=[format_product_list_item(p) for p in products],
+            limit=limit,
+            next_cursor=next_cursor,
+            total=total
+        )
+
+    products = query.order_by(desc(sort_column)).offset(
+        (page - 1) * limit).limit(limit).all()
+
+    return ResponseHandler.get_list_success(
+        resource_name=resource_name,
+        data=[format_product_list_item(p) for p in products],
+        total=total,
+        limit=limit,
+        page=page
+    )
 
 
 class ProductDiscoveryService:
@@ -14,18 +54,13 @@ class ProductDiscoveryService:
     def get_featured(db: Session, limit: int = 10):
         """Get featured products"""
 
-        query = db.query(Product).options(
-            joinedload(Product.brand),
-            joinedload(Product.category),
-            joinedload(Product.images),
-            joinedload(Product.tags)
-        ).filter(
+        query = db.query(Product).options(*product_list_options()).filter(
             Product.deleted_at.is_(None),
             Product.is_featured == True,
             Product.is_available == True
         )
 
-        total = query.count()
+        total = count_products(query, "featured", {})
         products = query.order_by(
             desc(Product.rating_average),
             desc(Product.views_count)
@@ -47,18 +82,13 @@ class ProductDiscoveryService:
 
         since = datetime.now(timezone.utc) - timedelta(days=days)
 
-        query = db.query(Product).options(
-            joinedload(Product.brand),
-            joinedload(Product.category),
-            joinedload(Product.images),
-            joinedload(Product.tags)
-        ).filter(
+        query = db.query(Product).options(*product_list_options()).filter(
             Product.deleted_at.is_(None),
             Product.is_available == True,
             Product.updated_at >= since
         )
 
-        total = query.count()
+        total = count_products(query, "trending", {"days": days})
         products = query.order_by(desc(Product.views_count)).limit(limit).all()
 
         products_data = [format_product_list_item(p) for p in products]
@@ -72,55 +102,37 @@ class ProductDiscoveryService:
         )
 
     @staticmethod
-    def get_new_arrivals(db: Session, days: int = 30, limit: int = 10, page: int = 1):
+    def get_new_arrivals(db: Session, days: int = 30, limit: int = 10, page: int = 1,
+                         cursor: Optional[str] = None, cursor_mode: bool = False,
+                         include_total: Optional[bool] = None):
         """Get new arrival products"""
 
         since = datetime.now(timezone.utc) - timedelta(days=days)
 
-        query = db.query(Product).options(
-            joinedload(Product.brand),
-            joinedload(Product.category),
-            joinedload(Product.images),
-            joinedload(Product.tags)
-        ).filter(
+        query = db.query(Product).options(*product_list_options()).filter(
             Product.deleted_at.is_(None),
             Product.is_available == True,
             Product.created_at >= since
         )
 
-        total = query.count()
-        products = query.order_by(desc(Product.created_at))\
-            .offset((page - 1) * limit)\
-            .limit(limit)\
-            .all()
-
-        products_data = [format_product_list_item(p) for p in products]
-
-        return ResponseHandler.get_list_success(
-            resource_name="Products New Arrival",
-            data=products_data,
-            total=total,
-            limit=limit,
-            page=page
+        return _paginated_list(
+            query, "Products New Arrival", Product.created_at, page, limit,
+            cursor, cursor_mode, include_total,
+            count_name="new_arrivals", count_params={"days": days}
         )
 
     @staticmethod
     def get_on_sale(db: Session, limit: int = 20):
         """Get products on sale"""
 
-        query = db.query(Product).options(
-            joinedload(Product.brand),
-            joinedload(Product.category),
-            joinedload(Product.images),
-            joinedload(Product.tags)
-        ).filter(
+        query = db.query(Product).options(*product_list_options()).filter(
             Product.deleted_at.is_(None),
             Product.is_available == True,
             Product.sale_price.isnot(None),
             Product.sale_price < Product.price
         )
 
-        total = query.count()
+        total = count_products(query, "on_sale", {})
         products = query.order_by(
             desc((Product.price - Product.sale_price) / Product.price)
         ).limit(limit).all()
@@ -136,7 +148,9 @@ class ProductDiscoveryService:
         )
 
     @staticmethod
-    def get_by_brand(db: Session, brand_slug: str, page: int = 1, limit: int = 20):
+    def get_by_brand(db: Session, brand_slug: str, page: int = 1, limit: int = 20,
+                     cursor: Optional[str] = None, cursor_mode: bool = False,
+                     include_total: Optional[bool] = None):
         """Get products by brand slug"""
 
         brand = db.query(Brand).filter(
@@ -147,33 +161,23 @@ class ProductDiscoveryService:
         if not brand:
             ResponseHandler.not_found_error("Brand", brand_slug)
 
-        query = db.query(Product).options(
-            joinedload(Product.brand),
-            joinedload(Product.category),
-            joinedload(Product.images),
-            joinedload(Product.tags)
-        ).filter(
+        query = db.query(Product).options(*product_list_options()).filter(
             Product.brand_id == brand.id,
             Product.deleted_at.is_(None),
             Product.is_available == True
         )
 
-        total = query.count()
-        products = query.order_by(desc(Product.rating_average)).offset(
-            (page - 1) * limit).limit(limit).all()
-
-        products_data = [format_product_list_item(p) for p in products]
-
-        return ResponseHandler.get_list_success(
-            resource_name=f"Products by brand '{brand.name}'",
-            data=products_data,
-            total=total,
-            limit=limit,
-            page=page
+        return _paginated_list(
+            query, f"Products by brand '{brand.name}'", Product.rating_average, page, limit,
+            cursor, cursor_mode, include_total,
+            count_name="brand", count_params={"brand_id": brand.id},
+            null_value=0
         )
 
     @staticmethod
-    def get_by_category(db: Session, category_slug: str, page: int = 1, limit: int = 20):
+    def get_by_category(db: Session, category_slug: str, page: int = 1, limit: int = 20,
+                        cursor: Optional[str] = None, cursor_mode: bool = False,
+                        include_total: Optional[bool] = None):
         """Get products by category slug"""
 
         category = db.query(Category).filter(
@@ -184,29 +188,18 @@ class ProductDiscoveryService:
         if not category:
             ResponseHandler.not_found_error("Category", category_slug)
 
-        query = db.query(Product).options(
-            joinedload(Product.brand),
-            joinedload(Product.category),
-            joinedload(Product.images),
-            joinedload(Product.tags)
-        ).filter(
-            Product.category_id == category.id,
+        # The category and all of its subcategories, through the path index
+        query = db.query(Product).options(*product_list_options()).filter(
+            Product.category_id.in_(category_subtree_ids(category)),
             Product.deleted_at.is_(None),
             Product.is_available == True
         )
 
-        total = query.count()
-        products = query.order_by(desc(Product.rating_average)).offset(
-            (page - 1) * limit).limit(limit).all()
-
-        products_data = [format_product_list_item(p) for p in products]
-
-        return ResponseHandler.get_list_success(
-            resource_name=f"Products by category '{category.name}'",
-            data=products_data,
-            total=total,
-            limit=limit,
-            page=page
+        return _paginated_list(
+            query, f"Products by category '{category.name}'", Product.rating_average, page, limit,
+            cursor, cursor_mode, include_total,
+            count_name="category", count_params={"category_id": category.id},
+            null_value=0
         )
 
     @staticmethod
@@ -221,12 +214,7 @@ class ProductDiscoveryService:
         if not product:
             ResponseHandler.not_found_error("Product", product_id)
 
-        query = db.query(Product).options(
-            joinedload(Product.brand),
-            joinedload(Product.category),
-            joinedload(Product.images),
-            joinedload(Product.tags)
-        ).filter(
+        query = db.query(Product).options(*product_list_options()).filter(
             Product.id != product_id,
             Product.category_id == product.category_id,
             Product.deleted_at.is_(None),
@@ -238,7 +226,7 @@ class ProductDiscoveryService:
                 Product.concerns.op('&&')(product.concerns)
             )
 
-        total = query.count()
+        total = count_products(query, "related", {"product_id": product_id})
         products = query.order_by(
             desc(Product.rating_average)).limit(limit).all()
 
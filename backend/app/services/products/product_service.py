@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime, timezone
+from typing import Optional
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, desc, asc
 
@@ -7,6 +8,7 @@ from app.models.product import Product, Tag, ProductVariant, ProductImage
 from app.models.brand import Brand
 from app.models.category import Category
 from app.utils.responses import ResponseHandler
+from app.core.cache import invalidate
 from app.schemas.products import (
     ProductCreateRequest,
     ProductUpdateRequest,
@@ -14,12 +16,17 @@ from app.schemas.products import (
     UpdateStockRequest
 )
 from .helpers import format_product_list_item, format_product_detail
-from app.elastic.service import search_products_query
+from .loading import product_list_options
+from .pagination import KEYSET_NULL_VALUES, count_products, keyset_page
+from app.elastic.service import (
+    async_search_products_query, parse_facets, open_search_pit, close_search_pit)
+from app.elastic.search_cache import search_cache
+from app.utils.cursor import encode_cursor, decode_cursor
 
 
 class ProductService:
     @staticmethod
-    def search_products_with_es(
+    async def search_products_with_es(
         keyword,
         min_price,
         max_price,
@@ -31,10 +38,56 @@ class ProductService:
         concerns=None,
         benefits=None,
         tags=None,
-        is_available=True
+        category_id=None,
+        is_available=True,
+        include_facets=False,
+        price_interval=None,
+        cursor=None,
+        cursor_mode=False,
+        use_pit=False
     ):
+        search_after = None
+        pit_id = None
+        cursor_mode = cursor_mode or cursor is not None
+        if cursor:
+            try:
+                state = decode_cursor(cursor)
+            except ValueError:
+                ResponseHandler.error_response(message="Invalid cursor")
+            search_after = state.get("after")
+            pit_id = state.get("pit")
+
+        # PIT pages are bound to one snapshot, caching them buys nothing
+        cache_params = None
+        if search_cache.enabled and not pit_id and not (cursor_mode and use_pit):
+            cache_params = {
+                "keyword": keyword,
+                "min_price": min_price,
+                "max_price": max_price,
+                "limit": limit,
+                "page": None if cursor_mode else page,
+                "brand": brand,
+                "category": category,
+                "skin_types": skin_types,
+                "concerns": concerns,
+                "benefits": benefits,
+                "tags": tags,
+                "category_id": category_id,
+                "is_available": is_available,
+                "include_facets": include_facets,
+                "price_interval": price_interval if include_facets else None,
+                "cursor_mode": cursor_mode,
+                "search_after": search_after
+            }
+            cached = await search_cache.get(cache_params)
+            if cached is not None:
+                return cached
+
         try:
-            response = search_products_query(
+            if cursor_mode and use_pit and not pit_id:
+                pit_id = await open_search_pit()
+
+            response = await async_search_products_query(
                 keyword=keyword,
                 min_price=min_price,
                 max_price=max_price,
@@ -46,33 +99,69 @@ class ProductService:
                 concerns=concerns,
                 benefits=benefits,
                 tags=tags,
-                is_available=is_available
+                category_id=category_id,
+                is_available=is_available,
+                include_facets=include_facets,
+                price_interval=price_interval,
+                cursor_mode=cursor_mode,
+                search_after=search_after,
+                pit_id=pit_id
             )
 
-            total = response['hits']['total']['value']
             hits = response['hits']['hits']
             products_data = [hit['_source'] for hit in hits]
 
-            return ResponseHandler.get_list_success(
-                resource_name="Products",
-                data=products_data,
-                total=total,
-                limit=limit,
-                page=page
-            )
+            if cursor_mode:
+                # ES may hand back a refreshed PIT id
+                pit_id = response.get('pit_id', pit_id)
+                next_cursor = None
+                if len(hits) == limit:
+                    state = {"after": hits[-1]['sort']}
+                    if pit_id:
+                        state["pit"] = pit_id
+                    next_cursor = encode_cursor(state)
+                elif pit_id:
+                    await close_search_pit(pit_id)
+
+                total = response['hits'].get('total')
+                result = ResponseHandler.get_cursor_list_success(
+                    resource_name="Products",
+                    data=products_data,
+                    limit=limit,
+                    next_cursor=next_cursor,
+                    total=total['value'] if total else None
+                )
+            else:
+                result = ResponseHandler.get_list_success(
+                    resource_name="Products",
+                    data=products_data,
+                    total=response['hits']['total']['value'],
+                    limit=limit,
+                    page=page
+                )
+            if include_facets:
+                result["facets"] = parse_facets(
+                    response.get("aggregations"), price_interval)
+
+            if cache_params is not None:
+                await search_cache.set(cache_params, result)
+            return result
         except Exception as e:
             return ResponseHandler.error_response(message=str(e))
 
     @staticmethod
-    def get_all_products(db: Session, filters: dict, page: int = 1, limit: int = 20):
-        """Get all products with filters"""
+    def get_all_products(
+        db: Session,
+        filters: dict,
+        page: int = 1,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        cursor_mode: bool = False,
+        include_total: Optional[bool] = None
+    ):
+        """Get all products with filters (page or keyset pagination)"""
 
-        query = db.query(Product).options(
-            joinedload(Product.brand),
-            joinedload(Product.category),
-            joinedload(Product.images),
-            joinedload(Product.tags)
-        ).filter(Product.deleted_at.is_(None))
+        query = db.query(Product).options(*product_list_options()).filter(Product.deleted_at.is_(None))
 
         # Search by name only
         if filters.get('search'):
@@ -124,13 +213,34 @@ class ProductService:
             'name': Product.name
         }.get(sort_by, Product.created_at)
 
+        # Totals are optional in cursor mode and cached per filter set otherwise
+        cursor_mode = cursor_mode or cursor is not None
+        total = None
+        if include_total or (include_total is None and not cursor_mode):
+            total = count_products(query, "all", filters)
+
+        if cursor_mode:
+            try:
+                products, next_cursor = keyset_page(
+                    query, sort_column, sort_order != 'asc', limit, cursor,
+                    null_value=KEYSET_NULL_VALUES.get(sort_by))
+            except ValueError:
+                ResponseHandler.bad_request("Invalid cursor")
+
+            return ResponseHandler.get_cursor_list_success(
+                resource_name="Products",
+                data=[format_product_list_item(p) for p in products],
+                limit=limit,
+                next_cursor=next_cursor,
+                total=total
+            )
+
         if sort_order == 'asc':
             query = query.order_by(asc(sort_column))
         else:
             query = query.order_by(desc(sort_column))
 
         # Pagination
-        total = query.count()
         products = query.offset((page - 1) * limit).limit(limit).all()
 
         products_data = [format_product_list_item(p) for p in products]
@@ -305,6 +415,7 @@ class ProductService:
                     db.add(variant)
 
             db.commit()
+            invalidate("products", "tags")
             db.expire(product)
 
             product = db.query(Product).options(
@@ -381,6 +492,7 @@ class ProductService:
         product.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate("products", "tags")
         db.refresh(product)
 
         return ResponseHandler.update_success("Product", product_id, product)
@@ -404,6 +516,7 @@ class ProductService:
         product.deleted_by_id = deleted_by_id
 
         db.commit()
+        invalidate("products", "tags")
 
         return ResponseHandler.delete_success("Product", product_id)
 
@@ -424,6 +537,7 @@ class ProductService:
         product.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate("products")
         db.refresh(product)
 
         status = "available" if product.is_available else "unavailable"
@@ -450,6 +564,7 @@ class ProductService:
         product.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate("products")
         db.refresh(product)
 
         status = "featured" if product.is_featured else "not featured"
@@ -532,6 +647,7 @@ class ProductService:
             tag.usage_count += 1
 
         db.commit()
+        invalidate("tags")
 
         return ResponseHandler.success(
             message=f"Added {len(new_tags)} tags",
@@ -559,6 +675,7 @@ class ProductService:
             product.tags.remove(tag)
             tag.usage_count = max(0, tag.usage_count - 1)
             db.commit()
+            invalidate("tags")
             message = "Tag removed"
         else:
             message = "Tag was not associated with product"
@@ -582,6 +699,7 @@ class ProductService:
         product.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate("products")
         db.refresh(product)
 
         return ResponseHandler.success(
@@ -1,8 +1,9 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 
 from app.models.product import Product
 from app.utils.responses import ResponseHandler
 from .helpers import format_product_list_item
+from .loading import product_list_options
 
 
 class ProductStockService:
@@ -11,12 +12,7 @@ class ProductStockService:
     def get_low_stock(db: Session, threshold: int = 10):
         """Get products with low stock"""
 
-        products = db.query(Product).options(
-            joinedload(Product.brand),
-            joinedload(Product.category),
-            joinedload(Product.images),
-            joinedload(Product.tags)
-        ).filter(
+        products = db.query(Product).options(*product_list_options()).filter(
             Product.deleted_at.is_(None),
             Product.stock_quantity > 0,
             Product.stock_quantity <= threshold
@@ -38,12 +34,7 @@ class ProductStockService:
     def get_out_of_stock(db: Session):
         """Get out of stock products"""
 
-        products = db.query(Product).options(
-            joinedload(Product.brand),
-            joinedload(Product.category),
-            joinedload(Product.images),
-            joinedload(Product.tags)
-        ).filter(
+        products = db.query(Product).options(*product_list_options()).filter(
             Product.deleted_at.is_(None),
             Product.stock_quantity == 0
         ).all()
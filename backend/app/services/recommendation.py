@@ -1,10 +1,11 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, load_only
 from sqlalchemy import desc
 from typing import List
 from app.models.order import Order, OrderItem
 from app.models.product import Product
 from app.utils.responses import ResponseHandler
 from app.services.products.helpers import format_product_list_item
+from app.services.products.loading import product_list_options
 
 
 class RecommendationService:
@@ -62,6 +63,7 @@ class RecommendationService:
         #  Step 3: Load source products to get category/concerns
         source_products = (
             db.query(Product)
+            .options(load_only(Product.category_id, Product.concerns))
             .filter(
                 Product.id.in_(source_product_ids),
                 Product.deleted_at.is_(None),
@@ -76,12 +78,7 @@ class RecommendationService:
         for source in source_products:
             query = (
                 db.query(Product)
-                .options(
-                    joinedload(Product.brand),
-                    joinedload(Product.category),
-                    joinedload(Product.images),
-                    joinedload(Product.tags),
-                )
+                .options(*product_list_options())
                 .filter(
                     Product.id.notin_(seen_ids),
                     Product.category_id == source.category_id,
@@ -14,6 +14,7 @@ from app.schemas.roles import (
     PermissionUpdateRequest
 )
 from app.utils.responses import ResponseHandler
+from app.core.cache import invalidate
 
 
 class RoleService:
@@ -170,6 +171,7 @@ class RoleService:
         role.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate(f"role:{role_id}")
         db.refresh(role)
 
         # Reload with permissions
@@ -211,6 +213,7 @@ class RoleService:
         role.deleted_by_id = deleted_by_id
 
         db.commit()
+        invalidate(f"role:{role_id}")
 
         return ResponseHandler.delete_success("Role", role_id)
 
@@ -246,6 +249,7 @@ class RoleService:
         role.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate(f"role:{role_id}")
         db.refresh(role)
 
         # Reload with permissions
@@ -280,6 +284,7 @@ class RoleService:
         role.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate(f"role:{role_id}")
         db.refresh(role)
 
         # Reload with permissions
@@ -439,6 +444,7 @@ class PermissionService:
         permission.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate("permissions")
         db.refresh(permission)
 
         return ResponseHandler.update_success("Permission", permission_id, permission)
@@ -458,6 +464,7 @@ class PermissionService:
         permission.deleted_by_id = deleted_by_id
 
         db.commit()
+        invalidate("permissions")
 
         return ResponseHandler.delete_success("Permission", permission_id)
 
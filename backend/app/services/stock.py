@@ -0,0 +1,182 @@
+"""
+Stock reservation for checkout.
+
+Stock is taken with one conditional UPDATE per table
+(stock_quantity >= requested, RETURNING the rows that had enough), so two
+checkouts can never both see the same units as available. When a statement
+touches more than one row, the rows are first locked in a fixed order
+(products, then variants, each by id) so concurrent multi-line checkouts
+queue on their first shared row instead of deadlocking.
+
+Orders paid online (VNPay) hold their stock until reservation_expires_at;
+unpaid ones are cancelled and their stock released by the sweeper.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+from sqlalchemy import Integer, String, column, select, update, values
+from sqlalchemy.orm import Session, selectinload
+from app.core.constant import OrderConstants
+from app.core.enums import OrderStatus, PaymentStatus
+from app.db.database import SessionLocal
+from app.elastic.controller import mark_products_dirty
+from app.models.order import Order
+from app.models.product import Product, ProductVariant
+
+logger = logging.getLogger(__name__)
+
+
+class StockLine(NamedTuple):
+    """Quantity of a product, or of one of its variants when variant_id is set"""
+    product_id: str
+    variant_id: Optional[str]
+    quantity: int
+
+
+class StockService:
+
+    @staticmethod
+    def _totals(lines: Iterable[StockLine]):
+        """Requested quantity per product / per variant id"""
+        products: Dict[str, int] = {}
+        variants: Dict[str, int] = {}
+        for line in lines:
+            target, key = (variants, line.variant_id) if line.variant_id else (
+                products, line.product_id)
+            target[key] = target.get(key, 0) + line.quantity
+        return products, variants
+
+    @staticmethod
+    def _lock_rows(db: Session, products: Dict[str, int], variants: Dict[str, int]):
+        # A single row cannot deadlock, so the hot single-SKU checkout skips this
+        if len(products) + len(variants) < 2:
+            return
+        for model, quantities in ((Product, products), (ProductVariant, variants)):
+            if quantities:
+                db.execute(
+                    select(model.id)
+                    .where(model.id.in_(sorted(quantities)))
+                    .order_by(model.id)
+                    .with_for_update()
+                )
+
+    @staticmethod
+    def _adjust(db: Session, model, quantities: Dict[str, int], sign: int) -> Set[str]:
+        """
+        Move each row's stock by its quantity, down when sign < 0 and then
+        only where enough is left. Returns the ids that were updated.
+        """
+        if not quantities:
+            return set()
+
+        requested = values(
+            column("id", String), column("quantity", Integer), name="requested"
+        ).data(sorted(quantities.items()))
+
+        stmt = update(model).where(model.id == requested.c.id)
+        if sign < 0:
+            stmt = stmt.where(model.stock_quantity >= requested.c.quantity).values(
+                stock_quantity=model.stock_quantity - requested.c.quantity)
+        else:
+            stmt = stmt.values(
+                stock_quantity=model.stock_quantity + requested.c.quantity)
+        stmt = stmt.returning(model.id).execution_options(synchronize_session=False)
+
+        updated = set(db.execute(stmt).scalars().all())
+        if model is Product:
+            # Bulk UPDATEs bypass the ORM change tracking the search sync uses
+            mark_products_dirty(db, updated)
+        return updated
+
+    @staticmethod
+    def reserve(db: Session, lines: List[StockLine]) -> List[StockLine]:
+        """
+        Take stock for all lines inside the caller's transaction.
+
+        Returns the lines that did not have enough stock; when any are
+        returned the caller must roll back, as the other lines were taken.
+        """
+        products, variants = StockService._totals(lines)
+        StockService._lock_rows(db, products, variants)
+
+        taken_products = StockService._adjust(db, Product, products, -1)
+        taken_variants = StockService._adjust(db, ProductVariant, variants, -1)
+
+        return [
+            line for line in lines
+            if (line.variant_id not in taken_variants if line.variant_id
+                else line.product_id not in taken_products)
+        ]
+
+    @staticmethod
+    def release(db: Session, lines: List[StockLine]):
+        """Give the lines' stock back inside the caller's transaction"""
+        products, variants = StockService._totals(lines)
+        StockService._lock_rows(db, products, variants)
+
+        StockService._adjust(db, Product, products, 1)
+        StockService._adjust(db, ProductVariant, variants, 1)
+
+    @staticmethod
+    def order_lines(order: Order) -> List[StockLine]:
+        return [
+            StockLine(item.product_id, item.variant_id, item.quantity)
+            for item in order.items
+        ]
+
+    @staticmethod
+    def release_expired_reservations(db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Cancel unpaid orders whose reservation ran out and return their stock.
+
+        Orders another worker is already handling are skipped (SKIP LOCKED).
+        They keep reservation_expires_at, unlike orders cancelled by the
+        customer or an admin. Returns the number of orders cancelled.
+        """
+        now = now or datetime.now(timezone.utc)
+
+        orders = db.query(Order).options(
+            selectinload(Order.items)
+        ).filter(
+            Order.reservation_expires_at <= now,
+            Order.status == OrderStatus.PENDING.value,
+            Order.payment_status != PaymentStatus.PAID.value
+        ).order_by(Order.id).limit(
+            OrderConstants.RESERVATION_SWEEP_BATCH
+        ).with_for_update(skip_locked=True, of=Order).all()
+
+        if not orders:
+            return 0
+
+        StockService.release(
+            db, [line for order in orders for line in StockService.order_lines(order)])
+
+        # reservation_expires_at is kept: it marks the order as cancelled by
+        # expiry, which a late VNPay payment may still revive
+        for order in orders:
+            order.status = OrderStatus.CANCELLED.value
+            order.updated_at = now
+
+        db.commit()
+        return len(orders)
+
+
+async def run_reservation_sweeper(interval: float = OrderConstants.RESERVATION_SWEEP_INTERVAL):
+    """Release expired reservations every interval seconds until cancelled"""
+
+    def sweep() -> int:
+        db = SessionLocal()
+        try:
+            return StockService.release_expired_reservations(db)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            released = await asyncio.to_thread(sweep)
+            if released:
+                logger.info("Released stock of %d expired orders", released)
+        except Exception:
+            logger.exception("Stock reservation sweep failed")
+        await asyncio.sleep(interval)
@@ -5,6 +5,7 @@ from sqlalchemy import func, desc
 
 from app.models.product import Tag, product_tags
 from app.utils.responses import ResponseHandler
+from app.core.cache import cached, invalidate
 from app.schemas.tags import TagCreateRequest, TagUpdateRequest
 
 
@@ -43,6 +44,7 @@ class TagService:
         )
 
     @staticmethod
+    @cached(key="tags:popular:{limit}", tags=["tags"])
     def get_popular_tags(db: Session, limit: int = 10):
         """Get most used tags"""
 
@@ -150,6 +152,7 @@ class TagService:
 
         db.add(tag)
         db.commit()
+        invalidate("tags")
         db.refresh(tag)
 
         return ResponseHandler.create_success("Tag", tag.id, tag)
@@ -191,6 +194,7 @@ class TagService:
         tag.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate("tags")
         db.refresh(tag)
 
         return ResponseHandler.update_success("Tag", tag_id, tag)
@@ -217,6 +221,7 @@ class TagService:
         # Delete
         db.delete(tag)
         db.commit()
+        invalidate("tags")
 
         return ResponseHandler.delete_success("Tag", tag_id)
 
@@ -286,6 +291,7 @@ class TagService:
         # Delete source tag
         db.delete(source_tag)
         db.commit()
+        invalidate("tags")
 
         return ResponseHandler.success(
             message=f"Merged tag '{source_tag.name}' into '{target_tag.name}'",
@@ -3,6 +3,7 @@ from sqlalchemy import or_, func
 from app.models.role import Role
 from app.models.user import User
 from app.utils.responses import ResponseHandler
+from app.core.cache import invalidate
 from app.schemas.users import UserCreateRequest, UserUpdateRequest
 from app.core.enums import UserStatus
 from app.core.security import hash_password
@@ -135,6 +136,7 @@ class UserService:
         user.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate(f"user:{user_id}")
         db.refresh(user)
 
         # Reload with role
@@ -167,6 +169,7 @@ class UserService:
         user.deleted_by_id = deleted_by_id
 
         db.commit()
+        invalidate(f"user:{user_id}")
 
         return ResponseHandler.delete_success("User", user_id)
 
@@ -198,6 +201,7 @@ class UserService:
         user.updated_at = datetime.now(timezone.utc)
 
         db.commit()
+        invalidate(f"user:{user_id}")
         db.refresh(user)
 
         # Reload with role
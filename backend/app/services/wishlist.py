@@ -4,18 +4,14 @@ from sqlalchemy.orm import Session, joinedload
 from app.models.wishlist import Wishlist
 from app.models.product import Product
 from app.utils.responses import ResponseHandler
+from app.services.products.helpers import get_primary_image_url
+from app.services.products.loading import PRIMARY_IMAGE_URL
 
 
 class WishlistService:
     @staticmethod
     def _get_primary_image(product: Product):
-        if not product.images:
-            return None
-        primary_image = next(
-            (img.image_url for img in product.images if img.is_primary),
-            None
-        )
-        return primary_image or product.images[0].image_url
+        return get_primary_image_url(product)
 
     @staticmethod
     def _format_wishlist_item(wishlist: Wishlist):
@@ -87,7 +83,9 @@ class WishlistService:
     @staticmethod
     def list_items(db: Session, user_id: str, page: int = 1, limit: int = 20):
         query = db.query(Wishlist).options(
-            joinedload(Wishlist.product).joinedload(Product.images)
+            joinedload(Wishlist.product)
+            .load_only(Product.name, Product.slug, Product.price, Product.sale_price)
+            .with_expression(Product.primary_image_url, PRIMARY_IMAGE_URL)
         ).filter(
             Wishlist.user_id == user_id
         )
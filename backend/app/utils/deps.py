@@ -6,10 +6,8 @@ from jose import JWTError
 from typing import Optional, Tuple
 from app.db.database import get_db
 from app.core.security import verify_access_token
-from app.models.user import User
-from app.models.role import Role
 from app.utils.responses import ResponseHandler
-from app.utils.helper import match_path
+from app.utils.principal import Principal, RoleSnapshot, get_principal
 from app.core.constant import UserRole
 
 logger = logging.getLogger(__name__)
@@ -19,18 +17,19 @@ security = HTTPBearer()
 def get_current_user_with_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> Tuple[User, str]:
+) -> Tuple[Principal, str]:
     """Get current user and token"""
     token = credentials.credentials
     try:
         # Verify & get user
         payload = verify_access_token(token)
         user_id = payload.get("user_id")
-        user = db.query(User).filter(User.id == user_id).first()
 
         if not user_id:
             ResponseHandler.invalid_credentials()
 
+        user = get_principal(db, user_id)
+
         if not user:
             ResponseHandler.not_found_error("User", user_id)
 
@@ -42,7 +41,7 @@ def get_current_user_with_token(
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     """Get current authenticated user"""
     token = credentials.credentials
 
@@ -53,10 +52,7 @@ def get_current_user(
         if not user_id:
             ResponseHandler.invalid_credentials()
 
-        user = db.query(User).filter(
-            User.id == user_id,
-            User.deleted_at.is_(None)
-        ).first()
+        user = get_principal(db, user_id)
 
         if not user:
             ResponseHandler.not_found_error("User", user_id)
@@ -68,8 +64,8 @@ def get_current_user(
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Get current active user"""
     if current_user.status != "ACTIVE":
         ResponseHandler.forbidden_error(message="Inactive User")
@@ -78,8 +74,8 @@ def get_current_active_user(
 
 def require_role(required_role: str):
     """Dependency to check user role"""
-    def role_checker(current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
-        role = db.query(Role).filter(Role.id == current_user.role_id).first()
+    def role_checker(current_user: Principal = Depends(get_current_active_user)):
+        role = current_user.role
         if not role or role.name != required_role:
             ResponseHandler.forbidden_error()
         return current_user
@@ -93,7 +89,7 @@ def require_permission():
     Usage:
         @router.get("/users")
         def get_users(
-            current_user: User = Depends(require_permission())
+            current_user: Principal = Depends(require_permission())
         ):
             pass
 
@@ -101,8 +97,7 @@ def require_permission():
     """
     def permission_checker(
         request: Request,
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_active_user)
     ):
         # Get path and method from request
         path = request.url.path
@@ -128,11 +123,8 @@ def require_permission():
             return current_user
 
         # Check if user has the required permission
-        has_permission = any(
-            match_path(
-                p.path, path) and p.method == method and p.deleted_at is None
-            for p in role.permissions
-        )
+        has_permission = _has_permission(
+            role, method, path, request.scope.get("route"))
 
         if has_permission:
             logger.info(
@@ -153,11 +145,19 @@ def require_permission():
     return permission_checker
 
 
+def _has_permission(role: RoleSnapshot, method: str, path: str, route) -> bool:
+    # Permissions are synced from route templates, so the matched route is a set lookup
+    template = getattr(route, "path", None)
+    if template is not None and (method, template) in role.permission_keys:
+        return True
+    return role.permission_index.allows(method, path)
+
+
 # Optional: For public routes
 def get_current_user_optional(
     authorization: Optional[str] = Header(None),
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[Principal]:
     """Get current user if token exists, otherwise None"""
     if not authorization:
         return None
@@ -173,12 +173,7 @@ def get_current_user_optional(
         if not user_id:
             return None
 
-        user = db.query(User).filter(
-            User.id == user_id,
-            User.deleted_at.is_(None)
-        ).first()
-
-        return user
+        return get_principal(db, user_id)
 
     except Exception:
         return None
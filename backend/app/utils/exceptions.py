@@ -1,5 +1,5 @@
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from app.core.json_response import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
@@ -8,13 +8,13 @@ async def http_exception_handler(request: Request, exc):
     """Handle HTTPException with consistent format"""
     # Check if detail is already formatted
     if isinstance(exc.detail, dict):
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
             content=exc.detail
         )
 
     # Format detail as error response
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "success": False,
@@ -31,7 +31,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         message = error["msg"]
         errors[field] = message
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "success": False,
@@ -53,7 +53,7 @@ async def integrity_error_handler(request: Request, exc: IntegrityError):
     else:
         message = "Database integrity error"
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_409_CONFLICT,
         content={
             "success": False,
@@ -66,7 +66,7 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
     """Handle generic SQLAlchemy errors"""
 
     print("⚠️ SQLAlchemy ERROR:", exc)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "success": False,
@@ -77,7 +77,7 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
 
 async def generic_exception_handler(request: Request, exc: Exception):
     """Handle all other exceptions"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "success": False,
@@ -0,0 +1,57 @@
+from typing import Dict, Iterable, Optional, Tuple
+
+_PARAM = "{}"
+
+
+class _Node:
+    __slots__ = ("children", "param", "terminal")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        self.terminal = False
+
+
+class PermissionIndex:
+    """
+    A role's permissions compiled for lookup by request path.
+
+    Patterns are grouped by (method, segment count), so only patterns that
+    could match at all are visited, and each group is a segment trie where
+    "{param}" segments become a wildcard child. A check walks at most one
+    node per path segment instead of running match_path against every
+    permission. Build once per role version and reuse.
+    """
+
+    __slots__ = ("_roots",)
+
+    def __init__(self, permissions: Iterable[Tuple[str, str]]):
+        self._roots: Dict[Tuple[str, int], _Node] = {}
+        for method, path in permissions:
+            segments = path.split("/")
+            node = self._roots.setdefault((method, len(segments)), _Node())
+            for seg in segments:
+                if seg.startswith("{") and seg.endswith("}"):
+                    if node.param is None:
+                        node.param = _Node()
+                    node = node.param
+                else:
+                    node = node.children.setdefault(seg, _Node())
+            node.terminal = True
+
+    def allows(self, method: str, path: str) -> bool:
+        """Same result as any(match_path(p, path)) over the role's permissions for method"""
+        segments = path.split("/")
+        root = self._roots.get((method, len(segments)))
+        if root is None:
+            return False
+        return self._walk(root, segments, 0)
+
+    def _walk(self, node: _Node, segments, i: int) -> bool:
+        if i == len(segments):
+            return node.terminal
+        static = node.children.get(segments[i])
+        if static is not None and self._walk(static, segments, i + 1):
+            return True
+        # A static miss deeper down may still match through a {param} here
+        return node.param is not None and self._walk(node.param, segments, i + 1)
@@ -0,0 +1,128 @@
+"""
+Cached view of the authenticated user for the auth dependencies.
+
+Routes only need the caller's id, status and role, so deps resolve a
+Principal from the two-tier cache instead of loading User / Role /
+Permission rows on every request. Entries are short-lived and tagged so
+role, permission and user changes drop them on every worker.
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import FrozenSet, Optional, Tuple
+
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.role import Role
+from app.models.user import User
+from app.utils.permission_index import PermissionIndex
+
+
+@dataclass(frozen=True)
+class RoleSnapshot:
+    id: str
+    name: str
+    is_active: bool
+    deleted_at: Optional[str]
+    # (METHOD, route template) pairs
+    permission_keys: FrozenSet[Tuple[str, str]]
+    permission_index: PermissionIndex = field(compare=False)
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: str
+    status: str
+    role_id: Optional[str]
+    role: Optional[RoleSnapshot]
+    deleted_at: Optional[str] = None
+
+
+def _enum_value(value) -> str:
+    return getattr(value, "value", value)
+
+
+def _load_user(db: Session, user_id: str) -> Optional[dict]:
+    row = db.query(User.id, User.status, User.role_id).filter(
+        User.id == user_id,
+        User.deleted_at.is_(None)
+    ).first()
+    if not row:
+        return None
+    return {"id": row.id, "status": _enum_value(row.status), "role_id": row.role_id}
+
+
+def _load_role(db: Session, role_id: str) -> Optional[dict]:
+    role = db.query(Role).options(selectinload(Role.permissions)).filter(
+        Role.id == role_id
+    ).first()
+    if not role:
+        return None
+    return {
+        "id": role.id,
+        "name": role.name,
+        "is_active": bool(role.is_active),
+        "deleted_at": role.deleted_at.isoformat() if role.deleted_at else None,
+        "permissions": sorted(
+            [_enum_value(p.method), p.path]
+            for p in role.permissions if p.deleted_at is None
+        ),
+    }
+
+
+@lru_cache(maxsize=256)
+def _build_role_snapshot(id: str, name: str, is_active: bool, deleted_at: Optional[str],
+                         permissions: Tuple[Tuple[str, str], ...]) -> RoleSnapshot:
+    keys = frozenset(permissions)
+    return RoleSnapshot(
+        id=id,
+        name=name,
+        is_active=is_active,
+        deleted_at=deleted_at,
+        permission_keys=keys,
+        permission_index=PermissionIndex(keys),
+    )
+
+
+def _role_snapshot(data: dict) -> RoleSnapshot:
+    # Keyed by the role's contents, so the keys and index are built once per
+    # role version and the cached dict is never written to
+    return _build_role_snapshot(
+        data["id"],
+        data["name"],
+        data["is_active"],
+        data["deleted_at"],
+        tuple((m, p) for m, p in data["permissions"]),
+    )
+
+
+def get_principal(db: Session, user_id: str) -> Optional[Principal]:
+    """Principal for user_id, or None if the user does not exist / was deleted"""
+    user = cache.get_or_load(
+        f"principal:user:{user_id}",
+        lambda: _load_user(db, user_id),
+        ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        tags=[f"user:{user_id}"]
+    )
+    if not user:
+        return None
+
+    role = None
+    if user["role_id"]:
+        role_data = cache.get_or_load(
+            f"principal:role:{user['role_id']}",
+            lambda: _load_role(db, user["role_id"]),
+            ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+            tags=[f"role:{user['role_id']}", "permissions"]
+        )
+        if role_data:
+            role = _role_snapshot(role_data)
+
+    return Principal(
+        id=user["id"],
+        status=user["status"],
+        role_id=user["role_id"],
+        role=role
+    )
+
@@ -24,15 +24,32 @@ class ResponseHandler:
         return ResponseHandler.success(message, data)
 
     @staticmethod
-    def get_list_success(resource_name: str, data: Any, total: int, page: int, limit: int):
-        """Response cho GET list với pagination"""
-        total_pages = (total + limit - 1) // limit  # Ceiling division
+    def get_list_success(resource_name: str, data: Any, total: Optional[int], page: int, limit: int):
+        """Response cho GET list với pagination (total=None: bỏ qua đếm)"""
+        if total is None:
+            meta = {"page": page, "limit": limit}
+        else:
+            total_pages = (total + limit - 1) // limit  # Ceiling division
+            meta = {
+                "total": total,
+                "page": page,
+                "limit": limit,
+                "total_pages": total_pages
+            }
+        message = f"{resource_name} list retrieved successfully"
+        return ResponseHandler.success(message, data, meta)
+
+    @staticmethod
+    def get_cursor_list_success(resource_name: str, data: Any, limit: int,
+                                next_cursor: Optional[str], total: Optional[int] = None):
+        """Response cho GET list với cursor pagination"""
         meta = {
-            "total": total,
-            "page": page,
             "limit": limit,
-            "total_pages": total_pages
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
         }
+        if total is not None:
+            meta["total"] = total
         message = f"{resource_name} list retrieved successfully"
         return ResponseHandler.success(message, data, meta)
 
@@ -1,30 +1,154 @@
-from typing import Any, Dict, List
+from functools import lru_cache
+from types import UnionType
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, get_args, get_origin
 from decimal import Decimal
 from datetime import datetime
+from pydantic import BaseModel
+from sqlalchemy import Column, DateTime, Numeric
 from sqlalchemy.inspection import inspect
 
 
+def _decimal_to_float(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _datetime_to_iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _converter_for(column: Column) -> Optional[Callable[[Any], Any]]:
+    # Only these column types can hold Decimal / datetime values
+    if isinstance(column.type, Numeric):
+        return _decimal_to_float
+    if isinstance(column.type, DateTime):
+        return _datetime_to_iso
+    return None
+
+
+@lru_cache(maxsize=256)
+def compile_serializer(model: type, exclude: Tuple[str, ...] = ()) -> Callable[[Any], Dict]:
+    """Build the obj -> dict function for a model class once per exclude set"""
+    columns = [
+        column for column in inspect(model).columns
+        # query_expression() attributes are not table columns
+        if isinstance(column, Column) and column.key not in exclude
+    ]
+    keys = tuple(column.key for column in columns)
+    converters = tuple(
+        (i, converter) for i, converter in enumerate(map(_converter_for, columns))
+        if converter is not None
+    )
+
+    def serialize(obj: Any) -> Dict:
+        # Loaded column values sit in the instance dict, which is what the
+        # instrumented attribute would return; expired/deferred/unset ones
+        # still go through getattr so they load exactly as before
+        state = obj.__dict__
+        values = [state[key] if key in state else getattr(obj, key) for key in keys]
+        for i, convert in converters:
+            values[i] = convert(values[i])
+        return dict(zip(keys, values))
+
+    return serialize
+
+
 def model_to_dict(obj: Any, exclude: List[str] = None) -> Dict:
-    if exclude is None:
-        exclude = []
+    return compile_serializer(obj.__class__, tuple(exclude) if exclude else ())(obj)
+
+
+def _to_float(value):
+    return None if value is None else float(value)
+
+
+def _to_json_datetime(value):
+    # Same text pydantic emits for a datetime field in JSON mode
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def _optional(project: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    return lambda value: None if value is None else project(value)
+
+
+def _each(project: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    return lambda values: None if values is None else [project(v) for v in values]
+
+
+def _nested(schema: type) -> Callable[[Any], Dict]:
+    # Compiled on first use so self-referencing schemas (trees) still compile
+    compiled = []
+
+    def project(value):
+        if not compiled:
+            compiled.append(compile_projection(schema))
+        return compiled[0](value)
+    return project
+
+
+def _projector_for(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """Value converter for one schema field, None when the value passes as is"""
+    origin = get_origin(annotation)
+    if origin in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        inner = _projector_for(args[0]) if len(args) == 1 else None
+        return _optional(inner) if inner is not None else None
+    if origin is list:
+        args = get_args(annotation)
+        inner = _projector_for(args[0]) if args else None
+        return _each(inner) if inner is not None else None
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return _nested(annotation)
+        if annotation is float:
+            return _to_float
+        if annotation is datetime:
+            return _to_json_datetime
+    return None
+
 
-    result = {}
+_MISSING = object()
 
-    mapper = inspect(obj.__class__)
 
-    for column in mapper.columns:
-        if column.key in exclude:
-            continue
+@lru_cache(maxsize=None)
+def compile_projection(schema: type) -> Callable[[Any], Dict]:
+    """
+    Build a dict/object -> dict function shaped like schema.model_dump(mode="json").
 
-        value = getattr(obj, column.key)
+    Only keeps the schema's fields and converts float/datetime values, without
+    validating anything else, so it is meant for service output that already
+    matches the schema. Missing required fields raise KeyError.
+    """
+    defaults = tuple(
+        (name, _MISSING if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in schema.model_fields.items()
+    )
+    names = frozenset(name for name, _ in defaults)
+    required = frozenset(name for name, default in defaults if default is _MISSING)
+    converters = tuple(
+        (name, converter) for name, converter in
+        ((name, _projector_for(field.annotation)) for name, field in schema.model_fields.items())
+        if converter is not None
+    )
 
-        if isinstance(value, Decimal):
-            result[column.key] = float(value)
-        elif isinstance(value, datetime):
-            result[column.key] = value.isoformat()
-        elif value is None:
-            result[column.key] = None
+    def project(obj: Any) -> Dict:
+        if isinstance(obj, dict):
+            if obj.keys() == names:
+                # Already exactly the schema's keys (formatter output)
+                result = dict(obj)
+            elif not required <= obj.keys():
+                raise KeyError(f"{schema.__name__}: missing {sorted(required - obj.keys())}")
+            else:
+                result = {name: obj.get(name, default) for name, default in defaults}
         else:
-            result[column.key] = value
+            result = {name: getattr(obj, name, default) for name, default in defaults}
+            if any(result[name] is _MISSING for name in required):
+                raise KeyError(f"{schema.__name__}: missing attributes")
+        for name, convert in converters:
+            result[name] = convert(result[name])
+        return result
 
-    return result
+    return project
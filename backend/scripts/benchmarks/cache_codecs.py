@@ -0,0 +1,86 @@
+"""
+Compare RedisCache codecs/compression on payloads built from scripts/data.json.
+
+Usage (from backend/):
+    python -m scripts.benchmarks.cache_codecs [--number 2000]
+"""
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from app.core.codecs import CODECS, COMPRESSORS, ValueSerializer
+
+DATA_FILE = Path(__file__).resolve().parent.parent / "data.json"
+
+
+def build_payloads():
+    products = json.loads(DATA_FILE.read_text(encoding="utf-8"))["products"]
+
+    def list_item(p, i):
+        return {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "name": p["name"],
+            "slug": p["slug"],
+            "price": float(p["price"]),
+            "stock_quantity": p["stock"],
+            "product_image": f"https://cdn.example.com/{p['slug']}.jpg",
+            "is_available": True,
+            "brand_name": p["brand"],
+            "category_name": p["category"],
+            "description": p["desc"],
+            "skin_types": p["skin_types"],
+            "concerns": p["concerns"],
+            "benefits": p["benefits"],
+            "tags": p["tags"],
+            "rating_average": 4.5,
+            "review_count": 12,
+            "created_at": "2025-01-01T00:00:00+00:00",
+        }
+
+    items = [list_item(p, i) for i, p in enumerate(products)]
+    summary_text = " ".join(p["desc"] for p in products[:12])
+
+    return {
+        "review_summary": {
+            "slug": products[0]["slug"],
+            "summary": summary_text,
+            "average_rating": 4.6,
+            "review_count": 87,
+        },
+        "search_page_20": {
+            "success": True,
+            "message": "Products list retrieved successfully",
+            "data": items[:20],
+            "meta": {"total": len(items), "page": 1, "limit": 20, "total_pages": 3},
+        },
+        "product_list_all": {"data": items, "total": len(items)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--min-bytes", type=int, default=1024)
+    args = parser.parse_args()
+
+    payloads = build_payloads()
+    print(f"{'payload':<18}{'codec':<9}{'compress':<10}{'bytes':>8}"
+          f"{'encode us':>12}{'decode us':>12}")
+
+    for name, payload in payloads.items():
+        for codec in CODECS:
+            for compression in COMPRESSORS:
+                serializer = ValueSerializer(codec, compression, args.min_bytes)
+                data = serializer.dumps(payload)
+                assert serializer.loads(data) == payload
+
+                enc = timeit.timeit(lambda: serializer.dumps(payload), number=args.number)
+                dec = timeit.timeit(lambda: serializer.loads(data), number=args.number)
+                print(f"{name:<18}{codec:<9}{compression:<10}{len(data):>8}"
+                      f"{enc / args.number * 1e6:>12.1f}{dec / args.number * 1e6:>12.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
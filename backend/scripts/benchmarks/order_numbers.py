@@ -0,0 +1,65 @@
+"""
+Order numbers per second: COUNT(*) over orders vs sequence nextval vs blocks of nextval.
+
+Runs against the configured database with a temporary table of --rows fake
+orders and a temporary sequence, so real data is not touched. COUNT(*)
+gets slower as the table grows while nextval stays flat; the block
+generator only goes to the database once every --block numbers.
+
+Usage (from backend/):
+    python -m scripts.benchmarks.order_numbers [--rows 200000 --numbers 2000 --block 20]
+"""
+import argparse
+import time
+
+from sqlalchemy import Sequence, select, text
+
+from app.db.database import SessionLocal
+from app.services.order_numbers import OrderNumberGenerator
+
+
+def rate(fn, numbers: int) -> float:
+    started = time.perf_counter()
+    for _ in range(numbers):
+        fn()
+    return numbers / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--numbers", type=int, default=2000)
+    parser.add_argument("--block", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        db.execute(text(
+            "CREATE TEMP TABLE bench_orders AS "
+            "SELECT g::text AS id FROM generate_series(1, :rows) AS g"
+        ), {"rows": args.rows})
+        db.execute(text("ANALYZE bench_orders"))
+        db.execute(text("CREATE TEMP SEQUENCE bench_single_seq"))
+        db.execute(text(f"CREATE TEMP SEQUENCE bench_block_seq INCREMENT BY {args.block}"))
+
+        single = Sequence("bench_single_seq")
+        block = OrderNumberGenerator(Sequence("bench_block_seq"), args.block)
+        block._ready = True
+
+        cases = {
+            "count(*)": lambda: db.execute(text("SELECT count(id) FROM bench_orders")).scalar(),
+            "nextval": lambda: db.execute(select(single.next_value())).scalar_one(),
+            f"block of {args.block}": lambda: block.next(db),
+        }
+
+        print(f"{args.rows} existing orders")
+        print(f"{'generator':<14}{'numbers/s':>12}")
+        for name, fn in cases.items():
+            print(f"{name:<14}{rate(fn, args.numbers):>12.0f}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compare the linear match_path scan with PermissionIndex for a role's permission check.
+
+Usage (from backend/):
+    python -m scripts.benchmarks.permission_check [--number 20000]
+"""
+import argparse
+import random
+import timeit
+
+from app.utils.helper import match_path
+from app.utils.permission_index import PermissionIndex
+
+METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE"]
+RESOURCES = ["users", "orders", "products", "brands", "categories", "reviews",
+             "carts", "tags", "roles", "permissions", "notifications", "chat"]
+ACTIONS = ["items", "status", "cancel", "stats", "images", "variants", "me"]
+
+
+def build_permissions(count: int, rng: random.Random):
+    permissions = set()
+    while len(permissions) < count:
+        parts = [rng.choice(RESOURCES)]
+        for _ in range(rng.randint(0, 3)):
+            parts.append(rng.choice(ACTIONS) if rng.random() < 0.5 else "{id}")
+        permissions.add((rng.choice(METHODS), "/api/v1/" + "/".join(parts)))
+    return sorted(permissions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'permissions':>12}{'case':>8}{'linear us':>12}{'index us':>11}")
+
+    for count in (10, 50, 200, 500):
+        permissions = build_permissions(count, rng)
+        index = PermissionIndex(permissions)
+
+        method, template = permissions[len(permissions) // 2]
+        hit = template.replace("{id}", "0f8e2a1c")
+        cases = {"hit": (method, hit), "miss": ("GET", "/api/v1/unknown/0f8e2a1c")}
+
+        for case, (m, path) in cases.items():
+            expected = any(pm == m and match_path(pp, path) for pm, pp in permissions)
+            assert index.allows(m, path) == expected
+
+            linear = timeit.timeit(
+                lambda: any(pm == m and match_path(pp, path) for pm, pp in permissions),
+                number=args.number)
+            indexed = timeit.timeit(lambda: index.allows(m, path), number=args.number)
+            print(f"{count:>12}{case:>8}{linear / args.number * 1e6:>12.2f}"
+                  f"{indexed / args.number * 1e6:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Compare the old joinedload list query with product_list_options() on a seeded catalog.
+
+Needs the PostgreSQL database from settings. Seeded rows live under the
+brand/category/tag slugs "bench-*" and are removed with --cleanup.
+
+Usage (from backend/):
+    python -m scripts.benchmarks.product_list_loading --seed 50000
+    python -m scripts.benchmarks.product_list_loading [--pages 50 --limit 20]
+    python -m scripts.benchmarks.product_list_loading --cleanup
+"""
+import argparse
+import random
+import time
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import delete, desc, event, insert, select
+from sqlalchemy.orm import joinedload
+
+from app.db.database import SessionLocal, engine
+from app.models.brand import Brand
+from app.models.category import Category
+from app.models.product import Product, ProductImage, Tag, product_tags
+from app.services.products.helpers import format_product_list_item
+from app.services.products.loading import product_list_options
+
+BENCH = "bench"
+BATCH = 2000
+
+
+def seed(db, count: int):
+    rng = random.Random(42)
+    brand_id, category_id = str(uuid.uuid4()), str(uuid.uuid4())
+    db.execute(insert(Brand).values(id=brand_id, name=f"{BENCH}-brand", slug=f"{BENCH}-brand"))
+    db.execute(insert(Category).values(
+        id=category_id, name=f"{BENCH}-category", slug=f"{BENCH}-category"))
+
+    tag_ids = [str(uuid.uuid4()) for _ in range(20)]
+    db.execute(insert(Tag), [
+        {"id": tid, "name": f"{BENCH}-tag-{i}", "slug": f"{BENCH}-tag-{i}"}
+        for i, tid in enumerate(tag_ids)
+    ])
+
+    for start in range(0, count, BATCH):
+        products, images, links = [], [], []
+        for i in range(start, min(start + BATCH, count)):
+            pid = str(uuid.uuid4())
+            products.append({
+                "id": pid, "brand_id": brand_id, "category_id": category_id,
+                "name": f"Bench product {i}", "slug": f"{BENCH}-product-{i}",
+                "sku": f"{BENCH}-{i}", "description": "x" * 2000,
+                "price": Decimal(rng.randint(50, 2000) * 1000),
+                "stock_quantity": rng.randint(0, 500), "is_available": True,
+                "rating_average": Decimal(rng.randint(0, 500)) / 100,
+                "views_count": rng.randint(0, 10000),
+                "skin_types": ["oily"], "concerns": ["acne"], "benefits": ["hydrating"],
+            })
+            for order in range(4):
+                images.append({
+                    "id": str(uuid.uuid4()), "product_id": pid,
+                    "image_url": f"https://cdn.example.com/{pid}/{order}.jpg",
+                    "is_primary": order == 0, "display_order": order,
+                })
+            for tid in rng.sample(tag_ids, 3):
+                links.append({"product_id": pid, "tag_id": tid})
+
+        db.execute(insert(Product), products)
+        db.execute(insert(ProductImage), images)
+        db.execute(insert(product_tags), links)
+        db.commit()
+        print(f"seeded {min(start + BATCH, count)}/{count}")
+
+
+def cleanup(db):
+    brand_ids = select(Brand.id).where(Brand.slug.like(f"{BENCH}-%"))
+    product_ids = select(Product.id).where(Product.brand_id.in_(brand_ids))
+    db.execute(delete(product_tags).where(product_tags.c.product_id.in_(product_ids)))
+    db.execute(delete(ProductImage).where(ProductImage.product_id.in_(product_ids)))
+    db.execute(delete(Product).where(Product.id.in_(product_ids)))
+    db.execute(delete(Tag).where(Tag.slug.like(f"{BENCH}-%")))
+    db.execute(delete(Category).where(Category.slug.like(f"{BENCH}-%")))
+    db.execute(delete(Brand).where(Brand.slug.like(f"{BENCH}-%")))
+    db.commit()
+
+
+def legacy_options():
+    return (
+        joinedload(Product.brand),
+        joinedload(Product.category),
+        joinedload(Product.images),
+        joinedload(Product.tags),
+    )
+
+
+def run(db, options, pages: int, limit: int):
+    brand_id = db.scalar(select(Brand.id).where(Brand.slug == f"{BENCH}-brand"))
+    statements = []
+
+    def count_statement(*_):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        started = time.perf_counter()
+        for page in range(1, pages + 1):
+            rows = db.query(Product).options(*options).filter(
+                Product.brand_id == brand_id,
+                Product.deleted_at.is_(None)
+            ).order_by(desc(Product.rating_average), Product.id).offset(
+                (page - 1) * limit).limit(limit).all()
+            [format_product_list_item(p) for p in rows]
+            # Fresh identity map per page, like one request per page
+            db.expunge_all()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+    return elapsed / pages * 1000, len(statements) / pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0, help="Insert N products first")
+    parser.add_argument("--cleanup", action="store_true")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.cleanup:
+            cleanup(db)
+            return
+        if args.seed:
+            seed(db, args.seed)
+
+        print(f"{'strategy':<14}{'ms/page':>10}{'queries/page':>14}")
+        for name, options in (("joinedload", legacy_options()),
+                              ("list_options", product_list_options())):
+            run(db, options, 2, args.limit)  # warm up
+            ms, queries = run(db, options, args.pages, args.limit)
+            print(f"{name:<14}{ms:>10.2f}{queries:>14.1f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
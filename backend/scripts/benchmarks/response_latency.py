@@ -0,0 +1,111 @@
+"""
+p50/p99 latency of GET /products and /products/{id}: response_model validation vs schema_response.
+
+Services are patched to return formatted products, so this measures the
+FastAPI side of a request (routing, threadpool hops, validation and JSON
+rendering) without a database; get_db only opens an unused session.
+Requests are sent straight to the ASGI app to keep client overhead out of
+the numbers, and dependency_overrides are avoided because they make
+FastAPI re-analyse dependencies on every request.
+
+Usage (from backend/):
+    python -m scripts.benchmarks.response_latency [--requests 3000 --limit 20]
+"""
+import argparse
+import asyncio
+import time
+from unittest.mock import patch
+
+from fastapi import Depends, FastAPI
+
+from app.db.database import get_db
+from app.routes import products
+from app.schemas.products import ProductListResponse, ProductResponse, get_product_filters
+from app.services.products import ProductService
+from app.services.products.helpers import format_product_detail, format_product_list_item
+from scripts.benchmarks.serializers import build_products
+
+
+def legacy_app() -> FastAPI:
+    """The two routes as they were: dicts validated by response_model"""
+    app = FastAPI()
+
+    @app.get("/products", response_model=ProductListResponse)
+    def get_all_products(filters: dict = Depends(get_product_filters), db=Depends(get_db)):
+        return ProductService.get_all_products(db, filters, filters.pop("page"), filters.pop("limit"))
+
+    @app.get("/products/{product_id}", response_model=ProductResponse)
+    def get_product_detail(product_id: str, db=Depends(get_db)):
+        return ProductService.get_product_by_id(db, product_id)
+
+    return app
+
+
+def current_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(products.router)
+    return app
+
+
+def _scope(path: str) -> dict:
+    return {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [], "client": ("bench", 1), "server": ("bench", 80),
+    }
+
+
+async def measure(apps: dict, path: str, requests: int) -> dict:
+    """Alternate requests between the apps so machine noise hits both alike"""
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    timings = {name: [] for name in apps}
+    for _ in range(requests):
+        for name, app in apps.items():
+            started = time.perf_counter()
+            await app(_scope(path), receive, send)
+            timings[name].append(time.perf_counter() - started)
+    assert set(statuses) == {200}, statuses[:5]
+
+    result = {}
+    for name, samples in timings.items():
+        samples = sorted(samples[requests // 10:])  # drop warm-up
+        result[name] = (samples[len(samples) // 2] * 1e6, samples[int(len(samples) * 0.99)] * 1e6)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    items = build_products(args.limit)
+    list_body = {
+        "success": True, "message": "Products list retrieved successfully",
+        "data": [format_product_list_item(p) for p in items],
+        "meta": {"total": 1000, "page": 1, "limit": args.limit, "total_pages": 50},
+    }
+    detail_body = {
+        "success": True, "message": "Product retrieved successfully",
+        "data": format_product_detail(items[0]),
+    }
+
+    print(f"{'route':<18}{'app':<10}{'p50 us':>10}{'p99 us':>10}")
+    with patch.object(ProductService, "get_all_products", return_value=list_body), \
+            patch.object(ProductService, "get_product_by_id", return_value=detail_body):
+        apps = {"legacy": legacy_app(), "current": current_app()}
+        for route, path in (("/products", "/products"), ("/products/{id}", "/products/p0")):
+            for name, (p50, p99) in asyncio.run(measure(apps, path, args.requests)).items():
+                print(f"{route:<18}{name:<10}{p50:>10.0f}{p99:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Time format_product_list_item / format_product_detail for 1k products, old vs compiled model_to_dict.
+
+Usage (from backend/):
+    python -m scripts.benchmarks.serializers [--products 1000 --repeat 5]
+"""
+import argparse
+import timeit
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from sqlalchemy.inspection import inspect
+
+from app.models.brand import Brand
+from app.models.category import Category
+from app.models.product import Product, ProductImage, ProductVariant, Tag
+from app.services.products import helpers
+
+
+def legacy_model_to_dict(obj, exclude=None):
+    """model_to_dict before the compiled serializers"""
+    if exclude is None:
+        exclude = []
+    result = {}
+    for column in inspect(obj.__class__).columns:
+        if column.key in exclude or column.key == "primary_image_url":
+            continue
+        value = getattr(obj, column.key)
+        if isinstance(value, Decimal):
+            result[column.key] = float(value)
+        elif isinstance(value, datetime):
+            result[column.key] = value.isoformat()
+        elif value is None:
+            result[column.key] = None
+        else:
+            result[column.key] = value
+    return result
+
+
+def build_products(count: int):
+    now = datetime.now(timezone.utc)
+    brand = Brand(id="b1", name="Brand", slug="brand")
+    category = Category(id="c1", name="Serum", slug="serum")
+    tags = [Tag(id=f"t{i}", name=f"Tag {i}", slug=f"tag-{i}") for i in range(3)]
+
+    products = []
+    for i in range(count):
+        products.append(Product(
+            id=f"p{i}", brand_id="b1", category_id="c1", name=f"Product {i}",
+            slug=f"product-{i}", sku=f"SKU-{i}", short_description="Short",
+            description="Long description " * 20, price=Decimal("199000.00"),
+            sale_price=Decimal("149000.00"), stock_quantity=10, is_available=True,
+            is_featured=i % 2 == 0, rating_average=Decimal("4.50"), review_count=12,
+            views_count=100, skin_types=["oily"], concerns=["acne"], benefits=["hydrating"],
+            ingredients={"key_ingredients": ["Niacinamide"]}, created_at=now, updated_at=now,
+            brand=brand, category=category, tags=tags,
+            images=[ProductImage(id=f"i{i}-{n}", image_url=f"{n}.jpg", is_primary=n == 0,
+                                 display_order=n, created_at=now) for n in range(3)],
+            variants=[ProductVariant(id=f"v{i}-{n}", name=f"{n}0ml", sku=f"SKU-{i}-{n}",
+                                     price=Decimal("99000"), stock_quantity=5,
+                                     is_available=True, created_at=now) for n in range(2)],
+        ))
+    return products
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    products = build_products(args.products)
+    cases = {
+        "list_item": lambda: [helpers.format_product_list_item(p) for p in products],
+        "detail": lambda: [helpers.format_product_detail(p) for p in products],
+    }
+
+    print(f"{'case':<12}{'legacy ms':>12}{'compiled ms':>14}{'speedup':>10}")
+    for name, fn in cases.items():
+        with patch.object(helpers, "model_to_dict", legacy_model_to_dict):
+            expected = fn()
+            legacy = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        assert fn() == expected
+        compiled = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"{name:<12}{legacy * 1000:>12.2f}{compiled * 1000:>14.2f}"
+              f"{legacy / compiled:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Hammer one product with concurrent reservations and check nothing is oversold.
+
+Runs against the configured database: the first product gets --stock
+units, every checkout tries to take 1 of them (half also take 1 unit of a
+second, well-stocked product, in random line order, to exercise lock
+ordering), and the original stock is restored afterwards. Fails if more
+units were reserved than existed, if stock went negative, or if any
+checkout hit a deadlock.
+
+Usage (from backend/):
+    python -m scripts.benchmarks.stock_contention [--checkouts 500 --stock 100]
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.product import Product
+from app.services.stock import StockLine, StockService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--checkouts", type=int, default=500)
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(settings.DATABASE_URL, pool_size=args.workers, max_overflow=0)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    with Session() as db:
+        products = db.query(Product).order_by(Product.id).limit(2).all()
+        assert len(products) == 2, "needs at least two products"
+        hot, other = (p.id for p in products)
+        original = {p.id: p.stock_quantity for p in products}
+        products[0].stock_quantity = args.stock
+        products[1].stock_quantity = args.checkouts
+        db.commit()
+
+    def checkout(i: int) -> str:
+        lines = [StockLine(hot, None, 1)]
+        if i % 2:
+            lines.append(StockLine(other, None, 1))
+            random.shuffle(lines)
+        with Session() as db:
+            try:
+                if StockService.reserve(db, lines):
+                    db.rollback()
+                    return "short"
+                db.commit()
+                return "ok"
+            except OperationalError as e:
+                db.rollback()
+                return "deadlock" if "deadlock" in str(e).lower() else "error"
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.workers) as pool:
+            results = list(pool.map(checkout, range(args.checkouts)))
+        elapsed = time.perf_counter() - started
+
+        with Session() as db:
+            left = dict(db.query(Product.id, Product.stock_quantity)
+                        .filter(Product.id.in_([hot, other])).all())
+    finally:
+        with Session() as db:
+            for product_id, stock in original.items():
+                db.get(Product, product_id).stock_quantity = stock
+            db.commit()
+
+    counts = {status: results.count(status) for status in ("ok", "short", "deadlock", "error")}
+    print(f"{args.checkouts} checkouts in {elapsed * 1000:.0f} ms: {counts}")
+    print(f"stock left: hot={left[hot]} other={left[other]}")
+
+    assert counts["deadlock"] == counts["error"] == 0
+    assert counts["ok"] == min(args.checkouts, args.stock), "oversold or undersold"
+    assert left[hot] == args.stock - counts["ok"] >= 0
+
+
+if __name__ == "__main__":
+    main()
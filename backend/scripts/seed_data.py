@@ -9,6 +9,7 @@ from pathlib import Path
 from app.models.product import Product, ProductImage, ProductVariant, Tag
 from app.models.category import Category
 from app.models.brand import Brand
+from app.services.categories import CategoryService
 from app.db.database import SessionLocal
 from datetime import datetime, timezone
 
@@ -113,6 +114,7 @@ def seed_categories(db, categories_data):
             categories.append(existing)
 
     db.commit()
+    CategoryService.rebuild_paths(db)
     return categories
 
 
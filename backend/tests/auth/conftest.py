@@ -153,11 +153,11 @@ def mock_current_user(mock_user):
 #  TestClient
 
 @pytest.fixture
-def client(mock_current_user):
+def client(mock_current_user, as_principal):
     """Client có auth — dùng cho 2FA endpoints."""
     app = FastAPI()
     app.include_router(router)
-    app.dependency_overrides[get_current_active_user] = lambda: mock_current_user
+    app.dependency_overrides[get_current_active_user] = lambda: as_principal(mock_current_user)
     app.dependency_overrides[get_db] = lambda: MagicMock()
     return TestClient(app)
 
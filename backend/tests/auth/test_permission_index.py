@@ -0,0 +1,56 @@
+import random
+import pytest
+from app.utils.helper import match_path
+from app.utils.permission_index import PermissionIndex
+
+
+@pytest.fixture
+def index():
+    return PermissionIndex([
+        ("GET", "/products"),
+        ("GET", "/products/{product_id}"),
+        ("GET", "/products/{product_id}/reviews"),
+        ("POST", "/products/{product_id}/reviews"),
+        ("GET", "/orders/me/{order_id}"),
+        ("PUT", "/orders/{order_id}/cancel"),
+    ])
+
+
+class TestPermissionIndex:
+
+    def test_static_path(self, index):
+        assert index.allows("GET", "/products")
+
+    def test_param_segment(self, index):
+        assert index.allows("GET", "/products/abc-123")
+        assert index.allows("POST", "/products/abc-123/reviews")
+
+    def test_method_must_match(self, index):
+        assert not index.allows("DELETE", "/products/abc-123")
+
+    def test_segment_count_must_match(self, index):
+        assert not index.allows("GET", "/products/abc/reviews/1")
+
+    def test_backtracks_from_static_to_param(self, index):
+        # "me" khớp nhánh tĩnh ở /orders/me/... nhưng cancel chỉ có ở nhánh {order_id}
+        assert index.allows("PUT", "/orders/me/cancel")
+
+    def test_empty_index(self):
+        assert not PermissionIndex([]).allows("GET", "/products")
+
+    def test_agrees_with_match_path(self):
+        rng = random.Random(7)
+        words = ["users", "orders", "{id}", "me", "items", "{item_id}"]
+        perms = [
+            (rng.choice(["GET", "POST"]),
+             "/" + "/".join(rng.choice(words) for _ in range(rng.randint(1, 4))))
+            for _ in range(200)
+        ]
+        index = PermissionIndex(perms)
+        concrete = ["users", "orders", "me", "items", "42"]
+
+        for _ in range(500):
+            method = rng.choice(["GET", "POST"])
+            path = "/" + "/".join(rng.choice(concrete) for _ in range(rng.randint(1, 4)))
+            expected = any(m == method and match_path(p, path) for m, p in perms)
+            assert index.allows(method, path) == expected
@@ -0,0 +1,182 @@
+import pytest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from fastapi import HTTPException
+from app.core.cache import TwoTierCache
+from app.core.enums import HTTPMethod, UserStatus
+from app.models.role import Role
+from app.utils.deps import require_permission, require_role
+from app.utils.permission_index import PermissionIndex
+from app.utils.principal import Principal, RoleSnapshot, get_principal
+from tests.core.test_cache import FakeRedisCache
+
+
+def make_db(user_row, role):
+    """query(User.id, ...) trả về user_row, query(Role) trả về role."""
+    db = MagicMock()
+
+    def query(*entities):
+        q = MagicMock()
+        result = role if entities[0] is Role else user_row
+        q.filter.return_value.first.return_value = result
+        q.options.return_value.filter.return_value.first.return_value = result
+        return q
+
+    db.query.side_effect = query
+    return db
+
+
+@pytest.fixture
+def role_id():
+    return str(uuid.uuid4())
+
+
+@pytest.fixture
+def user_row(role_id):
+    return SimpleNamespace(id=str(uuid.uuid4()), status=UserStatus.ACTIVE, role_id=role_id)
+
+
+@pytest.fixture
+def orm_role(role_id):
+    role = MagicMock()
+    role.id = role_id
+    role.name = "CUSTOMER"
+    role.is_active = True
+    role.deleted_at = None
+    role.permissions = [
+        SimpleNamespace(method=HTTPMethod.GET, path="/orders/{order_id}", deleted_at=None),
+        SimpleNamespace(method=HTTPMethod.DELETE, path="/orders/{order_id}", deleted_at="x"),
+    ]
+    return role
+
+
+@pytest.fixture
+def enabled_cache():
+    fake = FakeRedisCache()
+    tier = TwoTierCache(local_maxsize=16, local_ttl_seconds=30, default_ttl_seconds=60)
+    with patch("app.core.cache.redis_cache", fake), \
+            patch("app.core.cache.cache", tier), \
+            patch("app.utils.principal.cache", tier):
+        yield tier
+
+
+def make_principal(name="CUSTOMER", keys=(), is_active=True):
+    keys = frozenset(keys)
+    role = RoleSnapshot(id="r1", name=name, is_active=is_active, deleted_at=None,
+                        permission_keys=keys, permission_index=PermissionIndex(keys))
+    return Principal(id="u1", status="ACTIVE", role_id="r1", role=role)
+
+
+def make_request(path, method="GET", route_path=None):
+    request = MagicMock()
+    request.url.path = path
+    request.method = method
+    request.scope = {"route": SimpleNamespace(path=route_path)} if route_path else {}
+    return request
+
+
+class TestGetPrincipal:
+
+    def test_builds_principal_from_rows(self, user_row, orm_role):
+        db = make_db(user_row, orm_role)
+
+        principal = get_principal(db, user_row.id)
+
+        assert principal.id == user_row.id
+        assert principal.status == "ACTIVE"
+        assert principal.role.name == "CUSTOMER"
+        # Permission đã xóa mềm bị loại
+        assert principal.role.permission_keys == frozenset({("GET", "/orders/{order_id}")})
+
+    def test_unknown_user_returns_none(self, orm_role):
+        db = make_db(None, orm_role)
+        assert get_principal(db, "missing") is None
+
+    def test_cached_principal_skips_db(self, enabled_cache, user_row, orm_role):
+        db = make_db(user_row, orm_role)
+
+        first = get_principal(db, user_row.id)
+        calls = db.query.call_count
+        second = get_principal(db, user_row.id)
+
+        assert db.query.call_count == calls
+        assert second == first
+        # Index được build một lần cho mỗi phiên bản role
+        assert second.role.permission_index is first.role.permission_index
+
+    def test_cached_role_data_is_not_modified(self, enabled_cache, user_row, orm_role, role_id):
+        db = make_db(user_row, orm_role)
+        get_principal(db, user_row.id)
+
+        cached = enabled_cache.get(f"principal:role:{role_id}")
+        assert set(cached) == {"id", "name", "is_active", "deleted_at", "permissions"}
+
+    def test_role_invalidation_reloads_permissions(self, enabled_cache, user_row, orm_role, role_id):
+        db = make_db(user_row, orm_role)
+        get_principal(db, user_row.id)
+
+        orm_role.permissions = []
+        enabled_cache.invalidate_tags(f"role:{role_id}")
+
+        assert get_principal(db, user_row.id).role.permission_keys == frozenset()
+
+    def test_user_invalidation_reloads_status(self, enabled_cache, user_row, orm_role):
+        db = make_db(user_row, orm_role)
+        get_principal(db, user_row.id)
+
+        user_row.status = UserStatus.INACTIVE
+        enabled_cache.invalidate_tags(f"user:{user_row.id}")
+
+        assert get_principal(db, user_row.id).status == "INACTIVE"
+
+
+class TestPermissionChecker:
+
+    def test_route_template_lookup(self):
+        checker = require_permission()
+        user = make_principal(keys=[("GET", "/orders/{order_id}")])
+        request = make_request("/orders/abc", route_path="/orders/{order_id}")
+
+        assert checker(request, user) is user
+
+    def test_falls_back_to_path_matching(self):
+        checker = require_permission()
+        user = make_principal(keys=[("GET", "/orders/{id}")])
+
+        assert checker(make_request("/orders/abc"), user) is user
+
+    def test_denied_for_other_method(self):
+        checker = require_permission()
+        user = make_principal(keys=[("GET", "/orders/{order_id}")])
+        request = make_request("/orders/abc", method="DELETE", route_path="/orders/{order_id}")
+
+        with pytest.raises(HTTPException) as exc:
+            checker(request, user)
+        assert exc.value.status_code == 403
+
+    def test_inactive_role_denied(self):
+        checker = require_permission()
+        user = make_principal(keys=[("GET", "/orders")], is_active=False)
+
+        with pytest.raises(HTTPException) as exc:
+            checker(make_request("/orders", route_path="/orders"), user)
+        assert exc.value.status_code == 403
+
+    def test_admin_bypass(self):
+        checker = require_permission()
+        user = make_principal(name="ADMIN")
+
+        assert checker(make_request("/anything"), user) is user
+
+
+class TestRequireRole:
+
+    def test_matching_role(self):
+        user = make_principal(name="ADMIN")
+        assert require_role("ADMIN")(user) is user
+
+    def test_other_role_forbidden(self):
+        with pytest.raises(HTTPException) as exc:
+            require_role("ADMIN")(make_principal(name="CUSTOMER"))
+        assert exc.value.status_code == 403
@@ -67,15 +67,15 @@ def mock_current_user(mock_admin_user):
 
 #  TestClient
 @pytest.fixture
-def client(mock_current_user):
+def client(mock_current_user, as_principal):
     """
     TestClient với auth bypass cho protected endpoints.
     Public endpoints (GET /brands, GET /brands/{id}) không cần override.
     """
     app = FastAPI()
     app.include_router(router)
-    app.dependency_overrides[get_current_user] = lambda: mock_current_user
-    app.dependency_overrides[get_current_active_user] = lambda: mock_current_user
+    app.dependency_overrides[get_current_user] = lambda: as_principal(mock_current_user)
+    app.dependency_overrides[get_current_active_user] = lambda: as_principal(mock_current_user)
     app.dependency_overrides[get_db] = lambda: MagicMock()
     return TestClient(app)
 
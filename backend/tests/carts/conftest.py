@@ -154,11 +154,11 @@ def mock_current_user(user_id):
 #  TestClient
 
 @pytest.fixture
-def client(mock_current_user):
+def client(mock_current_user, as_principal):
     """Override get_current_user — không cần role."""
     app = FastAPI()
     app.include_router(router)
-    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    app.dependency_overrides[get_current_user] = lambda: as_principal(mock_current_user)
     app.dependency_overrides[get_db] = lambda: MagicMock()
     return TestClient(app)
 
@@ -0,0 +1,307 @@
+import threading
+import uuid
+import pytest
+import fakeredis
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from app.services.cart_store import CartNotLoaded, CartStore
+from app.services.carts import CartService
+
+
+@pytest.fixture
+def fake_redis():
+    fake = MagicMock()
+    fake.redis_client = fakeredis.FakeRedis()
+    with patch("app.services.cart_store.redis_cache", fake):
+        yield fake.redis_client
+
+
+@pytest.fixture
+def store(fake_redis):
+    return CartStore(ttl_seconds=3600, flush_batch=10)
+
+
+@pytest.fixture
+def loaded(store, user_id, mock_cart):
+    """Cart 1 dòng (product x2) đã nạp vào Redis"""
+    store.load(user_id, mock_cart)
+    return store
+
+
+def new_id() -> str:
+    return str(uuid.uuid4())
+
+
+def dirty_users(fake_redis, store):
+    return {u.decode() for u in fake_redis.smembers(store._dirty_key())}
+
+
+# READ / LOAD
+
+
+class TestLoad:
+
+    def test_missing_cart_raises(self, store, user_id):
+        with pytest.raises(CartNotLoaded):
+            store.get(user_id)
+
+    def test_loaded_cart_has_same_shape_as_db_format(
+        self, loaded, user_id, mock_cart
+    ):
+        """Dữ liệu từ Redis giống hệt CartService._format_cart."""
+        assert loaded.get(user_id) == CartService._format_cart(mock_cart)
+
+    def test_load_does_not_overwrite_newer_redis_cart(
+        self, loaded, user_id, mock_cart, mock_product
+    ):
+        loaded.add_item(user_id, new_id(), mock_product, None,
+                        Decimal("100.00"), 1, 10)
+        loaded.load(user_id, mock_cart)
+
+        assert loaded.get(user_id)["items"][0]["quantity"] == 3
+
+    def test_load_is_not_a_change(self, loaded, fake_redis, user_id):
+        assert dirty_users(fake_redis, loaded) == set()
+
+
+# MUTATIONS
+
+
+class TestAddItem:
+
+    def test_same_line_increments_existing_item(
+        self, loaded, user_id, item_id, mock_product
+    ):
+        added, in_cart, data = loaded.add_item(
+            user_id, new_id(), mock_product, None, Decimal("100.00"), 3, 10)
+
+        assert (added, in_cart) == (True, 5)
+        assert [(i["id"], i["quantity"]) for i in data["items"]] == [(item_id, 5)]
+        assert data["subtotal"] == 500.0
+
+    def test_new_line_is_denormalized(
+        self, loaded, user_id, mock_product, mock_variant
+    ):
+        line_id = new_id()
+        _, _, data = loaded.add_item(
+            user_id, line_id, mock_product, mock_variant, Decimal("80.00"), 1, 5)
+
+        line = data["items"][-1]
+        assert line["id"] == line_id
+        assert line["variant_name"] == "Size M"
+        assert line["product_image"] == "https://example.com/image.jpg"
+        assert line["price"] == 80.0
+        assert data["total_items"] == 2
+
+    def test_over_stock_changes_nothing(
+        self, loaded, user_id, mock_product, mock_variant
+    ):
+        """Vượt tồn kho → không tăng số lượng, không tạo dòng mới."""
+        before = loaded.get(user_id)
+
+        assert loaded.add_item(user_id, new_id(), mock_product, None,
+                               Decimal("100.00"), 9, 10) == (False, 2, None)
+        assert loaded.add_item(user_id, new_id(), mock_product, mock_variant,
+                               Decimal("100.00"), 6, 5) == (False, 0, None)
+        assert loaded.get(user_id) == before
+
+    def test_concurrent_adds_never_exceed_stock(
+        self, loaded, user_id, mock_product
+    ):
+        """20 thread cùng thêm 1 → chỉ đủ tồn kho (10, đã có 2 trong cart)."""
+        results = []
+
+        def worker():
+            results.append(loaded.add_item(
+                user_id, new_id(), mock_product, None, Decimal("100.00"), 1, 10)[0])
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results.count(True) == 8
+        assert loaded.get(user_id)["items"][0]["quantity"] == 10
+
+    def test_marks_cart_dirty(self, loaded, fake_redis, user_id, mock_product):
+        loaded.add_item(user_id, new_id(), mock_product, None,
+                        Decimal("100.00"), 1, 10)
+        assert dirty_users(fake_redis, loaded) == {user_id}
+
+    def test_unloaded_cart_raises(self, store, user_id, mock_product):
+        with pytest.raises(CartNotLoaded):
+            store.add_item(user_id, new_id(), mock_product, None,
+                           Decimal("100.00"), 1, 10)
+
+
+class TestUpdateRemoveClear:
+
+    def test_set_quantity(self, loaded, user_id, item_id):
+        data = loaded.set_quantity(user_id, item_id, 7)
+        assert data["items"][0]["quantity"] == 7
+
+    def test_set_quantity_unknown_item_returns_none(self, loaded, user_id):
+        assert loaded.set_quantity(user_id, new_id(), 1) is None
+
+    def test_removed_line_can_be_added_again(
+        self, loaded, user_id, item_id, mock_product
+    ):
+        assert loaded.remove_item(user_id, item_id)["items"] == []
+        assert loaded.remove_item(user_id, item_id) is None
+
+        line_id = new_id()
+        _, in_cart, data = loaded.add_item(
+            user_id, line_id, mock_product, None, Decimal("100.00"), 1, 10)
+        assert in_cart == 1
+        assert data["items"][0]["id"] == line_id
+
+    def test_clear_keeps_cart(self, loaded, fake_redis, user_id, cart_id):
+        data = loaded.clear(user_id)
+
+        assert data["id"] == cart_id
+        assert data["items"] == []
+        assert dirty_users(fake_redis, loaded) == {user_id}
+
+    def test_discard_drops_cart_so_it_reloads(self, loaded, user_id):
+        loaded.discard(user_id)
+        with pytest.raises(CartNotLoaded):
+            loaded.get(user_id)
+
+    def test_discard_retries_then_raises(self, store, fake_redis, user_id):
+        with patch.object(fake_redis, "delete",
+                          side_effect=[ConnectionError("blip"), 1]) as delete:
+            store.discard(user_id)
+        assert delete.call_count == 2
+
+        with patch.object(fake_redis, "delete", side_effect=ConnectionError("down")), \
+                pytest.raises(ConnectionError):
+            store.discard(user_id)
+
+
+# WRITE-BEHIND
+
+
+def build_db(cart):
+    db = MagicMock()
+    q = db.query.return_value
+    for attr in ("filter", "with_for_update"):
+        getattr(q, attr).return_value = q
+    q.first.return_value = cart
+    return db
+
+
+class TestFlush:
+
+    def test_upserts_snapshot_and_deletes_removed_items(
+        self, loaded, user_id, item_id, mock_cart
+    ):
+        loaded.set_quantity(user_id, item_id, 4)
+        db = build_db(mock_cart)
+
+        assert loaded.flush(db, user_id) is True
+
+        db.query.return_value.delete.assert_called_once_with(synchronize_session=False)
+        stmt = db.execute.call_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (id) DO UPDATE" in sql
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        assert params["quantity_m0"] == 4
+        assert params["cart_id_m0"] == mock_cart.id
+
+    def test_empty_cart_only_deletes(self, loaded, user_id, mock_cart):
+        loaded.clear(user_id)
+        db = build_db(mock_cart)
+
+        assert loaded.flush(db, user_id) is True
+        db.query.return_value.delete.assert_called_once()
+        db.execute.assert_not_called()
+
+    def test_cart_not_in_redis_is_left_alone(self, store, user_id, mock_cart):
+        db = build_db(mock_cart)
+
+        assert store.flush(db, user_id) is False
+        db.execute.assert_not_called()
+
+    def test_failed_flush_stays_dirty(
+        self, loaded, fake_redis, user_id, mock_product
+    ):
+        loaded.add_item(user_id, new_id(), mock_product, None,
+                        Decimal("100.00"), 1, 10)
+
+        with patch.object(loaded, "flush", side_effect=RuntimeError("db down")), \
+                patch("app.services.cart_store.SessionLocal"):
+            assert loaded.flush_dirty() == 0
+
+        assert dirty_users(fake_redis, loaded) == {user_id}
+
+        with patch.object(loaded, "flush", return_value=True), \
+                patch("app.services.cart_store.SessionLocal") as session:
+            assert loaded.flush_dirty() == 1
+
+        session.return_value.commit.assert_called_once()
+        assert dirty_users(fake_redis, loaded) == set()
+
+
+# CART SERVICE + STORE
+
+
+class TestCartServiceWithStore:
+
+    @pytest.fixture(autouse=True)
+    def use_store(self, loaded, monkeypatch):
+        monkeypatch.setattr("app.services.carts.cart_store", loaded)
+
+    def test_get_cart_served_from_redis(self, mock_db, user_id):
+        result = CartService.get_cart(mock_db, user_id)
+
+        assert result["data"]["total_items"] == 1
+        mock_db.query.assert_not_called()
+
+    def test_get_cart_loads_missing_cart_from_db_once(
+        self, loaded, fake_redis, mock_db, mock_cart
+    ):
+        other_user = new_id()
+        q = mock_db.query.return_value
+        q.options.return_value.filter.return_value \
+            .with_for_update.return_value.first.return_value = mock_cart
+
+        CartService.get_cart(mock_db, other_user)
+        CartService.get_cart(mock_db, other_user)
+
+        assert mock_db.query.call_count == 1
+
+    def test_add_over_stock_raises_400(
+        self, mock_db, user_id, product_id, mock_product
+    ):
+        q = mock_db.query.return_value
+        q.options.return_value.filter.return_value.first.return_value = mock_product
+
+        with pytest.raises(HTTPException) as exc_info:
+            CartService.add_to_cart(mock_db, user_id, product_id, quantity=9)
+
+        assert exc_info.value.status_code == 400
+        assert "Only 8 items available" in exc_info.value.detail["message"]
+
+    def test_add_message_matches_db_path(
+        self, mock_db, user_id, product_id, mock_product, mock_variant
+    ):
+        """Dòng đã có hay dòng mới → cùng message như khi không dùng Redis."""
+        q = mock_db.query.return_value
+        q.options.return_value.filter.return_value.first.return_value = mock_product
+
+        existing = CartService.add_to_cart(mock_db, user_id, product_id, quantity=1)
+        q.filter.return_value.first.return_value = mock_variant
+        added = CartService.add_to_cart(
+            mock_db, user_id, product_id, variant_id=mock_variant.id, quantity=1)
+
+        assert existing["message"] == added["message"] == "Item added to cart"
+        assert [i["quantity"] for i in added["data"]["items"]] == [3, 1]
+
+    def test_update_unknown_item_raises_404(self, mock_db, user_id):
+        with pytest.raises(HTTPException) as exc_info:
+            CartService.update_cart_item(mock_db, user_id, new_id(), 1)
+
+        assert exc_info.value.status_code == 404
@@ -30,6 +30,7 @@ def mock_category(category_id):
     cat.slug = "skincare"
     cat.description = "Skincare products"
     cat.parent_id = None
+    cat.path = f"/{category_id}/"
     cat.image_url = None
     cat.display_order = 0
     cat.is_active = True
@@ -50,6 +51,7 @@ def mock_child_category(parent_category_id):
     cat.slug = "cleanser"
     cat.description = "Face cleansers"
     cat.parent_id = parent_category_id
+    cat.path = f"/{parent_category_id}/{cat.id}/"
     cat.image_url = None
     cat.display_order = 1
     cat.is_active = True
@@ -92,12 +94,12 @@ def mock_current_user(mock_admin_user):
 #  TestClient
 
 @pytest.fixture
-def client(mock_current_user):
+def client(mock_current_user, as_principal):
     """TestClient với auth bypass cho protected endpoints."""
     app = FastAPI()
     app.include_router(router)
-    app.dependency_overrides[get_current_user] = lambda: mock_current_user
-    app.dependency_overrides[get_current_active_user] = lambda: mock_current_user
+    app.dependency_overrides[get_current_user] = lambda: as_principal(mock_current_user)
+    app.dependency_overrides[get_current_active_user] = lambda: as_principal(mock_current_user)
     app.dependency_overrides[get_db] = lambda: MagicMock()
     return TestClient(app)
 
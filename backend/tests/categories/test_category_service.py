@@ -1,7 +1,8 @@
 import pytest
 from unittest.mock import MagicMock, patch, call
 from fastapi import HTTPException
-from app.services.categories import CategoryService
+from sqlalchemy.dialects import postgresql
+from app.services.categories import CategoryService, category_path, category_subtree_ids
 from app.schemas.categories import (
     CategoryCreateRequest,
     CategoryUpdateRequest,
@@ -30,6 +31,108 @@ def make_cat_result(cat_mock, product_count=0):
     return (cat_mock, product_count)
 
 
+def make_counts(category_id, product_count=0, children_count=0, subtree_product_count=None):
+    """Kết quả CategoryService._category_counts cho một category."""
+    return {category_id: {
+        "product_count": product_count,
+        "children_count": children_count,
+        "subtree_product_count": product_count if subtree_product_count is None else subtree_product_count
+    }}
+
+
+# CATEGORY COUNTS
+
+class TestCategoryCounts:
+
+    def test_counts_and_subtree_rollup(self, mock_db):
+        """Một query cho cả product_count/children_count, subtree cộng dồn lên tổ tiên."""
+        mock_db.query.return_value = build_query_chain(all_result=[
+            ("root", None, 2, 1),
+            ("child", "root", 3, 1),
+            ("leaf", "child", 4, 0),
+            ("other", None, 0, 0),
+        ])
+
+        counts = CategoryService._category_counts(mock_db)
+
+        assert mock_db.query.call_count == 1
+        assert counts["root"] == {"product_count": 2, "children_count": 1,
+                                  "subtree_product_count": 9}
+        assert counts["child"]["subtree_product_count"] == 7
+        assert counts["leaf"]["subtree_product_count"] == 4
+        assert counts["other"]["subtree_product_count"] == 0
+
+    def test_parent_cycle_does_not_loop(self, mock_db):
+        """parent_id lỗi tạo vòng → vẫn dừng."""
+        mock_db.query.return_value = build_query_chain(all_result=[
+            ("a", "b", 1, 1),
+            ("b", "a", 2, 1),
+        ])
+
+        counts = CategoryService._category_counts(mock_db)
+
+        assert counts["a"]["subtree_product_count"] == 3
+        assert counts["b"]["subtree_product_count"] == 3
+
+    def test_cached_with_category_and_product_tags(self, mock_db):
+        """Cache bị xoá khi ghi category hoặc product."""
+        with patch("app.core.cache.cache") as cache:
+            cache.enabled = True
+            cache.get_or_load.return_value = {}
+            CategoryService._category_counts(mock_db)
+
+        args, kwargs = cache.get_or_load.call_args
+        assert args[0] == "categories:counts"
+        assert kwargs["tags"] == ["categories", "products"]
+
+
+# CATEGORY PATHS
+
+class TestCategoryPaths:
+
+    def test_root_and_child_paths(self):
+        parent = MagicMock(path="/root/")
+        assert category_path("root") == "/root/"
+        assert category_path("child", parent) == "/root/child/"
+
+    def test_child_of_parent_without_path_is_not_root(self):
+        with pytest.raises(ValueError):
+            category_path("child", MagicMock(path=None))
+
+    def test_subtree_ids_use_path_prefix(self, mock_category, category_id):
+        sql = str(category_subtree_ids(mock_category).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert f"categories.path LIKE '/{category_id}/%%'" in sql
+
+    def test_subtree_ids_without_path_is_category_itself(self, mock_category, category_id):
+        mock_category.path = None
+        sql = str(category_subtree_ids(mock_category).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert f"categories.id = '{category_id}'" in sql
+
+    def test_rebuild_paths_from_parent_links(self, mock_db):
+        """Backfill path theo parent_id, chỉ ghi những dòng thay đổi."""
+        mock_db.query.return_value = build_query_chain(all_result=[
+            ("leaf", "child", None),
+            ("child", "root", "/old/child/"),
+            ("root", None, "/root/"),
+            ("loop", "loop", None),
+        ])
+
+        with patch("app.services.categories.invalidate") as inv:
+            changed = CategoryService.rebuild_paths(mock_db)
+
+        assert changed == 3
+        rows = {row["id"]: row["path"] for row in mock_db.execute.call_args[0][1]}
+        assert rows == {"leaf": "/root/child/leaf/", "child": "/root/child/", "loop": "/loop/"}
+        inv.assert_called_once_with("categories", "products")
+
+    def test_rebuild_paths_noop_when_up_to_date(self, mock_db):
+        mock_db.query.return_value = build_query_chain(all_result=[("root", None, "/root/")])
+        assert CategoryService.rebuild_paths(mock_db) == 0
+        mock_db.execute.assert_not_called()
+
+
 # GET ALL CATEGORIES
 
 class TestGetAllCategories:
@@ -38,11 +141,12 @@ class TestGetAllCategories:
         self, mock_db, mock_category
     ):
         """Mặc định chỉ trả về category active."""
-        q = build_query_chain(all_result=[make_cat_result(mock_category)])
+        q = build_query_chain(all_result=[mock_category])
         mock_db.query.return_value = q
 
         with patch("app.services.categories.model_to_dict",
-                   return_value={"id": mock_category.id}):
+                   return_value={"id": mock_category.id}), \
+                patch.object(CategoryService, "_category_counts", return_value={}):
             result = CategoryService.get_all_categories(
                 mock_db, include_inactive=False
             )
@@ -53,11 +157,12 @@ class TestGetAllCategories:
 
     def test_include_inactive_returns_all(self, mock_db, mock_category):
         """include_inactive=True → không filter is_active."""
-        q = build_query_chain(all_result=[make_cat_result(mock_category)])
+        q = build_query_chain(all_result=[mock_category])
         mock_db.query.return_value = q
 
         with patch("app.services.categories.model_to_dict",
-                   return_value={"id": mock_category.id}):
+                   return_value={"id": mock_category.id}), \
+                patch.object(CategoryService, "_category_counts", return_value={}):
             result = CategoryService.get_all_categories(
                 mock_db, include_inactive=True
             )
@@ -78,19 +183,29 @@ class TestGetAllCategories:
         self, mock_db, mock_category
     ):
         """Mỗi category phải có product_count và children_count."""
+        mock_db.query.return_value = build_query_chain(all_result=[mock_category])
+
+        with patch("app.services.categories.model_to_dict",
+                   return_value={"id": mock_category.id}), \
+                patch.object(CategoryService, "_category_counts",
+                             return_value=make_counts(mock_category.id, 5, 3, 8)):
+            result = CategoryService.get_all_categories(mock_db)
+
+        cat = result["data"]["categories"][0]
+        assert cat["product_count"] == 5
+        assert cat["children_count"] == 3
+        assert cat["subtree_product_count"] == 8
+
+    def test_no_query_per_category(self, mock_db, mock_category):
+        """Không còn N+1: 1 query categories + 1 query counts."""
         call_count = 0
 
-        def side_effect(model, *args):
+        def side_effect(*args):
             nonlocal call_count
-            q = build_query_chain()
             call_count += 1
             if call_count == 1:
-                # query chính trả về list categories
-                q.all.return_value = [make_cat_result(mock_category, 5)]
-            else:
-                # query đếm children
-                q.scalar.return_value = 3
-            return q
+                return build_query_chain(all_result=[mock_category] * 10)
+            return build_query_chain(all_result=[(mock_category.id, None, 5, 0)])
 
         mock_db.query.side_effect = side_effect
 
@@ -98,9 +213,8 @@ class TestGetAllCategories:
                    return_value={"id": mock_category.id}):
             result = CategoryService.get_all_categories(mock_db)
 
-        cat = result["data"]["categories"][0]
-        assert cat["product_count"] == 5
-        assert cat["children_count"] == 3
+        assert mock_db.query.call_count == 2
+        assert result["data"]["categories"][0]["product_count"] == 5
 
     def test_message_is_correct(self, mock_db):
         """Message phải đúng."""
@@ -120,11 +234,12 @@ class TestGetCategoryTree:
         self, mock_db, mock_category
     ):
         """Mỗi item trong tree phải có key 'children'."""
-        q = build_query_chain(all_result=[make_cat_result(mock_category)])
+        q = build_query_chain(all_result=[mock_category])
         mock_db.query.return_value = q
 
         with patch("app.services.categories.model_to_dict",
-                   return_value={"id": mock_category.id, "parent_id": None}):
+                   return_value={"id": mock_category.id, "parent_id": None}), \
+                patch.object(CategoryService, "_category_counts", return_value={}):
             result = CategoryService.get_category_tree(mock_db)
 
         assert result["success"] is True
@@ -133,16 +248,31 @@ class TestGetCategoryTree:
     def test_root_categories_have_no_parent(self, mock_db, mock_category):
         """Category root (parent_id=None) phải nằm ở top-level."""
         mock_category.parent_id = None
-        q = build_query_chain(all_result=[make_cat_result(mock_category)])
+        q = build_query_chain(all_result=[mock_category])
         mock_db.query.return_value = q
 
         with patch("app.services.categories.model_to_dict",
-                   return_value={"id": mock_category.id, "parent_id": None}):
+                   return_value={"id": mock_category.id, "parent_id": None}), \
+                patch.object(CategoryService, "_category_counts", return_value={}):
             result = CategoryService.get_category_tree(mock_db)
 
         assert len(result["data"]) == 1
         assert result["data"][0]["parent_id"] is None
 
+    def test_nodes_include_subtree_product_count(self, mock_db, mock_category):
+        """Node có product_count riêng và subtree_product_count cộng dồn."""
+        mock_category.parent_id = None
+        mock_db.query.return_value = build_query_chain(all_result=[mock_category])
+
+        with patch("app.services.categories.model_to_dict",
+                   return_value={"id": mock_category.id, "parent_id": None}), \
+                patch.object(CategoryService, "_category_counts",
+                             return_value=make_counts(mock_category.id, 2, 1, 9)):
+            result = CategoryService.get_category_tree(mock_db)
+
+        assert result["data"][0]["product_count"] == 2
+        assert result["data"][0]["subtree_product_count"] == 9
+
     def test_empty_db_returns_empty_list(self, mock_db):
         """Không có category → data=[]."""
         q = build_query_chain(all_result=[])
@@ -170,22 +300,12 @@ class TestGetCategoryById:
         self, mock_db, mock_category, category_id
     ):
         """Category tồn tại → trả về data kèm product_count và children_count."""
-        call_count = 0
-
-        def side_effect(model, *args):
-            nonlocal call_count
-            q = build_query_chain()
-            call_count += 1
-            if call_count == 1:
-                q.first.return_value = make_cat_result(mock_category, 4)
-            else:
-                q.scalar.return_value = 2  # children_count
-            return q
-
-        mock_db.query.side_effect = side_effect
+        mock_db.query.return_value = build_query_chain(first=mock_category)
 
         with patch("app.services.categories.model_to_dict",
-                   return_value={"id": category_id}):
+                   return_value={"id": category_id}), \
+                patch.object(CategoryService, "_category_counts",
+                             return_value=make_counts(category_id, 4, 2)):
             result = CategoryService.get_category_by_id(mock_db, category_id)
 
         assert result["success"] is True
@@ -203,31 +323,20 @@ class TestGetCategoryById:
         assert exc_info.value.status_code == 404
         assert exc_info.value.detail["success"] is False
 
-    def test_children_count_is_queried_separately(
+    def test_unknown_counts_default_to_zero(
         self, mock_db, mock_category, category_id
     ):
-        """children_count phải được query riêng (không lấy từ outerjoin)."""
-        call_count = 0
-
-        def side_effect(model, *args):
-            nonlocal call_count
-            q = build_query_chain()
-            call_count += 1
-            if call_count == 1:
-                q.first.return_value = make_cat_result(mock_category)
-            else:
-                q.scalar.return_value = 3
-            return q
-
-        mock_db.query.side_effect = side_effect
+        """Không có trong counts (vd. cache cũ) → các count = 0."""
+        mock_db.query.return_value = build_query_chain(first=mock_category)
 
         with patch("app.services.categories.model_to_dict",
-                   return_value={"id": category_id}):
+                   return_value={"id": category_id}), \
+                patch.object(CategoryService, "_category_counts", return_value={}):
             result = CategoryService.get_category_by_id(mock_db, category_id)
 
-        assert result["data"]["children_count"] == 3
-        # Phải có ít nhất 2 lần query: 1 cho category, 1 cho children_count
-        assert mock_db.query.call_count >= 2
+        assert result["data"]["children_count"] == 0
+        assert result["data"]["subtree_product_count"] == 0
+        assert mock_db.query.call_count == 1
 
     def test_message_contains_category(
         self, mock_db, mock_category, category_id
@@ -302,6 +411,8 @@ class TestCreateCategory:
         assert result["message"] == "Category created successfully"
         mock_db.add.assert_called_once()
         mock_db.commit.assert_called_once()
+        added = mock_db.add.call_args[0][0]
+        assert added.path == f"/{added.id}/"
 
     def test_valid_data_with_parent_creates_child_category(
         self, mock_db, mock_category, mock_child_category,
@@ -310,6 +421,7 @@ class TestCreateCategory:
         """parent_id hợp lệ → tạo child category thành công."""
         mock_parent = MagicMock()
         mock_parent.id = parent_category_id
+        mock_parent.path = f"/{parent_category_id}/"
         self._setup_query(mock_db, slug_exists=False,
                           parent_exists=True,
                           mock_category=mock_category,
@@ -322,6 +434,31 @@ class TestCreateCategory:
         assert result["success"] is True
         added = mock_db.add.call_args[0][0]
         assert added.parent_id == parent_category_id
+        assert added.path == f"/{parent_category_id}/{added.id}/"
+
+    def test_parent_without_path_is_backfilled_not_root(
+        self, mock_db, mock_category, admin_id, parent_category_id
+    ):
+        """Parent chưa backfill path → rebuild_paths, child không thành root."""
+        mock_parent = MagicMock()
+        mock_parent.id = parent_category_id
+        mock_parent.path = None
+        self._setup_query(mock_db, slug_exists=False,
+                          parent_exists=True,
+                          mock_category=mock_category,
+                          mock_parent=mock_parent)
+
+        def rebuild(db):
+            mock_parent.path = f"/{parent_category_id}/"
+
+        with patch.object(CategoryService, "rebuild_paths", side_effect=rebuild) as rebuild_paths:
+            CategoryService.create_category(
+                mock_db, self._make_request(parent_id=parent_category_id), admin_id
+            )
+
+        rebuild_paths.assert_called_once_with(mock_db)
+        added = mock_db.add.call_args[0][0]
+        assert added.path == f"/{parent_category_id}/{added.id}/"
 
     def test_duplicate_slug_raises_409(
         self, mock_db, mock_category, admin_id
@@ -762,6 +899,7 @@ class TestMoveCategory:
         """Category và parent tồn tại → move thành công."""
         mock_parent = MagicMock()
         mock_parent.id = parent_category_id
+        mock_parent.path = f"/{parent_category_id}/"
         call_count = 0
 
         def side_effect(model):
@@ -779,6 +917,7 @@ class TestMoveCategory:
 
         assert result["success"] is True
         assert mock_category.parent_id == parent_category_id
+        assert mock_category.path == f"/{parent_category_id}/{category_id}/"
 
     def test_move_to_root_sets_parent_id_none(
         self, mock_db, mock_category, admin_id, category_id
@@ -829,6 +968,93 @@ class TestMoveCategory:
         assert exc_info.value.status_code == 404
         assert "Parent category" in exc_info.value.detail["message"]
 
+    def test_move_under_own_descendant_raises_400(
+        self, mock_db, mock_category, mock_child_category, admin_id, category_id
+    ):
+        """Parent mới nằm trong subtree của category → raise 400."""
+        mock_child_category.path = f"/{category_id}/{mock_child_category.id}/"
+        call_count = 0
+
+        def side_effect(model):
+            nonlocal call_count
+            call_count += 1
+            return build_query_chain(
+                first=mock_category if call_count == 1 else mock_child_category)
+
+        mock_db.query.side_effect = side_effect
+
+        with pytest.raises(HTTPException) as exc_info:
+            CategoryService.move_category(
+                mock_db, category_id, mock_child_category.id, admin_id
+            )
+
+        assert exc_info.value.status_code == 400
+        mock_db.commit.assert_not_called()
+
+    def test_move_rewrites_subtree_paths_and_reindexes_products(
+        self, mock_db, mock_category, admin_id, category_id, parent_category_id
+    ):
+        """Move → 1 UPDATE path cho cả subtree, product trong subtree được re-index."""
+        mock_parent = MagicMock()
+        mock_parent.id = parent_category_id
+        mock_parent.path = f"/{parent_category_id}/"
+        queries = []
+        statements = []
+
+        def side_effect(model):
+            q = build_query_chain(
+                first=mock_category if not queries else mock_parent)
+            q.all.side_effect = lambda: statements.append("select products") or [("p1",), ("p2",)]
+            q.update.side_effect = lambda *a, **kw: statements.append("update paths")
+            queries.append(q)
+            return q
+
+        mock_db.query.side_effect = side_effect
+
+        with patch("app.services.categories.mark_products_dirty") as dirty, \
+                patch("app.services.categories.invalidate") as inv:
+            CategoryService.move_category(
+                mock_db, category_id, parent_category_id, admin_id
+            )
+
+        # Product lấy theo path cũ → phải chạy trước UPDATE path
+        assert statements == ["select products", "update paths"]
+        subtree_update = queries[3].update
+        assert subtree_update.call_args[1] == {"synchronize_session": False}
+        dirty.assert_called_once_with(mock_db, ["p1", "p2"])
+        inv.assert_called_once_with("categories", "products")
+
+    def test_move_without_backfilled_paths_rebuilds_first(
+        self, mock_db, mock_category, admin_id, category_id, parent_category_id
+    ):
+        """Category/parent chưa có path → rebuild_paths trước khi move."""
+        mock_parent = MagicMock()
+        mock_parent.id = parent_category_id
+        mock_parent.path = None
+        mock_category.path = None
+        call_count = 0
+
+        def side_effect(model):
+            nonlocal call_count
+            call_count += 1
+            return build_query_chain(
+                first=mock_category if call_count == 1 else mock_parent)
+
+        def rebuild(db):
+            mock_parent.path = f"/{parent_category_id}/"
+            mock_category.path = f"/{category_id}/"
+
+        mock_db.query.side_effect = side_effect
+
+        with patch.object(CategoryService, "rebuild_paths", side_effect=rebuild) as rebuild_paths, \
+                patch("app.services.categories.mark_products_dirty"):
+            CategoryService.move_category(
+                mock_db, category_id, parent_category_id, admin_id
+            )
+
+        rebuild_paths.assert_called_once_with(mock_db)
+        assert mock_category.path == f"/{parent_category_id}/{category_id}/"
+
     def test_move_to_self_raises_400(
         self, mock_db, mock_category, admin_id, category_id
     ):
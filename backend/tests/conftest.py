@@ -2,6 +2,56 @@ import pytest
 import uuid
 from unittest.mock import MagicMock
 from sqlalchemy.orm import Session
+from app.utils.permission_index import PermissionIndex
+from app.utils.principal import Principal, RoleSnapshot
+
+
+@pytest.fixture(autouse=True)
+def disable_search_cache(monkeypatch):
+    """Không để search cache (Redis) lẫn kết quả giữa các test."""
+    from app.elastic.search_cache import search_cache
+    monkeypatch.setattr(search_cache, "enabled", False)
+
+
+@pytest.fixture(autouse=True)
+def disable_service_cache(monkeypatch):
+    """@cached service methods luôn đọc từ mock_db trong test."""
+    from app.core.cache import cache
+    monkeypatch.setattr(cache, "enabled", False)
+
+
+@pytest.fixture(autouse=True)
+def disable_cart_store(monkeypatch):
+    """CartService / checkout đọc ghi cart trực tiếp qua mock_db trong test."""
+    from app.services.cart_store import cart_store
+    monkeypatch.setattr(cart_store, "enabled", False)
+
+
+@pytest.fixture
+def as_principal():
+    """Principal như get_current_user trả về, dựng từ mock User (cho dependency_overrides)."""
+    def convert(user) -> Principal:
+        role = None
+        if user.role is not None:
+            keys = frozenset(
+                (getattr(p.method, "value", p.method), p.path)
+                for p in user.role.permissions if p.deleted_at is None
+            )
+            role = RoleSnapshot(
+                id=user.role.id,
+                name=user.role.name,
+                is_active=user.role.is_active,
+                deleted_at=user.role.deleted_at,
+                permission_keys=keys,
+                permission_index=PermissionIndex(keys),
+            )
+        return Principal(
+            id=user.id,
+            status=getattr(user.status, "value", user.status),
+            role_id=user.role_id,
+            role=role,
+        )
+    return convert
 
 
 def make_id() -> str:
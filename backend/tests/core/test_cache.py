@@ -0,0 +1,140 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from app.core.cache import TwoTierCache, cached
+
+
+class FakeRedisCache:
+    """Đủ API của RedisCache + redis_client mà TwoTierCache dùng."""
+
+    def __init__(self):
+        self.store = {}
+        self.hashes = {}
+        self.published = []
+        self.redis_client = MagicMock()
+        self.redis_client.hmget.side_effect = lambda key, fields: [
+            self.hashes.get(f) for f in fields]
+        self.redis_client.pipeline.side_effect = self._pipeline
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ttl_seconds=None):
+        self.store[key] = value
+
+    def _pipeline(self):
+        ops = []
+        pipe = MagicMock()
+        pipe.hincrby.side_effect = lambda key, field, n: ops.append(("incr", field))
+        pipe.publish.side_effect = lambda channel, msg: ops.append(("pub", msg))
+
+        def execute():
+            results = []
+            for op, arg in ops:
+                if op == "incr":
+                    self.hashes[arg] = self.hashes.get(arg, 0) + 1
+                    results.append(self.hashes[arg])
+                else:
+                    self.published.append(arg)
+                    results.append(1)
+            return results
+        pipe.execute.side_effect = execute
+        return pipe
+
+
+@pytest.fixture
+def fake_redis():
+    fake = FakeRedisCache()
+    with patch("app.core.cache.redis_cache", fake):
+        yield fake
+
+
+@pytest.fixture
+def two_tier(fake_redis):
+    tier = TwoTierCache(local_maxsize=16, local_ttl_seconds=30, default_ttl_seconds=60)
+    with patch("app.core.cache.cache", tier):
+        yield tier
+
+
+class TestCachedDecorator:
+
+    def test_key_template_ignores_db(self, two_tier):
+        calls = []
+
+        @cached(key="brands:{include_inactive}", tags=["brands"])
+        def get_brands(db, include_inactive=False):
+            calls.append(db)
+            return {"brands": [include_inactive]}
+
+        assert get_brands("db1") == {"brands": [False]}
+        assert get_brands("db2") == {"brands": [False]}
+        assert get_brands("db3", include_inactive=True) == {"brands": [True]}
+        assert calls == ["db1", "db3"]
+
+    def test_invalidate_tag_forces_reload(self, two_tier, fake_redis):
+        counter = {"n": 0}
+
+        @cached(key="tags:popular:{limit}", tags=["tags"])
+        def popular(db, limit=10):
+            counter["n"] += 1
+            return {"n": counter["n"]}
+
+        assert popular(None) == {"n": 1}
+        two_tier.invalidate_tags("tags")
+        assert popular(None) == {"n": 2}
+        assert fake_redis.published == ['["tags"]']
+
+    def test_redis_entry_with_old_version_is_stale(self, two_tier, fake_redis):
+        two_tier.get_or_load("k", lambda: {"v": 1}, tags=["brands"])
+        # Worker khác invalidate: version trong Redis tăng, local nhận message
+        fake_redis.hashes["brands"] = 5
+        two_tier._on_invalidate(["brands"])
+        assert two_tier.get("k") is None
+
+    def test_tag_dropped_by_listener_during_read(self, two_tier, fake_redis):
+        """Listener bỏ tag đang đọc (thread khác) → không KeyError."""
+        fake_redis.hashes.update({"brands": 2, "tags": 3})
+        two_tier._current_versions(["brands"])
+
+        def hmget(key, fields):
+            two_tier._on_invalidate(["brands", "tags"])
+            return [fake_redis.hashes.get(f) for f in fields]
+        fake_redis.redis_client.hmget.side_effect = hmget
+
+        assert two_tier._current_versions(["brands", "tags"]) == {"brands": 2, "tags": 3}
+
+    def test_disabled_cache_calls_through(self, two_tier):
+        two_tier.enabled = False
+
+        @cached(key="x")
+        def load(db):
+            return {"fresh": time.monotonic()}
+
+        assert load(None) != load(None)
+
+
+class TestSingleFlight:
+
+    def test_concurrent_misses_load_once(self, two_tier):
+        loads = []
+
+        def loader():
+            loads.append(1)
+            time.sleep(0.05)
+            return {"ok": True}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                two_tier.get_or_load("tree", loader, tags=["categories"])))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(loads) == 1
+        assert results == [{"ok": True}] * 5
+        assert two_tier._key_locks == {}
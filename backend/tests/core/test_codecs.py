@@ -0,0 +1,47 @@
+import json
+import pytest
+from app.core.codecs import MAGIC, ValueSerializer, CODECS, COMPRESSORS
+
+PAYLOAD = {
+    "slug": "kem-chong-nang-da-dau",
+    "summary": "Sản phẩm thấm nhanh, không bết dính, phù hợp da dầu mụn. " * 40,
+    "average_rating": 4.5,
+    "review_count": 120,
+    "tags": ["chống nắng", "da dầu"],
+}
+
+
+class TestValueSerializer:
+
+    @pytest.mark.parametrize("codec", sorted(CODECS))
+    @pytest.mark.parametrize("compression", sorted(COMPRESSORS))
+    def test_round_trip(self, codec, compression):
+        serializer = ValueSerializer(codec, compression, compress_min_bytes=64)
+        data = serializer.dumps(PAYLOAD)
+        assert data[0] == MAGIC
+        assert serializer.loads(data) == PAYLOAD
+
+    def test_small_values_are_not_compressed(self):
+        serializer = ValueSerializer("json", "zlib", compress_min_bytes=1024)
+        data = serializer.dumps({"a": 1})
+        assert data[1] & 0x0F == 0
+
+    def test_large_values_are_compressed(self):
+        serializer = ValueSerializer("json", "zlib", compress_min_bytes=64)
+        data = serializer.dumps(PAYLOAD)
+        assert data[1] & 0x0F == COMPRESSORS["zlib"].id
+        assert len(data) < len(json.dumps(PAYLOAD, ensure_ascii=False).encode())
+
+    def test_reads_legacy_json_and_other_formats(self):
+        """Entry JSON cũ và entry ghi bằng codec khác vẫn đọc được khi rollout."""
+        reader = ValueSerializer("json", "none")
+        assert reader.loads(json.dumps(PAYLOAD).encode()) == PAYLOAD
+        assert reader.loads(b"3") == 3
+
+        writer = ValueSerializer("orjson", "zlib", compress_min_bytes=64)
+        assert reader.loads(writer.dumps(PAYLOAD)) == PAYLOAD
+
+    def test_unknown_codec_falls_back_to_json(self):
+        serializer = ValueSerializer("nope", "nope")
+        assert serializer.codec.name == "json"
+        assert serializer.compressor.name == "zlib"
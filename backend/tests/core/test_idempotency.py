@@ -0,0 +1,216 @@
+import threading
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from fastapi import HTTPException
+from app.core.codecs import ValueSerializer
+from app.core.idempotency import IdempotencyStore, idempotent
+
+
+class FakeRedisClient:
+    """SET NX / SETEX / GET / script release trên dict, đủ cho IdempotencyStore."""
+
+    def __init__(self):
+        self.store = {}
+        self.lock = threading.Lock()
+
+    def set(self, key, value, nx=False, ex=None):
+        with self.lock:
+            if nx and key in self.store:
+                return None
+            self.store[key] = value
+            return True
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def register_script(self, script):
+        def release(keys, args):
+            with self.lock:
+                if self.store.get(keys[0]) == args[0]:
+                    del self.store[keys[0]]
+        return release
+
+
+@pytest.fixture
+def fake_redis():
+    fake = MagicMock()
+    fake.serializer = ValueSerializer(codec="orjson", compression="none")
+    fake.redis_client = FakeRedisClient()
+    store = IdempotencyStore(ttl_seconds=60, lock_ttl_seconds=2,
+                             poll_interval_seconds=0.01)
+    with patch("app.core.idempotency.redis_cache", fake), \
+            patch("app.core.idempotency.idempotency_store", store):
+        yield fake
+
+
+class Service:
+    calls = []
+
+    @staticmethod
+    @idempotent("orders:create:{user_id}")
+    def create(db, user_id: str, amount: int):
+        Service.calls.append((user_id, amount))
+        return {"success": True, "data": {"amount": amount, "at": datetime(2025, 1, 1)}}
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    Service.calls = []
+
+
+class TestIdempotent:
+
+    def test_without_key_runs_every_time(self, fake_redis):
+        Service.create(MagicMock(), "u1", 10)
+        Service.create(MagicMock(), "u1", 10)
+
+        assert len(Service.calls) == 2
+        assert fake_redis.redis_client.store == {}
+
+    def test_repeated_key_replays_first_response(self, fake_redis):
+        first = Service.create(MagicMock(), "u1", 10, idempotency_key="k1")
+        second = Service.create(MagicMock(), "u1", 10, idempotency_key="k1")
+
+        assert Service.calls == [("u1", 10)]
+        assert second == first
+        assert first["data"]["at"] == "2025-01-01T00:00:00"
+
+    def test_key_is_scoped_per_user(self, fake_redis):
+        Service.create(MagicMock(), "u1", 10, idempotency_key="k1")
+        Service.create(MagicMock(), "u2", 10, idempotency_key="k1")
+        assert len(Service.calls) == 2
+
+    def test_key_reused_with_other_arguments_raises_422(self, fake_redis):
+        Service.create(MagicMock(), "u1", 10, idempotency_key="k1")
+
+        with pytest.raises(HTTPException) as exc_info:
+            Service.create(MagicMock(), "u1", 99, idempotency_key="k1")
+
+        assert exc_info.value.status_code == 422
+
+    def test_failed_request_releases_key(self, fake_redis):
+        """Lần đầu lỗi → key được nhả, retry chạy lại bình thường."""
+        attempts = []
+
+        @idempotent("flaky:{user_id}")
+        def flaky(user_id):
+            attempts.append(user_id)
+            if len(attempts) == 1:
+                raise ValueError("out of stock")
+            return {"ok": True}
+
+        with pytest.raises(ValueError):
+            flaky("u1", idempotency_key="k1")
+
+        assert fake_redis.redis_client.store == {}
+        assert flaky("u1", idempotency_key="k1") == {"ok": True}
+        assert len(attempts) == 2
+
+    def test_concurrent_duplicate_waits_for_first_result(self, fake_redis):
+        """Request trùng đến khi request đầu đang chạy → chờ kết quả, không chạy lại."""
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        @idempotent("slow:{user_id}")
+        def slow(user_id):
+            calls.append(user_id)
+            started.set()
+            release.wait(2)
+            return {"n": len(calls)}
+
+        results = []
+        first = threading.Thread(
+            target=lambda: results.append(slow("u1", idempotency_key="k1")))
+        first.start()
+        started.wait(2)
+
+        second = threading.Thread(
+            target=lambda: results.append(slow("u1", idempotency_key="k1")))
+        second.start()
+        release.set()
+        first.join()
+        second.join()
+
+        assert calls == ["u1"]
+        assert results == [{"n": 1}, {"n": 1}]
+
+    def test_in_flight_past_lock_ttl_raises_409(self, fake_redis):
+        store = IdempotencyStore(ttl_seconds=60, lock_ttl_seconds=0,
+                                 poll_interval_seconds=0.01)
+        fake_redis.redis_client.store[store._key("s", "k1")] = fake_redis.serializer.dumps(
+            {"state": "pending", "fingerprint": "f", "token": "t"})
+
+        with pytest.raises(HTTPException) as exc_info:
+            store.run("s", "k1", "f", MagicMock())
+
+        assert exc_info.value.status_code == 409
+
+    def test_slow_request_is_not_run_again_after_lock_ttl(self, fake_redis):
+        """Request đầu chạy lâu hơn lock_ttl → request trùng nhận 409, không tạo order thứ 2."""
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        @idempotent("slow:{user_id}")
+        def slow(user_id):
+            calls.append(user_id)
+            started.set()
+            release.wait(2)
+            return {"n": len(calls)}
+
+        with patch("app.core.idempotency.idempotency_store",
+                   IdempotencyStore(ttl_seconds=60, lock_ttl_seconds=0,
+                                    poll_interval_seconds=0.01)):
+            first = threading.Thread(target=lambda: slow("u1", idempotency_key="k1"))
+            first.start()
+            started.wait(2)
+
+            with pytest.raises(HTTPException) as exc_info:
+                slow("u1", idempotency_key="k1")
+            release.set()
+            first.join()
+
+        assert exc_info.value.status_code == 409
+        assert calls == ["u1"]
+
+    def test_unstored_result_answers_409_instead_of_rerunning(self, fake_redis):
+        """Lưu kết quả lỗi sau khi đã commit → claim giữ nguyên, retry nhận 409."""
+        fake_redis.redis_client.setex = MagicMock(side_effect=ConnectionError("down"))
+
+        first = Service.create(MagicMock(), "u1", 10, idempotency_key="k1")
+        assert first["success"] is True
+        assert fake_redis.redis_client.setex.call_count == 3
+
+        with patch("app.core.idempotency.idempotency_store",
+                   IdempotencyStore(ttl_seconds=60, lock_ttl_seconds=0,
+                                    poll_interval_seconds=0.01)):
+            with pytest.raises(HTTPException) as exc_info:
+                Service.create(MagicMock(), "u1", 10, idempotency_key="k1")
+
+        assert exc_info.value.status_code == 409
+        assert Service.calls == [("u1", 10)]
+
+    def test_claim_unreadable_answers_409(self, fake_redis):
+        store = IdempotencyStore(ttl_seconds=60, lock_ttl_seconds=1,
+                                 poll_interval_seconds=0.01)
+        fake_redis.redis_client.set = MagicMock(return_value=None)
+        fake_redis.redis_client.get = MagicMock(side_effect=ConnectionError("down"))
+        func = MagicMock()
+
+        with pytest.raises(HTTPException) as exc_info:
+            store.run("s", "k1", "f", func)
+
+        assert exc_info.value.status_code == 409
+        func.assert_not_called()
+
+    def test_redis_down_runs_without_guarantee(self, fake_redis):
+        fake_redis.redis_client = MagicMock()
+        fake_redis.redis_client.set.side_effect = ConnectionError("down")
+
+        result = Service.create(MagicMock(), "u1", 10, idempotency_key="k1")
+
+        assert result["success"] is True
+        assert Service.calls == [("u1", 10)]
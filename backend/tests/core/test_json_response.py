@@ -0,0 +1,113 @@
+import orjson
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List
+from app.core.json_response import ORJSONResponse, schema_response
+from app.models.brand import Brand
+from app.models.category import Category
+from app.models.product import Product, ProductImage, ProductVariant, Tag
+from app.schemas.common import APIResponse
+from app.schemas.products import ProductListItem, ProductListResponse, ProductResponse
+from app.schemas.products.responses import BrandSimple
+from app.services.products.helpers import format_product_detail, format_product_list_item
+from app.utils.serializers import compile_projection
+
+NOW = datetime(2025, 3, 1, 8, 30, tzinfo=timezone.utc)
+
+
+def make_product(i: int = 0) -> Product:
+    return Product(
+        id=f"p{i}", brand_id="b1", category_id="c1", name=f"Serum {i}",
+        slug=f"serum-{i}", sku=f"SKU-{i}", short_description=None,
+        description="Long", how_to_use=None, price=Decimal("199000.50"),
+        sale_price=None, stock_quantity=5, is_available=True, is_featured=False,
+        rating_average=Decimal("4.25"), review_count=3, views_count=10,
+        skin_types=["oily"], concerns=None, benefits=["hydrating"],
+        ingredients={"key_ingredients": ["Niacinamide"]},
+        created_at=NOW, updated_at=NOW,
+        brand=Brand(id="b1", name="Brand", slug="brand"),
+        category=Category(id="c1", name="Serum", slug="serum"),
+        tags=[Tag(id="t1", name="Vegan", slug="vegan")],
+        images=[ProductImage(id="i1", image_url="1.jpg", is_primary=True,
+                             display_order=0, created_at=NOW)],
+        variants=[ProductVariant(id="v1", name="30ml", sku="V-1", price=99000,
+                                 stock_quantity=2, is_available=True, created_at=NOW)],
+    )
+
+
+def pydantic_body(schema, content) -> dict:
+    """Output response_model validation would produce"""
+    return orjson.loads(schema.model_validate(content).model_dump_json())
+
+
+# compile_projection
+
+
+class TestCompileProjection:
+
+    def test_list_matches_response_model(self):
+        content = {"success": True, "message": "ok",
+                   "data": [format_product_list_item(make_product(i)) for i in range(3)],
+                   "meta": {"page": 1, "limit": 20}}
+        body = orjson.loads(schema_response(ProductListResponse, content).body)
+
+        assert body == pydantic_body(ProductListResponse, content)
+        # Các field ngoài schema (created_at, skin_types, ...) bị loại bỏ
+        assert "skin_types" not in body["data"][0]
+
+    def test_detail_matches_response_model(self):
+        content = {"success": True, "message": "ok", "data": format_product_detail(make_product())}
+        body = orjson.loads(schema_response(ProductResponse, content).body)
+
+        assert body == pydantic_body(ProductResponse, content)
+        assert body["data"]["created_at"] == "2025-03-01T08:30:00Z"
+        assert body["data"]["variants"][0]["price"] == 99000.0
+
+    def test_generic_response_schema(self):
+        schema = APIResponse[List[ProductListItem]]
+        content = {"success": True, "message": "ok",
+                   "data": [format_product_list_item(make_product())]}
+        body = orjson.loads(schema_response(schema, content).body)
+        assert body == pydantic_body(schema, content)
+        assert body["meta"] is None
+
+    def test_reads_attributes_from_objects(self):
+        brand = Brand(id="b1", name="Brand", slug="brand", description="not in schema")
+        assert compile_projection(BrandSimple)(brand) == {"id": "b1", "name": "Brand", "slug": "brand"}
+
+    def test_missing_required_field_raises(self):
+        with pytest.raises(KeyError):
+            compile_projection(BrandSimple)({"id": "b1", "name": "Brand"})
+
+
+# schema_response / ORJSONResponse
+
+
+class TestSchemaResponse:
+
+    def test_invalid_content_falls_back_to_validation(self):
+        content = {"success": True, "message": "ok", "data": [{"id": "p1"}]}
+        with pytest.raises(ValueError):
+            schema_response(ProductListResponse, content)
+
+    def test_status_code(self):
+        content = {"success": True, "message": "ok", "data": []}
+        assert schema_response(ProductListResponse, content, status_code=201).status_code == 201
+
+    def test_renders_decimal_orm_and_set(self):
+        response = ORJSONResponse({
+            "price": Decimal("1.50"),
+            "brand": Brand(id="b1", name="Brand", slug="brand", created_at=NOW),
+            "ids": {"a"},
+        })
+        body = orjson.loads(response.body)
+
+        assert body["price"] == 1.5
+        assert body["brand"]["slug"] == "brand"
+        assert body["brand"]["created_at"] == NOW.isoformat()
+        assert body["ids"] == ["a"]
+
+    def test_unknown_type_raises(self):
+        with pytest.raises(TypeError):
+            ORJSONResponse({"x": object()})
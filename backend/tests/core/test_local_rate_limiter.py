@@ -0,0 +1,53 @@
+import pytest
+from unittest.mock import patch
+from app.core.local_rate_limiter import LocalPreLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with patch("app.core.local_rate_limiter.time.monotonic", fake):
+        yield fake
+
+
+class TestLocalPreLimiter:
+
+    def test_flood_is_rejected_locally(self, clock):
+        limiter = LocalPreLimiter()
+        results = [limiter.check("ip:1:POST:/auth/login", "5/minute")[0] for _ in range(7)]
+        assert results == [True] * 5 + [False] * 2
+        assert limiter.local_denied == 2
+
+        # 12s sau hồi được 1 token (5/minute)
+        clock.now += 12
+        assert limiter.check("ip:1:POST:/auth/login", "5/minute")[0] is True
+
+    def test_redis_denial_is_remembered_until_retry_after(self, clock):
+        limiter = LocalPreLimiter()
+        assert limiter.check("k", "100/minute")[0] is True
+        limiter.record("k", "100/minute", False, 0, 30)
+        assert limiter.check("k", "100/minute") == (False, 30)
+        clock.now += 31
+        assert limiter.check("k", "100/minute")[0] is True
+
+    def test_remaining_from_redis_caps_local_tokens(self, clock):
+        limiter = LocalPreLimiter()
+        limiter.check("k", "100/minute")
+        # Worker khác đã dùng gần hết quota chung
+        limiter.record("k", "100/minute", True, 1, None)
+        assert limiter.check("k", "100/minute")[0] is True
+        assert limiter.check("k", "100/minute")[0] is False
+
+    def test_bounded_number_of_keys(self, clock):
+        limiter = LocalPreLimiter(max_keys=2)
+        for key in ("a", "b", "c"):
+            limiter.check(key, "5/minute")
+        assert len(limiter) == 2
@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.rate_limit_matcher import RouteLimitMatcher, scale_limit
+from app.core.redis_rate_limit_middleware import RedisRateLimitMiddleware
+from app.core.security import create_access_token
+
+ROUTES = [
+    "/products/search",
+    "/products/{product_id}",
+    "/products/{product_id}/reviews",
+    "/categories",
+    "/categories/{category_id}",
+    "/auth/login",
+]
+LIMITS = {
+    "/auth/login": "5/minute",
+    "/products/*": None,
+    "/categories": "100/minute",
+    "/admin": "50/minute",
+}
+
+
+@pytest.fixture
+def matcher():
+    return RouteLimitMatcher(ROUTES, LIMITS)
+
+
+class TestRouteLimitMatcher:
+
+    def test_resolves_concrete_url_to_template(self, matcher):
+        assert matcher.resolve("/products/abc")[0] == "/products/{product_id}"
+        assert matcher.resolve("/products/def/reviews")[0] == "/products/{product_id}/reviews"
+        # Static segment thắng param, như thứ tự route của FastAPI
+        assert matcher.resolve("/products/search")[0] == "/products/search"
+
+    def test_exact_and_wildcard_limits(self, matcher):
+        assert matcher.resolve("/auth/login") == ("/auth/login", True, "5/minute")
+        assert matcher.resolve("/products/abc/reviews")[1:] == (True, None)
+        assert matcher.resolve("/categories")[1:] == (True, "100/minute")
+        # Exact entry không áp cho route con
+        assert matcher.resolve("/categories/abc")[1:] == (False, None)
+
+    def test_unknown_path_falls_back_to_raw_path(self, matcher):
+        assert matcher.resolve("/admin") == ("/admin", True, "50/minute")
+        assert matcher.resolve("/nope/1") == ("/nope/1", False, None)
+
+    def test_lookups_are_cached(self, matcher):
+        matcher.resolve("/products/abc")
+        matcher.resolve("/products/abc")
+        assert matcher.resolve.cache_info().hits == 1
+
+    def test_scale_limit(self):
+        assert scale_limit("30/minute", 1) == "30/minute"
+        assert scale_limit("30/minute", 2) == "60/minute"
+
+
+class TestMiddlewareKeys:
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+
+        @app.get("/categories/{category_id}")
+        def get_category(category_id: str):
+            return {"id": category_id}
+
+        app.add_middleware(RedisRateLimitMiddleware)
+        return TestClient(app)
+
+    def test_key_is_per_route_template(self, client):
+        limiter = AsyncMock(return_value=(True, 99, None))
+        with patch("app.core.redis_rate_limit_middleware.redis_rate_limiter.is_allowed", limiter):
+            client.get("/categories/a", headers={"X-Real-IP": "1.2.3.4"})
+            client.get("/categories/b", headers={"X-Real-IP": "1.2.3.4"})
+
+        keys = {call.args[0] for call in limiter.call_args_list}
+        assert keys == {"ip:1.2.3.4:GET:/categories/{category_id}"}
+        assert limiter.call_args.args[1] == "100/minute"
+
+    def test_role_multiplier_applied(self, client):
+        token = create_access_token({"user_id": "u1", "role_id": "r1", "role": "ADMIN"})
+        limiter = AsyncMock(return_value=(True, 499, None))
+        with patch("app.core.redis_rate_limit_middleware.redis_rate_limiter.is_allowed", limiter):
+            response = client.get(
+                "/categories/a", headers={"Authorization": f"Bearer {token}"})
+
+        key, limit, gcra = limiter.call_args.args
+        assert key == "user:u1:GET:/categories/{category_id}"
+        assert limit == "500/minute"
+        # GET → tier RELAXED, nằm trong GCRA_TIERS
+        assert gcra is True
+        assert response.headers["X-RateLimit-Remaining"] == "499"
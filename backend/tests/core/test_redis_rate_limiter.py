@@ -0,0 +1,118 @@
+import bisect
+import fakeredis
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.core.redis_rate_limiter import (
+    redis_rate_limiter, SLIDING_WINDOW_SCRIPT, GCRA_SCRIPT)
+
+
+def make_client(script_result):
+    client = MagicMock()
+    script = AsyncMock(return_value=script_result)
+    client.register_script.return_value = script
+    return client, script
+
+
+class TestAsyncRateLimiter:
+
+    @pytest.mark.asyncio
+    async def test_under_limit_is_allowed_in_one_call(self):
+        client, script = make_client([1, 2, 0])
+        with patch("app.core.redis_rate_limiter.get_async_redis", return_value=client):
+            result = await redis_rate_limiter.is_allowed("ip:1:/x", "5/minute")
+        assert result == (True, 2, None)
+        client.register_script.assert_called_once_with(SLIDING_WINDOW_SCRIPT)
+        script.assert_awaited_once()
+        assert script.call_args.kwargs["args"][1:3] == [60000, 5]
+
+    @pytest.mark.asyncio
+    async def test_over_limit_returns_retry_after_seconds(self):
+        client, _ = make_client([0, 0, 9500])
+        with patch("app.core.redis_rate_limiter.get_async_redis", return_value=client):
+            result = await redis_rate_limiter.is_allowed("ip:1:/x", "5/minute")
+        assert result == (False, 0, 10)
+
+    @pytest.mark.asyncio
+    async def test_gcra_is_opt_in(self):
+        client, script = make_client([1, 49, 0])
+        with patch("app.core.redis_rate_limiter.get_async_redis", return_value=client):
+            assert (await redis_rate_limiter.is_allowed("ip:1:/x", "100/minute"))[0]
+            client.register_script.assert_called_once_with(SLIDING_WINDOW_SCRIPT)
+
+            result = await redis_rate_limiter.is_allowed("ip:1:/x", "100/minute", gcra=True)
+        assert result == (True, 49, None)
+        assert client.register_script.call_args.args[0] == GCRA_SCRIPT
+        assert script.call_args.kwargs["keys"][0].endswith(":gcra")
+        # burst 50, steady rate covers the other 50: 60s / 51
+        assert script.call_args.kwargs["args"][1:] == [1177, 50]
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_fails_open(self):
+        client = MagicMock()
+        client.register_script.side_effect = ConnectionError("down")
+        with patch("app.core.redis_rate_limiter.get_async_redis", return_value=client):
+            assert await redis_rate_limiter.is_allowed("k", "5/minute") == (True, None, None)
+
+    @pytest.mark.asyncio
+    async def test_get_remaining(self):
+        client = MagicMock()
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[0, 3])
+        client.pipeline.return_value = pipe
+        with patch("app.core.redis_rate_limiter.get_async_redis", return_value=client):
+            assert await redis_rate_limiter.get_remaining("k", "5/minute") == 2
+
+    @pytest.mark.asyncio
+    async def test_script_registered_once_per_client(self):
+        """Script chỉ register (hash Lua) một lần cho mỗi client, không phải mỗi request."""
+        client, script = make_client([1, 2, 0])
+        with patch("app.core.redis_rate_limiter.get_async_redis", return_value=client):
+            for _ in range(3):
+                await redis_rate_limiter.is_allowed("ip:1:/x", "5/minute")
+            await redis_rate_limiter.is_allowed("ip:1:/x", "100/minute", gcra=True)
+
+        assert [c.args[0] for c in client.register_script.call_args_list] == [
+            SLIDING_WINDOW_SCRIPT, GCRA_SCRIPT]
+        assert script.await_count == 4
+
+
+class TestBudget:
+    """Chạy script Lua thật (fakeredis): không cửa sổ nào nhận quá N request."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("limit", ["5/minute", "100/minute", "500/minute"])
+    @pytest.mark.parametrize("gcra", [False, True])
+    async def test_no_window_accepts_more_than_limit(self, limit, gcra):
+        max_requests, period = redis_rate_limiter._parse_limit(limit)
+        period_ms = period * 1000
+        client = fakeredis.FakeAsyncRedis()
+        clock = {"ms": 1_700_000_000_000}
+        accepted = []
+
+        with patch("app.core.redis_rate_limiter.get_async_redis", return_value=client), \
+                patch("app.core.redis_rate_limiter.time.time",
+                      side_effect=lambda: clock["ms"] / 1000):
+            # Một burst lớn rồi gửi dồn dập liên tục trong 3 chu kỳ
+            for step in range(3 * max_requests * 4):
+                clock["ms"] += 0 if step < 2 * max_requests else period_ms // (max_requests * 3)
+                allowed, _, _ = await redis_rate_limiter.is_allowed(
+                    f"budget:{limit}:{gcra}", limit, gcra)
+                if allowed:
+                    accepted.append(clock["ms"])
+
+        busiest = max(
+            bisect.bisect_right(accepted, t) - bisect.bisect_right(accepted, t - period_ms)
+            for t in accepted
+        )
+        assert busiest <= max_requests
+        assert len(accepted) >= max_requests
+
+
+class TestReset:
+
+    def test_deletes_sliding_window_and_gcra_keys(self):
+        with patch.object(redis_rate_limiter, "redis_client") as client:
+            redis_rate_limiter.reset("ip:1:/x")
+
+        key = redis_rate_limiter._get_redis_key("ip:1:/x")
+        client.delete.assert_called_once_with(key, f"{key}:gcra")
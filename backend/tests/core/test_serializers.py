@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from sqlalchemy.inspection import inspect
+from app.models.brand import Brand
+from app.models.category import Category
+from app.models.product import Product, ProductImage, ProductVariant, Tag
+from app.utils.serializers import compile_serializer, model_to_dict
+
+
+def reference_model_to_dict(obj, exclude=None):
+    """Bản model_to_dict cũ (duyệt mapper mỗi lần gọi) để so sánh output."""
+    exclude = exclude or []
+    result = {}
+    for column in inspect(obj.__class__).columns:
+        if column.key in exclude or column.key == "primary_image_url":
+            continue
+        value = getattr(obj, column.key)
+        if isinstance(value, Decimal):
+            result[column.key] = float(value)
+        elif isinstance(value, datetime):
+            result[column.key] = value.isoformat()
+        else:
+            result[column.key] = value
+    return result
+
+
+NOW = datetime(2025, 3, 1, 8, 30, tzinfo=timezone.utc)
+
+
+def make_objects():
+    return [
+        Product(id="p1", brand_id="b1", category_id="c1", name="Serum", slug="serum",
+                sku="SKU-1", price=Decimal("199000.50"), sale_price=None,
+                stock_quantity=5, is_available=True, is_featured=False,
+                rating_average=Decimal("4.25"), review_count=3, views_count=10,
+                skin_types=["oily"], concerns=None, benefits=["hydrating"],
+                ingredients={"key_ingredients": ["Niacinamide"]},
+                created_at=NOW, updated_at=None),
+        # Numeric giữ int trước khi flush → giữ nguyên như bản cũ
+        Product(id="p2", name="Toner", price=120000, created_at="2025-01-01"),
+        ProductImage(id="i1", product_id="p1", image_url="a.jpg", is_primary=True,
+                     display_order=0, created_at=NOW),
+        ProductVariant(id="v1", product_id="p1", name="50ml", price=Decimal("99000"),
+                       stock_quantity=1, created_at=NOW),
+        Brand(id="b1", name="Brand", slug="brand", is_active=True),
+        Category(id="c1", name="Cat", slug="cat", display_order=2),
+        Tag(id="t1", name="Vegan", slug="vegan", usage_count=0),
+    ]
+
+
+class TestModelToDict:
+
+    @pytest.mark.parametrize("obj", make_objects(), ids=lambda o: type(o).__name__)
+    def test_identical_to_reference(self, obj):
+        assert model_to_dict(obj) == reference_model_to_dict(obj)
+        assert list(model_to_dict(obj)) == list(reference_model_to_dict(obj))
+
+    @pytest.mark.parametrize("obj", make_objects(), ids=lambda o: type(o).__name__)
+    def test_identical_with_exclude(self, obj):
+        exclude = ["deleted_at", "created_by_id", "description", "id"]
+        assert model_to_dict(obj, exclude=exclude) == reference_model_to_dict(obj, exclude)
+
+    def test_value_types(self):
+        data = model_to_dict(make_objects()[0])
+        assert data["price"] == 199000.5 and isinstance(data["price"], float)
+        assert data["created_at"] == NOW.isoformat()
+        assert data["updated_at"] is None
+
+    def test_skips_query_expression(self):
+        product = Product(id="p1")
+        product.primary_image_url = "a.jpg"
+        assert "primary_image_url" not in model_to_dict(product)
+
+    def test_compiled_once_per_exclude_set(self):
+        assert compile_serializer(Tag, ("id",)) is compile_serializer(Tag, ("id",))
+        assert compile_serializer(Tag, ("id",)) is not compile_serializer(Tag, ())
+
+    def test_single_column(self):
+        tag = Tag(id="t1", name="Vegan", slug="vegan", usage_count=0)
+        exclude = ["id", "name", "slug", "created_at", "updated_at"]
+        assert model_to_dict(tag, exclude=exclude) == {"usage_count": 0}
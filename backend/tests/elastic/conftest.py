@@ -0,0 +1,37 @@
+import pytest
+import uuid
+from decimal import Decimal
+from datetime import datetime
+from unittest.mock import MagicMock
+
+
+@pytest.fixture
+def mock_es_product():
+    image = MagicMock()
+    image.image_url = "https://example.com/img.jpg"
+    image.is_primary = True
+
+    tag = MagicMock()
+    tag.name = "Vegan"
+
+    p = MagicMock()
+    p.id = str(uuid.uuid4())
+    p.name = "Niacinamide 10%"
+    p.slug = "niacinamide-10"
+    p.price = Decimal("200000.00")
+    p.stock_quantity = 50
+    p.is_available = True
+    p.brand.name = "The Ordinary"
+    p.category.name = "Serum"
+    p.category.path = "/c-skincare/c-serum/"
+    p.category_id = "c-serum"
+    p.concerns = ["mụn"]
+    p.skin_types = ["da dầu"]
+    p.benefits = ["kiềm dầu"]
+    p.tags = [tag]
+    p.images = [image]
+    p.description = "Full description"
+    p.rating_average = Decimal("4.5")
+    p.deleted_at = None
+    p.updated_at = datetime(2025, 1, 1, 12, 0, 0)
+    return p
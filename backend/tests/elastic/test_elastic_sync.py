@@ -0,0 +1,234 @@
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from app.elastic import service, controller, config
+
+
+def build_q(batches):
+    """Query chain trả về lần lượt từng batch cho .all()"""
+    q = MagicMock()
+    for a in ("options", "filter", "order_by", "limit"):
+        getattr(q, a).return_value = q
+    q.all.side_effect = batches
+    return q
+
+
+class TestProductToAction:
+
+    def test_active_product_becomes_index_action(self, mock_es_product):
+        action = service.product_to_action(mock_es_product, index="products_v2")
+        assert action["_op_type"] == "index"
+        assert action["_index"] == "products_v2"
+        assert action["_id"] == mock_es_product.id
+        assert action["_source"]["updated_at"] == "2025-01-01T12:00:00"
+
+    def test_soft_deleted_product_becomes_delete_action(self, mock_es_product):
+        mock_es_product.deleted_at = datetime(2025, 1, 2)
+        action = service.product_to_action(mock_es_product)
+        assert action == {
+            "_op_type": "delete",
+            "_index": config.PRODUCT_INDEX,
+            "_id": mock_es_product.id
+        }
+
+    def test_doc_carries_category_ancestors(self, mock_es_product):
+        doc = service.product_to_doc(mock_es_product)
+        assert doc["category_path"] == ["c-skincare", "c-serum"]
+
+    def test_category_without_path_falls_back_to_own_id(self, mock_es_product):
+        mock_es_product.category.path = None
+        assert service.product_to_doc(mock_es_product)["category_path"] == ["c-serum"]
+
+
+class TestBulkIndexProducts:
+
+    def test_counts_success_and_failure(self, mock_es_product):
+        results = [
+            (True, {"index": {"status": 201}}),
+            (False, {"index": {"status": 400}}),
+            (False, {"delete": {"status": 404}}),
+        ]
+        with patch.object(service.helpers, "parallel_bulk",
+                          return_value=iter(results)) as bulk:
+            ok, failed = service.bulk_index_products(
+                [mock_es_product], chunk_size=10, thread_count=2)
+
+        assert (ok, failed) == (2, 1)
+        kwargs = bulk.call_args.kwargs
+        assert kwargs["chunk_size"] == 10
+        assert kwargs["thread_count"] == 2
+
+
+class TestIterProducts:
+
+    def test_keyset_pagination_stops_on_short_batch(self, mock_db):
+        a, b, c = MagicMock(id="a"), MagicMock(id="b"), MagicMock(id="c")
+        q = build_q([[a, b], [c]])
+        mock_db.query.return_value = q
+
+        products = list(controller.iter_products(mock_db, batch_size=2))
+
+        assert products == [a, b, c]
+        assert q.limit.call_count == 2
+        mock_db.expunge_all.assert_called()
+
+    def test_empty_table_yields_nothing(self, mock_db):
+        mock_db.query.return_value = build_q([[]])
+        assert list(controller.iter_products(mock_db, batch_size=100)) == []
+
+
+class TestSyncChangedProducts:
+
+    def test_refreshes_index_before_bumping_search_cache(self):
+        """Refresh index trước khi bump generation → cache không giữ kết quả cũ."""
+        calls = MagicMock()
+        with patch.object(controller, "get_index_watermark", return_value=None), \
+                patch.object(controller, "SessionLocal"), \
+                patch.object(controller, "bulk_index_products", return_value=(3, 0)), \
+                patch.object(controller, "es_client") as es, \
+                patch.object(controller, "search_cache") as cache:
+            calls.attach_mock(es.indices.refresh, "refresh")
+            calls.attach_mock(cache.bump_generation, "bump_generation")
+            assert controller.sync_changed_products(batch_size=10) == 3
+
+        assert [c[0] for c in calls.mock_calls] == ["refresh", "bump_generation"]
+
+    def test_nothing_synced_keeps_cache(self):
+        with patch.object(controller, "get_index_watermark", return_value=None), \
+                patch.object(controller, "SessionLocal"), \
+                patch.object(controller, "bulk_index_products", return_value=(0, 0)), \
+                patch.object(controller, "es_client") as es, \
+                patch.object(controller, "search_cache") as cache:
+            controller.sync_changed_products(batch_size=10)
+
+        es.indices.refresh.assert_not_called()
+        cache.bump_generation.assert_not_called()
+
+
+class TestSwapProductAlias:
+
+    def test_swaps_old_index_atomically(self):
+        es = MagicMock()
+        es.indices.exists_alias.return_value = True
+        es.indices.get_alias.return_value = {"products_old": {}}
+
+        with patch.object(config, "es_client", es):
+            config.swap_product_alias("products_new")
+
+        actions = es.indices.update_aliases.call_args.kwargs["body"]["actions"]
+        assert {"remove": {"index": "products_old",
+                           "alias": config.PRODUCT_INDEX}} in actions
+        assert actions[-1] == {"add": {"index": "products_new",
+                                       "alias": config.PRODUCT_INDEX}}
+        es.indices.delete.assert_called_once_with(
+            index="products_old", ignore_unavailable=True)
+
+    def test_replaces_legacy_concrete_index(self):
+        es = MagicMock()
+        es.indices.exists_alias.return_value = False
+        es.indices.exists.return_value = True
+
+        with patch.object(config, "es_client", es):
+            config.swap_product_alias("products_new")
+
+        actions = es.indices.update_aliases.call_args.kwargs["body"]["actions"]
+        assert {"remove_index": {"index": config.PRODUCT_INDEX}} in actions
+
+
+class TestSessionHooks:
+
+    def _session(self, new=(), dirty=(), deleted=()):
+        session = MagicMock()
+        session.info = {}
+        session.new, session.dirty, session.deleted = list(new), list(dirty), list(deleted)
+        return session
+
+    def test_commit_enqueues_touched_products(self):
+        from app.models.product import Product, ProductImage
+        session = self._session(
+            new=[Product(id="p1")],
+            dirty=[ProductImage(id="i1", product_id="p2")]
+        )
+        controller._collect_dirty_products(session, None)
+
+        with patch.object(controller, "product_sync_queue") as queue:
+            controller._enqueue_dirty_products(session)
+
+        queue.enqueue.assert_called_once_with({"p1", "p2"})
+
+    def test_rollback_discards_touched_products(self):
+        from app.models.product import Product
+        session = self._session(dirty=[Product(id="p1")])
+        controller._collect_dirty_products(session, None)
+        controller._discard_dirty_products(session)
+
+        with patch.object(controller, "product_sync_queue") as queue:
+            controller._enqueue_dirty_products(session)
+
+        queue.enqueue.assert_not_called()
+
+
+class TestCategorySearchBody:
+
+    def test_category_filter_matches_path(self):
+        body = service.build_search_body(
+            None, None, None, 20, 1, category_id="c-skincare")
+        assert {"term": {"category_path": "c-skincare"}} in body["query"]["bool"]["filter"]
+
+    def test_category_filter_stays_in_query_with_facets(self):
+        body = service.build_search_body(
+            None, None, None, 20, 1, category_id="c-skincare", include_facets=True)
+        assert {"term": {"category_path": "c-skincare"}} in body["query"]["bool"]["filter"]
+        assert "post_filter" not in body
+
+
+class TestFacetedSearchBody:
+
+    def test_without_facets_filters_stay_in_query(self):
+        body = service.build_search_body(
+            None, None, None, 20, 1, brand="CeraVe")
+        assert "aggs" not in body and "post_filter" not in body
+        assert {"term": {"brand_name.keyword": "cerave"}} in body["query"]["bool"]["filter"]
+
+    def test_facet_filters_move_to_post_filter(self):
+        body = service.build_search_body(
+            None, 100, None, 20, 1, brand="cerave,la roche", tags=["dry"],
+            include_facets=True)
+
+        query_filter = body["query"]["bool"]["filter"]
+        assert {"range": {"price": {"gte": 100}}} in query_filter
+        assert all("brand_name.keyword" not in str(f) for f in query_filter)
+
+        brand_filter = {"terms": {"brand_name.keyword": ["cerave", "la roche"]}}
+        tag_filter = {"term": {"tags.keyword": "dry"}}
+        assert body["post_filter"] == {"bool": {"filter": [brand_filter, tag_filter]}}
+
+        # Each facet is scoped by the others' selections but not its own
+        assert body["aggs"]["brand"]["filter"] == {"bool": {"filter": [tag_filter]}}
+        assert body["aggs"]["tags"]["filter"] == {"bool": {"filter": [brand_filter]}}
+        assert body["aggs"]["category"]["filter"] == {
+            "bool": {"filter": [brand_filter, tag_filter]}}
+        assert body["aggs"]["price"]["aggs"]["values"]["histogram"]["field"] == "price"
+
+
+class TestCursorSearchBody:
+
+    def test_first_cursor_page_sorts_without_from(self):
+        body = service.build_search_body(
+            "kem", None, None, 20, 3, cursor_mode=True)
+        assert "from" not in body
+        assert body["sort"] == service.CURSOR_SORT
+        assert "search_after" not in body and "pit" not in body
+
+    def test_next_cursor_page_uses_search_after_and_pit(self):
+        body = service.build_search_body(
+            "kem", None, None, 20, 1, cursor_mode=True,
+            search_after=[1.2, "p9"], pit_id="pit-1")
+        assert body["search_after"] == [1.2, "p9"]
+        assert body["track_total_hits"] is False
+        assert body["pit"]["id"] == "pit-1"
+
+    def test_page_mode_keeps_offset(self):
+        body = service.build_search_body(None, None, None, 20, 3)
+        assert body["from"] == 40
+        assert "sort" not in body
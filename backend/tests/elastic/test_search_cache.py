@@ -0,0 +1,96 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.core.local_cache import LocalTTLCache
+from app.elastic.search_cache import SearchCache
+from app.services.products import ProductService
+
+
+@pytest.fixture
+def fake_redis():
+    store = {}
+    redis = MagicMock()
+    redis.aget = AsyncMock(side_effect=store.get)
+    redis.aset = AsyncMock(
+        side_effect=lambda key, value, ttl_seconds=None: store.__setitem__(key, value))
+
+    def incr(key):
+        store[key] = int(store.get(key) or 0) + 1
+        return store[key]
+    redis.incr.side_effect = incr
+
+    with patch("app.elastic.search_cache.redis_cache", redis):
+        yield store
+
+
+@pytest.fixture
+def cache(fake_redis):
+    return SearchCache(ttl_seconds=60, local_maxsize=8,
+                       local_ttl_seconds=10, generation_ttl_seconds=60)
+
+
+class TestLocalTTLCache:
+
+    def test_evicts_least_recently_used(self):
+        local = LocalTTLCache(maxsize=2, ttl_seconds=10)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+        assert local.get("b") is None
+        assert local.get("a") == 1 and local.get("c") == 3
+
+    def test_expired_entry_is_dropped(self):
+        local = LocalTTLCache(maxsize=2, ttl_seconds=10)
+        local.set("a", 1, ttl_seconds=0)
+        assert local.get("a") is None
+        assert len(local) == 0
+
+
+class TestSearchCache:
+
+    def test_equivalent_queries_share_a_key(self):
+        a = SearchCache.make_key(
+            {"keyword": "  Kem  chống nắng ", "brand": "CeraVe,La Roche", "min_price": 100})
+        b = SearchCache.make_key(
+            {"keyword": "kem chống nắng", "brand": ["la roche", "cerave"], "min_price": 100.0})
+        assert a == b
+        assert a != SearchCache.make_key({"keyword": "kem chống nắng", "page": 2})
+
+    @pytest.mark.asyncio
+    async def test_local_then_redis_hits(self, cache, fake_redis):
+        params = {"keyword": "kem", "page": 1}
+        assert await cache.get(params) is None
+        await cache.set(params, {"data": [1]})
+        assert await cache.get(params) == {"data": [1]}
+
+        cache.local.clear()
+        assert await cache.get(params) == {"data": [1]}
+
+        metrics = cache.metrics()
+        assert (metrics["misses"], metrics["local_hits"], metrics["redis_hits"]) == (1, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_bump_generation_invalidates_everything(self, cache):
+        params = {"keyword": "kem", "page": 1}
+        await cache.set(params, {"data": [1]})
+        cache.bump_generation()
+        assert await cache.get(params) is None
+        assert cache.metrics()["generation"] == 1
+
+
+class TestCachedSearch:
+
+    @pytest.mark.asyncio
+    async def test_repeat_search_skips_opensearch(self, cache, monkeypatch):
+        monkeypatch.setattr(
+            "app.services.products.product_service.search_cache", cache)
+        mock_response = {"hits": {"total": {"value": 1},
+                                  "hits": [{"_source": {"id": "p1"}}]}}
+        with patch("app.services.products.product_service.async_search_products_query",
+                   new=AsyncMock(return_value=mock_response)) as mock_search:
+            first = await ProductService.search_products_with_es(
+                keyword="kem", min_price=None, max_price=None, limit=20, page=1)
+            second = await ProductService.search_products_with_es(
+                keyword="KEM ", min_price=None, max_price=None, limit=20, page=1)
+        assert mock_search.await_count == 1
+        assert first == second
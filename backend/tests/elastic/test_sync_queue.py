@@ -0,0 +1,97 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from app.elastic import sync_queue as sq
+from app.elastic.sync_queue import ProductSyncQueue
+
+
+@pytest.fixture
+def queue():
+    return ProductSyncQueue(flush_interval_ms=10, max_batch=2,
+                            max_retries=1, retry_backoff_ms=1000)
+
+
+def bulk_results(*results):
+    return patch.object(sq.helpers, "streaming_bulk", return_value=iter(results))
+
+
+class TestEnqueue:
+
+    def test_duplicate_ids_coalesce(self, queue):
+        queue.enqueue(["p1", "p2", "p1"])
+        queue.enqueue(["p2"])
+        assert queue.metrics()["queue_depth"] == 2
+
+    def test_next_batch_respects_max_batch(self, queue):
+        queue.enqueue(["p1", "p2", "p3"])
+        batch = queue._next_batch()
+        assert list(batch) == ["p1", "p2"]
+        assert queue.metrics()["queue_depth"] == 1
+
+
+class TestFlush:
+
+    def test_success_notifies_listeners(self, queue):
+        listener = MagicMock()
+        queue.add_flush_listener(listener)
+        queue.enqueue(["p1"])
+        batch = queue._next_batch()
+
+        with patch.object(queue, "_build_actions", return_value=[{}]), \
+                bulk_results((True, {"index": {"_id": "p1", "status": 200}})) as bulk:
+            queue.flush(batch)
+
+        listener.assert_called_once_with(["p1"])
+        # Listener (bump generation) chỉ chạy khi thay đổi đã search được
+        assert bulk.call_args.kwargs["refresh"] == "wait_for"
+        m = queue.metrics()
+        assert m["flushed_total"] == 1
+        assert m["queue_depth"] == 0
+
+    def test_failed_id_is_requeued_with_backoff(self, queue):
+        queue.enqueue(["p1"])
+        batch = queue._next_batch()
+
+        with patch.object(queue, "_build_actions", return_value=[{}]), \
+                bulk_results((False, {"index": {"_id": "p1", "status": 429,
+                                                "error": "too many"}})):
+            queue.flush(batch)
+
+        m = queue.metrics()
+        assert m["queue_depth"] == 1
+        assert m["retried_total"] == 1
+        assert queue._pending["p1"].not_before > 0
+
+    def test_gives_up_after_max_retries(self, queue):
+        queue.enqueue(["p1"])
+        batch = queue._next_batch()
+        batch["p1"].attempts = 1
+
+        with patch.object(queue, "_build_actions", side_effect=Exception("ES down")):
+            queue.flush(batch)
+
+        m = queue.metrics()
+        assert m["queue_depth"] == 0
+        assert m["dropped_total"] == 1
+        assert m["last_error"] == "ES down"
+
+    def test_missing_delete_counts_as_success(self, queue):
+        queue.enqueue(["p1"])
+        batch = queue._next_batch()
+
+        with patch.object(queue, "_build_actions", return_value=[{}]), \
+                bulk_results((False, {"delete": {"_id": "p1", "status": 404}})):
+            queue.flush(batch)
+
+        assert queue.metrics()["flushed_total"] == 1
+
+
+class TestWorker:
+
+    def test_stop_flushes_pending(self, queue):
+        with patch.object(queue, "flush") as flush:
+            queue.start()
+            queue.enqueue(["p1"])
+            queue.stop(timeout=2)
+
+        flushed = [pid for call in flush.call_args_list for pid in call.args[0]]
+        assert flushed == ["p1"]
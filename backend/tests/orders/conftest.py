@@ -184,21 +184,21 @@ def mock_admin_user():
 #  TestClients
 
 @pytest.fixture
-def client(mock_current_user):
+def client(mock_current_user, as_principal):
     """Customer client — override get_current_user."""
     app = FastAPI()
     app.include_router(router)
-    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    app.dependency_overrides[get_current_user] = lambda: as_principal(mock_current_user)
     app.dependency_overrides[get_db] = lambda: MagicMock()
     return TestClient(app)
 
 
 @pytest.fixture
-def admin_client(mock_admin_user):
+def admin_client(mock_admin_user, as_principal):
     """Admin client — require_permission() là factory nên override get_current_user bên trong nó."""
     app = FastAPI()
     app.include_router(router)
-    app.dependency_overrides[get_current_user] = lambda: mock_admin_user
+    app.dependency_overrides[get_current_user] = lambda: as_principal(mock_admin_user)
     app.dependency_overrides[get_db] = lambda: MagicMock()
     return TestClient(app)
 
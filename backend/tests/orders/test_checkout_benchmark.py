@@ -0,0 +1,64 @@
+import pytest
+import uuid
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+from app.core.enums import PaymentMethod
+from app.services.oders import OrderService
+
+pytest.importorskip("pytest_benchmark")
+
+CART_SIZE = 50
+
+
+def build_cart(size: int):
+    items = []
+    for i in range(size):
+        product = MagicMock()
+        product.name = f"Product {i}"
+        product.stock_quantity = 100
+        item = MagicMock()
+        item.product_id = str(uuid.uuid4())
+        item.product_slug = f"product-{i}"
+        item.variant_id = None
+        item.variant = None
+        item.product = product
+        item.quantity = 2
+        item.price = Decimal("100000.00")
+        items.append(item)
+    cart = MagicMock()
+    cart.id = str(uuid.uuid4())
+    cart.items = items
+    return cart
+
+
+def build_db(user, cart):
+    """Session mock: User query → user, các query sau → cart"""
+    db = MagicMock()
+
+    def query(model, *args):
+        q = MagicMock()
+        for attr in ("filter", "options"):
+            getattr(q, attr).return_value = q
+        q.first.return_value = user if model.__name__ == "User" else cart
+        return q
+
+    db.query.side_effect = query
+    return db
+
+
+def test_checkout_50_item_cart(benchmark, mock_current_user):
+    """Checkout cart 50 dòng (DB mock) → đo phần xử lý của service."""
+    cart = build_cart(CART_SIZE)
+    db = build_db(mock_current_user, cart)
+    address = {"name": "Test", "phone": "09000", "address": "123", "city": "HCM"}
+
+    with patch("app.services.oders.StockService.reserve", return_value=[]), \
+            patch("app.services.oders.order_number_generator.next",
+                  return_value="ORD-20250101-00001"), \
+            patch("app.services.oders.NotificationEventEmitter.emit"):
+        result = benchmark(
+            OrderService.create_order,
+            db, mock_current_user.id, address, PaymentMethod.COD.value, MagicMock()
+        )
+
+    assert len(result["data"]["items"]) == CART_SIZE
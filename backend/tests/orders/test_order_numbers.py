@@ -0,0 +1,87 @@
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from sqlalchemy.dialects import postgresql
+from app.services.order_numbers import (
+    ORDER_NUMBER_SEQUENCE,
+    OrderNumberGenerator,
+    order_number_generator,
+)
+
+
+# HELPER
+def build_db(*starts):
+    """Session mock: mỗi lần nextval trả về giá trị kế tiếp trong starts"""
+    db = MagicMock()
+    db.execute.return_value.scalar_one.side_effect = list(starts)
+    return db
+
+
+def build_generator(block_size=3):
+    generator = OrderNumberGenerator(ORDER_NUMBER_SEQUENCE, block_size)
+    generator._ready = True
+    return generator
+
+
+class TestOrderNumberGenerator:
+
+    def test_hands_out_block_before_next_round_trip(self):
+        """1 lần nextval → dùng cho block_size order."""
+        db = build_db(1, 4)
+        generator = build_generator(block_size=3)
+
+        numbers = [generator.next_sequence(db) for _ in range(4)]
+
+        assert numbers == [1, 2, 3, 4]
+        assert db.execute.call_count == 2
+
+    def test_uses_sequence_nextval(self):
+        db = build_db(1)
+        build_generator().next_sequence(db)
+
+        stmt = db.execute.call_args.args[0]
+        assert "nextval('order_number_seq')" in str(stmt.compile(dialect=postgresql.dialect()))
+
+    def test_keeps_order_number_format(self):
+        db = build_db(42)
+        number = build_generator().next(db, now=datetime(2025, 3, 1))
+        assert number == "ORD-20250301-00042"
+
+    def test_concurrent_callers_get_distinct_numbers(self):
+        """Nhiều thread cùng lấy số → không trùng."""
+        db = build_db(*range(1, 1000, 5))
+        generator = build_generator(block_size=5)
+        numbers = []
+
+        def worker():
+            for _ in range(50):
+                numbers.append(generator.next_sequence(db))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(numbers) == list(range(1, 401))
+
+    def test_creates_missing_sequence_after_existing_orders(self):
+        """Sequence chưa có → tạo mới và setval theo số order hiện có."""
+        db = build_db(121)
+        conn = db.get_bind.return_value.begin.return_value.__enter__.return_value
+        conn.dialect.has_sequence.return_value = False
+        conn.execute.return_value.scalar.return_value = 120
+        generator = OrderNumberGenerator(ORDER_NUMBER_SEQUENCE, 20)
+
+        with patch.object(ORDER_NUMBER_SEQUENCE, "create") as create:
+            assert generator.next_sequence(db) == 121
+            generator.next_sequence(db)
+
+        create.assert_called_once_with(conn, checkfirst=True)
+        setval = conn.execute.call_args_list[-1].args[0]
+        assert "setval" in str(setval.compile(dialect=postgresql.dialect()))
+        # Chỉ kiểm tra / tạo sequence một lần mỗi process
+        db.get_bind.assert_called_once()
+
+    def test_block_size_matches_sequence_increment(self):
+        assert ORDER_NUMBER_SEQUENCE.increment == order_number_generator.block_size
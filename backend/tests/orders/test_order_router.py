@@ -107,6 +107,19 @@ class TestCreateOrderEndpoint:
 
         assert res.status_code == 201
 
+    def test_idempotency_key_header_reaches_service(self, client):
+        """Header Idempotency-Key → truyền xuống service; không có header → None."""
+        mock_res = order_response("Order created successfully")
+
+        with patch("app.routes.orders.OrderService.create_order",
+                   return_value=mock_res) as svc:
+            client.post("/orders", json=create_order_payload(),
+                        headers={"Idempotency-Key": "retry-1"})
+            client.post("/orders", json=create_order_payload())
+
+        keys = [c.kwargs["idempotency_key"] for c in svc.call_args_list]
+        assert keys == ["retry-1", None]
+
     def test_missing_shipping_address_returns_422(self, client):
         """Thiếu shipping_address → 422."""
         payload = create_order_payload()
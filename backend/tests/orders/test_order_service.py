@@ -3,6 +3,7 @@ from decimal import Decimal
 from unittest.mock import MagicMock, patch, call
 from fastapi import HTTPException
 from app.services.oders import OrderService
+from app.services.stock import StockLine
 from app.core.enums import OrderStatus, PaymentStatus, PaymentMethod
 
 
@@ -42,6 +43,14 @@ class TestCalculateShippingFee:
 # CREATE ORDER
 class TestCreateOrder:
 
+    @pytest.fixture(autouse=True)
+    def mock_reserve(self):
+        """Reserve thành công mặc định (không có dòng nào thiếu stock)."""
+        with patch("app.services.oders.StockService.reserve", return_value=[]) as reserve, \
+                patch("app.services.oders.order_number_generator.next",
+                      return_value="ORD-20240101-00001"):
+            yield reserve
+
     def _setup_query(self, mock_db, mock_user, mock_cart):
         """Setup query side_effect cho create_order flow."""
         call_count = 0
@@ -54,9 +63,6 @@ class TestCreateOrder:
                 q.first.return_value = mock_user    # User query
             elif call_count == 2:
                 q.first.return_value = mock_cart    # Cart query with joinedload
-            elif call_count == 3:
-                # count(Order.id) for order_number
-                q.scalar.return_value = 0
             else:
                 q.first.return_value = mock_cart    # db.refresh reload
             return q
@@ -194,13 +200,11 @@ class TestCreateOrder:
         # Order add được gọi với shipping_fee = 30000
         assert mock_db.add.called
 
-    def test_deducts_stock_after_create(
+    def test_reserves_stock_for_cart_lines(
         self, mock_db, mock_current_user, mock_cart, mock_cart_item,
-        mock_order, user_id
+        mock_order, user_id, mock_reserve
     ):
-        """Sau khi tạo order → stock của product bị trừ."""
-        mock_cart_item.variant = None
-        original_stock = mock_cart_item.product.stock_quantity
+        """Tạo order → reserve stock cho tất cả dòng trong cart."""
         self._setup_query(mock_db, mock_current_user, mock_cart)
 
         with patch("app.services.oders.NotificationEventEmitter.emit"), \
@@ -215,8 +219,57 @@ class TestCreateOrder:
                 MagicMock()
             )
 
-        assert mock_cart_item.product.stock_quantity == \
-            original_stock - mock_cart_item.quantity
+        mock_reserve.assert_called_once_with(mock_db, [
+            StockLine(mock_cart_item.product_id, None, mock_cart_item.quantity)
+        ])
+
+    def test_reservation_shortfall_rolls_back(
+        self, mock_db, mock_current_user, mock_cart, mock_cart_item,
+        user_id, mock_reserve
+    ):
+        """Stock bị checkout khác lấy mất → rollback, raise 400, không commit."""
+        mock_reserve.return_value = [
+            StockLine(mock_cart_item.product_id, None, mock_cart_item.quantity)
+        ]
+        self._setup_query(mock_db, mock_current_user, mock_cart)
+
+        def rollback():
+            # Sau rollback cart/items bị expire: không được đọc lại
+            mock_cart.items = []
+            mock_cart_item.product = None
+        mock_db.rollback.side_effect = rollback
+
+        with pytest.raises(HTTPException) as exc_info:
+            OrderService.create_order(
+                mock_db, user_id, {}, PaymentMethod.COD.value, MagicMock()
+            )
+
+        assert exc_info.value.status_code == 400
+        assert "Test Product" in exc_info.value.detail["message"]
+        assert mock_cart_item.product_id in exc_info.value.detail["message"]
+        mock_db.rollback.assert_called_once()
+        mock_db.commit.assert_not_called()
+
+    @pytest.mark.parametrize("method, held", [
+        (PaymentMethod.VNPAY.value, True),
+        (PaymentMethod.COD.value, False),
+    ])
+    def test_vnpay_order_holds_reservation(
+        self, mock_db, mock_current_user, mock_cart, user_id, method, held
+    ):
+        """Order VNPay → có reservation_expires_at; COD → không."""
+        self._setup_query(mock_db, mock_current_user, mock_cart)
+
+        with patch("app.services.oders.NotificationEventEmitter.emit"), \
+            patch("app.services.oders.OrderService._trigger_confirmation_email"), \
+            patch("app.services.oders.OrderService._format_order_detail",
+                  return_value={"id": "x"}):
+            OrderService.create_order(mock_db, user_id, {}, method, MagicMock())
+
+        from app.models.order import Order as OrderModel
+        order = next(c.args[0] for c in mock_db.add.call_args_list
+                     if isinstance(c.args[0], OrderModel))
+        assert (order.reservation_expires_at is not None) is held
 
     def test_clears_cart_after_create(
         self, mock_db, mock_current_user, mock_cart, mock_order, user_id
@@ -245,6 +298,81 @@ class TestCreateOrder:
         assert any(m is CartItemModel for m in queried_models)
         mock_db.commit.assert_called_once()
 
+    def test_items_inserted_in_one_statement_without_refetch(
+        self, mock_db, mock_current_user, mock_cart, mock_cart_item, user_id
+    ):
+        """Order items → 1 câu INSERT nhiều dòng; response lấy từ dữ liệu trong bộ nhớ."""
+        mock_cart.items = [mock_cart_item] * 3
+        self._setup_query(mock_db, mock_current_user, mock_cart)
+        background_tasks = MagicMock()
+
+        with patch("app.services.oders.NotificationEventEmitter.emit"):
+            result = OrderService.create_order(
+                mock_db, user_id,
+                {"name": "Test", "phone": "09000",
+                    "address": "123", "city": "HCM"},
+                PaymentMethod.COD.value,
+                background_tasks
+            )
+
+        stmt, rows = mock_db.execute.call_args.args
+        assert stmt.table.name == "order_items"
+        assert len(rows) == 3
+        assert len({row["created_at"] for row in rows}) == 1
+        mock_db.refresh.assert_not_called()
+        mock_db.expunge.assert_called_once()
+
+        items = result["data"]["items"]
+        assert [item["id"] for item in items] == [row["id"] for row in rows]
+        assert items[0]["subtotal"] == 200000.0
+        email_context = background_tasks.add_task.call_args.args[2]
+        assert len(email_context["items"]) == 3
+
+    def test_redis_cart_flushed_before_read_and_discarded_before_commit(
+        self, mock_db, mock_current_user, mock_cart, user_id
+    ):
+        """Cart Redis bật → ghi xuống cart_items trước khi đọc, bỏ bản Redis trước khi commit."""
+        self._setup_query(mock_db, mock_current_user, mock_cart)
+        calls = MagicMock()
+        calls.attach_mock(mock_db.commit, "commit")
+
+        with patch("app.services.oders.cart_store") as store, \
+                patch("app.services.oders.NotificationEventEmitter.emit"):
+            calls.attach_mock(store.flush, "flush")
+            calls.attach_mock(store.discard, "discard")
+            store.enabled = True
+            OrderService.create_order(
+                mock_db, user_id,
+                {"name": "Test", "phone": "09000",
+                    "address": "123", "city": "HCM"},
+                PaymentMethod.COD.value,
+                MagicMock()
+            )
+
+        assert [c[0] for c in calls.mock_calls] == [
+            "flush", "discard", "commit"]
+        store.flush.assert_called_once_with(mock_db, user_id)
+
+    def test_redis_down_at_discard_fails_checkout_before_commit(
+        self, mock_db, mock_current_user, mock_cart, user_id
+    ):
+        """Không bỏ được cart Redis → không commit order (tránh mua lại các dòng đã mua)."""
+        self._setup_query(mock_db, mock_current_user, mock_cart)
+
+        with patch("app.services.oders.cart_store") as store:
+            store.enabled = True
+            store.discard.side_effect = ConnectionError("down")
+            with pytest.raises(ConnectionError):
+                OrderService.create_order(
+                    mock_db, user_id,
+                    {"name": "Test", "phone": "09000",
+                        "address": "123", "city": "HCM"},
+                    PaymentMethod.COD.value,
+                    MagicMock()
+                )
+
+        mock_db.commit.assert_not_called()
+
     def test_sends_confirmation_email(
         self, mock_db, mock_current_user, mock_cart, mock_order, user_id
     ):
@@ -371,15 +499,16 @@ class TestCancelOrder:
     ):
         """Cancel order → stock của product được restore."""
         mock_order.status = OrderStatus.PENDING.value
-        mock_order_item.variant = None
-        original_stock = mock_order_item.product.stock_quantity
         mock_db.query.return_value = build_query_chain(first=mock_order)
         mock_db.refresh.side_effect = lambda obj: None
 
-        OrderService.cancel_order(mock_db, user_id, order_id)
+        with patch("app.services.oders.StockService.release") as release:
+            OrderService.cancel_order(mock_db, user_id, order_id)
 
-        assert mock_order_item.product.stock_quantity == \
-            original_stock + mock_order_item.quantity
+        release.assert_called_once_with(mock_db, [
+            StockLine(mock_order_item.product_id, None, mock_order_item.quantity)
+        ])
+        assert mock_order.reservation_expires_at is None
 
     def test_order_not_found_raises_404(self, mock_db, user_id, order_id):
         """Order không tồn tại → raise 404."""
@@ -484,17 +613,17 @@ class TestUpdateOrderStatus:
     ):
         """Update status → 'cancelled' → restore stock."""
         mock_order.status = OrderStatus.PROCESSING.value
-        mock_order_item.variant = None
-        original_stock = mock_order_item.product.stock_quantity
         mock_db.query.return_value = build_query_chain(first=mock_order)
         mock_db.refresh.side_effect = lambda obj: None
 
-        OrderService.update_order_status(
-            mock_db, order_id, OrderStatus.CANCELLED.value, user_id
-        )
+        with patch("app.services.oders.StockService.release") as release:
+            OrderService.update_order_status(
+                mock_db, order_id, OrderStatus.CANCELLED.value, user_id
+            )
 
-        assert mock_order_item.product.stock_quantity == \
-            original_stock + mock_order_item.quantity
+        release.assert_called_once_with(mock_db, [
+            StockLine(mock_order_item.product_id, None, mock_order_item.quantity)
+        ])
 
     def test_delivered_cod_sets_payment_paid(
         self, mock_db, mock_order, order_id, user_id
@@ -0,0 +1,86 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+from app.core.enums import OrderStatus, PaymentStatus
+from app.services.payment import VNPayService
+
+
+# HELPER
+PAID_PARAMS = {
+    "vnp_TxnRef": "ORD-20250101-00001",
+    "vnp_Amount": "10000000",
+    "vnp_ResponseCode": "00",
+    "vnp_TransactionStatus": "00",
+}
+
+
+def build_order(reservation_expires_at=None):
+    order = MagicMock()
+    order.total = Decimal("100000.00")
+    order.status = OrderStatus.CANCELLED.value
+    order.payment_status = PaymentStatus.UNPAID.value
+    order.reservation_expires_at = reservation_expires_at
+    return order
+
+
+def build_db(order):
+    db = MagicMock()
+    q = db.query.return_value
+    for attr in ("filter", "with_for_update"):
+        getattr(q, attr).return_value = q
+    q.first.return_value = order
+    return db
+
+
+@pytest.fixture(autouse=True)
+def valid_signature():
+    with patch.object(VNPayService, "_validate_signature", return_value=True):
+        yield
+
+
+# LATE PAYMENT ON A CANCELLED ORDER
+class TestLatePayment:
+
+    def test_expired_reservation_is_revived_when_stock_left(self):
+        """Order bị sweeper huỷ, còn hàng → giữ lại stock, về PENDING + PAID."""
+        order = build_order(reservation_expires_at=datetime(2025, 1, 1))
+        db = build_db(order)
+
+        with patch("app.services.payment.StockService.reserve", return_value=[]) as reserve:
+            result = VNPayService.handle_payment_ipn(db, PAID_PARAMS)
+
+        assert result["RspCode"] == "00"
+        reserve.assert_called_once()
+        db.begin_nested.return_value.commit.assert_called_once()
+        assert order.status == OrderStatus.PENDING.value
+        assert order.payment_status == PaymentStatus.PAID.value
+        assert order.reservation_expires_at is None
+
+    def test_expired_reservation_without_stock_stays_cancelled(self):
+        """Hết hàng → rollback savepoint (vẫn giữ lock order), CANCELLED + PAID để hoàn tiền."""
+        order = build_order(reservation_expires_at=datetime(2025, 1, 1))
+        db = build_db(order)
+
+        with patch("app.services.payment.StockService.reserve",
+                   return_value=[MagicMock()]):
+            VNPayService.handle_payment_ipn(db, PAID_PARAMS)
+
+        db.begin_nested.return_value.rollback.assert_called_once()
+        db.rollback.assert_not_called()
+        db.commit.assert_called_once()
+        assert order.status == OrderStatus.CANCELLED.value
+        assert order.payment_status == PaymentStatus.PAID.value
+
+    def test_order_cancelled_by_user_or_admin_is_not_revived(self):
+        """Order do khách / admin huỷ → không giữ lại stock, vẫn CANCELLED + PAID."""
+        order = build_order(reservation_expires_at=None)
+        db = build_db(order)
+
+        with patch("app.services.payment.StockService.reserve") as reserve:
+            VNPayService.handle_payment_ipn(db, PAID_PARAMS)
+
+        reserve.assert_not_called()
+        db.begin_nested.assert_not_called()
+        assert order.status == OrderStatus.CANCELLED.value
+        assert order.payment_status == PaymentStatus.PAID.value
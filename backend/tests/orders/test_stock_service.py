@@ -0,0 +1,145 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.dml import Update
+from app.core.enums import OrderStatus
+from app.elastic.controller import _DIRTY_PRODUCTS_KEY
+from app.services.stock import StockLine, StockService
+
+
+# HELPER
+def sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def build_db(*updated):
+    """Session mock: UPDATE thứ n trả về các id trong updated[n] (đủ stock)"""
+    db = MagicMock()
+    db.info = {}
+    statements = []
+    results = iter(updated)
+
+    def execute(stmt):
+        statements.append(stmt)
+        result = MagicMock()
+        if isinstance(stmt, Update):
+            result.scalars.return_value.all.return_value = next(results)
+        return result
+
+    db.execute.side_effect = execute
+    return db, statements
+
+
+# RESERVE
+class TestReserve:
+
+    def test_single_line_is_one_conditional_update(self):
+        """1 dòng → chỉ 1 câu UPDATE có điều kiện, không lock trước."""
+        db, statements = build_db(["p1"])
+
+        short = StockService.reserve(db, [StockLine("p1", None, 2)])
+
+        assert short == []
+        assert len(statements) == 1
+        text = sql(statements[0])
+        assert "products.stock_quantity >= requested.quantity" in text
+        assert "products.stock_quantity - requested.quantity" in text
+        assert "RETURNING products.id" in text
+
+    def test_returns_lines_without_enough_stock(self):
+        """UPDATE không trả về id → dòng đó thiếu stock."""
+        db, _ = build_db(["p1"], [])
+        lines = [StockLine("p1", None, 1), StockLine("p2", None, 1),
+                 StockLine("p1", "v1", 1)]
+
+        assert StockService.reserve(db, lines) == lines[1:]
+
+    def test_duplicate_lines_are_summed(self):
+        """Cùng product xuất hiện 2 lần → gộp quantity trong 1 UPDATE."""
+        products, variants = StockService._totals([
+            StockLine("p1", None, 2), StockLine("p1", None, 3),
+            StockLine("p1", "v1", 1)])
+        assert products == {"p1": 5}
+        assert variants == {"v1": 1}
+
+    def test_multi_row_locks_in_fixed_order(self):
+        """Nhiều dòng → lock products rồi variants, theo id tăng dần."""
+        db, statements = build_db(["a", "b"], ["v1"])
+
+        StockService.reserve(db, [StockLine("b", None, 1), StockLine("a", None, 1),
+                                  StockLine("b", "v1", 1)])
+
+        locks = [sql(stmt) for stmt in statements[:2]]
+        assert all("FOR UPDATE" in text for text in locks)
+        assert "FROM products" in locks[0] and "ORDER BY products.id" in locks[0]
+        assert "FROM product_variants" in locks[1]
+        assert all(isinstance(stmt, Update) for stmt in statements[2:])
+
+    def test_marks_products_for_search_sync(self):
+        """Stock thay đổi bằng bulk UPDATE → product được đánh dấu re-index."""
+        db, _ = build_db(["p1"])
+        StockService.reserve(db, [StockLine("p1", None, 1)])
+        assert db.info[_DIRTY_PRODUCTS_KEY] == {"p1"}
+
+
+# RELEASE
+class TestRelease:
+
+    def test_release_adds_stock_back_unconditionally(self):
+        db, statements = build_db(["v1"])
+
+        StockService.release(db, [StockLine("p1", "v1", 4)])
+
+        text = sql(statements[0])
+        assert "product_variants.stock_quantity + requested.quantity" in text
+        assert ">=" not in text
+
+
+# RELEASE EXPIRED RESERVATIONS
+EXPIRED_AT = datetime(2024, 12, 31, 23, 45)
+
+
+class TestReleaseExpiredReservations:
+
+    def _order(self, *items):
+        order = MagicMock()
+        order.status = OrderStatus.PENDING.value
+        order.reservation_expires_at = EXPIRED_AT
+        order.items = [MagicMock(product_id=p, variant_id=v, quantity=q)
+                       for p, v, q in items]
+        return order
+
+    def _query(self, orders):
+        q = MagicMock()
+        for attr in ("options", "filter", "order_by", "limit", "with_for_update"):
+            getattr(q, attr).return_value = q
+        q.all.return_value = orders
+        return q
+
+    def test_cancels_orders_and_releases_their_stock(self):
+        first = self._order(("p1", None, 2))
+        second = self._order(("p2", "v2", 1))
+        db = MagicMock()
+        db.query.return_value = self._query([first, second])
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+        with patch.object(StockService, "release") as release:
+            released = StockService.release_expired_reservations(db, now)
+
+        assert released == 2
+        release.assert_called_once_with(
+            db, [StockLine("p1", None, 2), StockLine("p2", "v2", 1)])
+        assert first.status == second.status == OrderStatus.CANCELLED.value
+        # Giữ lại để IPN biết order bị huỷ do hết hạn giữ hàng
+        assert first.reservation_expires_at == EXPIRED_AT
+        db.commit.assert_called_once()
+
+    def test_skips_rows_locked_by_other_workers(self):
+        db = MagicMock()
+        q = self._query([])
+        db.query.return_value = q
+
+        assert StockService.release_expired_reservations(db) == 0
+        q.with_for_update.assert_called_once()
+        assert q.with_for_update.call_args.kwargs["skip_locked"] is True
+        db.commit.assert_not_called()
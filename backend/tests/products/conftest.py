@@ -182,10 +182,10 @@ def public_client():
 
 
 @pytest.fixture
-def admin_client(mock_admin_user):
+def admin_client(mock_admin_user, as_principal):
     """require_permission() là factory → override get_current_user."""
     app = FastAPI()
     app.include_router(router)
-    app.dependency_overrides[get_current_user] = lambda: mock_admin_user
+    app.dependency_overrides[get_current_user] = lambda: as_principal(mock_admin_user)
     app.dependency_overrides[get_db] = lambda: MagicMock()
     return TestClient(app)
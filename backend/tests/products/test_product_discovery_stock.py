@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
 from app.services.products import ProductDiscoveryService, ProductStockService
 
 MOCK_ITEM = {"id": "x", "name": "Test", "slug": "test"}
@@ -8,7 +9,8 @@ MOCK_ITEM = {"id": "x", "name": "Test", "slug": "test"}
 
 def build_q(first=None, all_result=None, count=0):
     q = MagicMock()
-    for a in ("filter", "options", "join", "order_by", "offset", "limit"):
+    for a in ("filter", "options", "join", "order_by", "offset", "limit",
+              "enable_eagerloads", "with_entities"):
         getattr(q, a).return_value = q
     q.first.return_value = first
     q.all.return_value = all_result or []
@@ -155,6 +157,27 @@ class TestGetByCategory:
             result = ProductDiscoveryService.get_by_category(mock_db, "serum")
         assert result["success"] is True
 
+    def test_includes_subcategories_by_path(self, mock_db, mock_category):
+        """Lọc theo cả subtree: category_id IN (categories có path bắt đầu bằng path cha)."""
+        mock_category.path = f"/{mock_category.id}/"
+        product_q = build_q()
+        filters = []
+
+        def fake_filter(*clauses):
+            filters.extend(clauses)
+            return product_q
+        product_q.filter.side_effect = fake_filter
+
+        category_q = build_q(first=mock_category)
+        mock_db.query.side_effect = [category_q, product_q]
+
+        ProductDiscoveryService.get_by_category(mock_db, "serum")
+
+        sql = str(filters[0].compile(dialect=postgresql.dialect(),
+                                     compile_kwargs={"literal_binds": True}))
+        assert "products.category_id IN (SELECT categories.id" in sql
+        assert f"categories.path LIKE '/{mock_category.id}/%%'" in sql
+
     def test_category_not_found_raises_404(self, mock_db):
         mock_db.query.return_value = build_q(first=None)
         with pytest.raises(HTTPException) as exc:
@@ -0,0 +1,76 @@
+from decimal import Decimal
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app.models.brand import Brand
+from app.models.category import Category
+from app.models.product import Product
+from app.services.products.helpers import format_product_list_item, get_primary_image_url
+from app.services.products.loading import product_list_options
+
+
+def compile_sql(query):
+    return str(query.statement.compile(dialect=postgresql.dialect()))
+
+
+def list_query(limit=20):
+    return Session().query(Product).options(*product_list_options()).filter(
+        Product.deleted_at.is_(None)
+    ).order_by(Product.created_at.desc()).limit(limit)
+
+
+class TestProductListOptions:
+
+    def test_no_collection_join_or_limit_wrapping(self):
+        sql = compile_sql(list_query())
+        # images/tags không join vào câu chính → LIMIT áp thẳng lên products
+        assert "JOIN product_images" not in sql
+        assert "product_tags" not in sql
+        assert "FROM (SELECT" not in sql
+
+    def test_primary_image_is_correlated_subquery(self):
+        sql = compile_sql(list_query())
+        assert "WHERE product_images.product_id = products.id" in sql
+        assert "product_images.is_primary DESC" in sql
+
+    def test_only_list_columns_selected(self):
+        sql = compile_sql(list_query())
+        for column in ("description", "how_to_use", "ingredients", "created_by_id"):
+            assert f"products.{column}," not in sql and f"products.{column} " not in sql
+        for column in ("name", "slug", "price", "rating_average", "brand_id", "category_id"):
+            assert f"products.{column}" in sql
+
+
+class TestPrimaryImageUrl:
+
+    def test_uses_selected_expression(self):
+        product = Product(id="p1")
+        product.primary_image_url = "https://cdn/p1.jpg"
+        assert get_primary_image_url(product) == "https://cdn/p1.jpg"
+
+    def test_selected_null_means_no_image(self):
+        product = SimpleNamespace(primary_image_url=None, images=None)
+        assert get_primary_image_url(product) is None
+
+    def test_falls_back_to_images_collection(self):
+        images = [SimpleNamespace(is_primary=False, image_url="a.jpg"),
+                  SimpleNamespace(is_primary=True, image_url="b.jpg")]
+        product = SimpleNamespace(images=images)
+        assert get_primary_image_url(product) == "b.jpg"
+
+    def test_first_image_when_none_primary(self):
+        product = SimpleNamespace(images=[SimpleNamespace(is_primary=False, image_url="a.jpg")])
+        assert get_primary_image_url(product) == "a.jpg"
+
+    def test_list_item_uses_selected_image(self):
+        product = Product(id="p1", name="Serum", slug="serum", price=Decimal("100000"),
+                          brand=Brand(id="b1", name="B", slug="b"),
+                          category=Category(id="c1", name="C", slug="c"), tags=[])
+        product.primary_image_url = "https://cdn/p1.jpg"
+
+        item = format_product_list_item(product)
+
+        assert item["product_image"] == "https://cdn/p1.jpg"
+        # Cột query_expression không lọt vào output
+        assert "primary_image_url" not in item
+        assert item["price"] == 100000.0
@@ -0,0 +1,196 @@
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from app.models.product import Product
+from app.services.products import ProductService, ProductDiscoveryService
+from app.services.products.pagination import count_products, keyset_page
+from app.utils.cursor import encode_cursor, decode_cursor
+
+MOCK_ITEM = {"id": "x", "name": "Test", "slug": "test"}
+
+
+def build_q(all_result=None, count=0):
+    q = MagicMock()
+    for a in ("filter", "options", "join", "order_by", "offset", "limit",
+              "enable_eagerloads", "with_entities"):
+        getattr(q, a).return_value = q
+    q.all.return_value = all_result or []
+    q.count.return_value = count
+    return q
+
+
+def capture_filter(q):
+    """Ghi lại clause truyền vào filter() để compile ra SQL."""
+    captured = []
+
+    def fake_filter(clause):
+        captured.append(clause)
+        return q
+    q.filter.side_effect = fake_filter
+    return captured
+
+
+def rows(n):
+    return [SimpleNamespace(id=f"p{i}", rating_average=Decimal("4.50") - i,
+                            created_at=datetime(2025, 1, 10 - i, tzinfo=timezone.utc))
+            for i in range(n)]
+
+
+# keyset_page
+
+
+class TestKeysetPage:
+
+    def test_first_page_has_next_cursor(self):
+        q = build_q(all_result=rows(3))
+
+        page, next_cursor = keyset_page(q, Product.rating_average, True, 2)
+
+        assert [p.id for p in page] == ["p0", "p1"]
+        assert decode_cursor(next_cursor) == {"v": "3.50", "id": "p1"}
+        # Lấy thừa 1 dòng để biết còn trang sau
+        q.limit.assert_called_once_with(3)
+        q.offset.assert_not_called()
+
+    def test_last_page_has_no_cursor(self):
+        q = build_q(all_result=rows(2))
+        page, next_cursor = keyset_page(q, Product.rating_average, True, 2)
+        assert len(page) == 2
+        assert next_cursor is None
+
+    def test_datetime_cursor_round_trip(self):
+        q = build_q(all_result=rows(2))
+        _, next_cursor = keyset_page(q, Product.created_at, True, 1)
+        assert decode_cursor(next_cursor)["v"] == "2025-01-10T00:00:00+00:00"
+
+    def test_descending_uses_less_than(self):
+        q = build_q()
+        captured = capture_filter(q)
+        cursor = encode_cursor({"v": "4.50", "id": "p1"})
+
+        keyset_page(q, Product.rating_average, True, 2, cursor, null_value=0)
+
+        sql = str(captured[0].compile(dialect=postgresql.dialect()))
+        assert "coalesce(products.rating_average" in sql
+        assert ") < (" in sql
+
+    def test_ascending_uses_greater_than(self):
+        q = build_q()
+        captured = capture_filter(q)
+        cursor = encode_cursor({"v": "Serum", "id": "p1"})
+
+        keyset_page(q, Product.name, False, 2, cursor)
+
+        sql = str(captured[0].compile(dialect=postgresql.dialect()))
+        assert ") > (" in sql
+
+    @pytest.mark.parametrize("cursor", [
+        "not-a-cursor",
+        encode_cursor({"id": "p1"}),
+        encode_cursor({"v": "abc", "id": "p1"}),
+    ])
+    def test_invalid_cursor_raises_value_error(self, cursor):
+        with pytest.raises(ValueError):
+            keyset_page(build_q(), Product.rating_average, True, 2, cursor)
+
+
+# count_products
+
+
+class TestCountProducts:
+
+    def test_count_skips_eager_loads(self):
+        q = build_q(count=7)
+        assert count_products(q) == 7
+        q.enable_eagerloads.assert_called_once_with(False)
+        q.with_entities.assert_called_once_with(Product.id)
+        q.order_by.assert_called_once_with(None)
+
+    def test_cached_count_uses_products_tag(self):
+        q = build_q(count=7)
+        with patch("app.services.products.pagination.cache") as cache:
+            cache.get_or_load.side_effect = lambda key, loader, **kw: loader()
+            assert count_products(q, "brand", {"brand_id": "b1"}) == 7
+        key = cache.get_or_load.call_args[0][0]
+        assert key.startswith("products:count:brand:")
+        assert cache.get_or_load.call_args[1]["tags"] == ["products"]
+
+
+# Service cursor mode
+
+
+class TestCursorListing:
+
+    def test_get_all_products_cursor_mode_skips_count(self, mock_db, mock_product):
+        q = build_q(all_result=[mock_product])
+        mock_db.query.return_value = q
+        with patch("app.services.products.product_service.format_product_list_item",
+                   return_value=MOCK_ITEM):
+            result = ProductService.get_all_products(
+                mock_db, {}, limit=20, cursor_mode=True)
+
+        q.count.assert_not_called()
+        assert result["meta"] == {"limit": 20, "next_cursor": None, "has_more": False}
+
+    def test_get_all_products_cursor_mode_with_total(self, mock_db, mock_product):
+        mock_db.query.return_value = build_q(all_result=[mock_product], count=42)
+        with patch("app.services.products.product_service.format_product_list_item",
+                   return_value=MOCK_ITEM):
+            result = ProductService.get_all_products(
+                mock_db, {}, limit=20, cursor_mode=True, include_total=True)
+        assert result["meta"]["total"] == 42
+
+    def test_page_mode_without_total(self, mock_db):
+        q = build_q()
+        mock_db.query.return_value = q
+        result = ProductService.get_all_products(mock_db, {}, 1, 20, include_total=False)
+
+        q.count.assert_not_called()
+        assert result["meta"] == {"page": 1, "limit": 20}
+
+    def test_invalid_cursor_returns_400(self, mock_db):
+        mock_db.query.return_value = build_q()
+        with pytest.raises(HTTPException) as exc:
+            ProductService.get_all_products(mock_db, {}, cursor="garbage!")
+        assert exc.value.status_code == 400
+
+    def test_new_arrivals_cursor_mode(self, mock_db, mock_product):
+        q = build_q(all_result=[mock_product, mock_product])
+        mock_db.query.return_value = q
+        with patch("app.services.products.product_discovery_service.format_product_list_item",
+                   return_value=MOCK_ITEM):
+            result = ProductDiscoveryService.get_new_arrivals(
+                mock_db, limit=1, cursor_mode=True)
+
+        q.offset.assert_not_called()
+        assert result["meta"]["has_more"] is True
+        assert decode_cursor(result["meta"]["next_cursor"])["id"] == mock_product.id
+
+    def test_by_brand_cursor_continues_after_cursor(self, mock_db, mock_brand, mock_product):
+        calls = [0]
+        product_q = build_q(all_result=[mock_product])
+
+        def side_effect(*args, **kwargs):
+            calls[0] += 1
+            if calls[0] == 1:
+                q = build_q()
+                q.first.return_value = mock_brand
+                return q
+            return product_q
+        mock_db.query.side_effect = side_effect
+
+        cursor = encode_cursor({"v": "4.5", "id": "p0"})
+        with patch("app.services.products.product_discovery_service.format_product_list_item",
+                   return_value=MOCK_ITEM):
+            result = ProductDiscoveryService.get_by_brand(
+                mock_db, "the-ordinary", limit=20, cursor=cursor)
+
+        assert result["meta"]["next_cursor"] is None
+        assert "total" not in result["meta"]
+        product_q.offset.assert_not_called()
+        # deleted_at/brand filter + keyset filter
+        assert product_q.filter.call_count == 2
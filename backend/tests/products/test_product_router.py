@@ -120,6 +120,35 @@ class TestGetAllProductsEndpoint:
             assert call_args[0][2] == 2   # page
             assert call_args[0][3] == 10  # limit
 
+    def test_forwards_cursor_mode(self, public_client):
+        with patch("app.routes.products.ProductService.get_all_products",
+                   return_value=list_resp()) as svc:
+            public_client.get("/products?pagination=cursor&cursor=abc&include_total=true")
+            kwargs = svc.call_args[1]
+            assert kwargs["cursor_mode"] is True
+            assert kwargs["cursor"] == "abc"
+            assert kwargs["include_total"] is True
+            # Không lọt vào filters
+            assert "cursor" not in svc.call_args[0][1]
+
+    def test_response_keeps_schema_fields_only(self, public_client):
+        item = {
+            "id": make_id(), "name": "Test", "slug": "test", "sku": "SKU-001",
+            "short_description": None, "price": 200000, "sale_price": None,
+            "stock_quantity": 5, "is_available": True, "is_featured": False,
+            "rating_average": 4.5, "review_count": 1, "views_count": 2,
+            "brand": {"id": make_id(), "name": "Brand", "slug": "brand"},
+            "category": {"id": make_id(), "name": "Cat", "slug": "cat"},
+            "product_image": None, "tags": [],
+            "skin_types": ["oily"], "created_at": "2024-01-01T00:00:00",
+        }
+        with patch("app.routes.products.ProductService.get_all_products",
+                   return_value={**list_resp(), "data": [item]}):
+            res = public_client.get("/products")
+        data = res.json()["data"][0]
+        assert data["price"] == 200000.0
+        assert "skin_types" not in data and "created_at" not in data
+
 # GET /products/stats  (Admin)
 
 
@@ -215,6 +244,13 @@ class TestDiscoveryEndpoints:
             res = public_client.get("/products/by-brand/the-ordinary")
         assert res.status_code == 200
 
+    def test_by_brand_forwards_cursor(self, public_client):
+        with patch("app.routes.products.ProductDiscoveryService.get_by_brand",
+                   return_value=list_resp()) as svc:
+            public_client.get("/products/by-brand/the-ordinary?pagination=cursor")
+            assert svc.call_args[1]["cursor_mode"] is True
+            assert svc.call_args[1]["include_total"] is None
+
     def test_by_brand_not_found_returns_404(self, public_client):
         with patch("app.routes.products.ProductDiscoveryService.get_by_brand",
                    side_effect=not_found_exc()):
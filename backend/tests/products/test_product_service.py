@@ -1,8 +1,9 @@
 import pytest
 from decimal import Decimal
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi import HTTPException
 from app.services.products import ProductService
+from app.utils.cursor import encode_cursor, decode_cursor
 from app.schemas.products import (
     ProductCreateRequest, ProductUpdateRequest,
     AddTagsRequest, UpdateStockRequest
@@ -18,7 +19,7 @@ MOCK_DETAIL = {"id": "x", "name": "Test",
 def build_q(first=None, all_result=None, scalar=0, count=0):
     q = MagicMock()
     for a in ("filter", "options", "join", "order_by", "offset", "limit",
-              "update", "ilike", "expire"):
+              "update", "ilike", "expire", "enable_eagerloads", "with_entities"):
         getattr(q, a).return_value = q
     q.first.return_value = first
     q.all.return_value = all_result or []
@@ -31,7 +32,8 @@ def build_q(first=None, all_result=None, scalar=0, count=0):
 
 class TestSearchProductsWithEs:
 
-    def test_successful_search_returns_list(self):
+    @pytest.mark.asyncio
+    async def test_successful_search_returns_list(self):
         """ES trả về kết quả → format và trả về list."""
         mock_response = {
             "hits": {
@@ -39,21 +41,98 @@ class TestSearchProductsWithEs:
                 "hits": [{"_source": {"id": "p1", "name": "Product"}}]
             }
         }
-        with patch("app.services.products.product_service.search_products_query",
-                   return_value=mock_response):
-            result = ProductService.search_products_with_es(
+        with patch("app.services.products.product_service.async_search_products_query",
+                   new=AsyncMock(return_value=mock_response)):
+            result = await ProductService.search_products_with_es(
                 keyword="kem", min_price=None, max_price=None,
                 limit=20, page=1
             )
         assert result["success"] is True
         assert result["meta"]["total"] == 1
 
-    def test_es_exception_raises_http_400(self):
+    @pytest.mark.asyncio
+    async def test_facets_block_returned_when_requested(self):
+        """include_facets=True → parse aggregations thành block facets."""
+        mock_response = {
+            "hits": {"total": {"value": 0}, "hits": []},
+            "aggregations": {
+                "brand": {"values": {"buckets": [{"key": "cerave", "doc_count": 3}]}},
+                "price": {"values": {"buckets": [{"key": 100000.0, "doc_count": 2}]}}
+            }
+        }
+        with patch("app.services.products.product_service.async_search_products_query",
+                   new=AsyncMock(return_value=mock_response)) as mock_search:
+            result = await ProductService.search_products_with_es(
+                keyword=None, min_price=None, max_price=None,
+                limit=20, page=1, include_facets=True, price_interval=50000
+            )
+        assert mock_search.call_args.kwargs["include_facets"] is True
+        assert result["facets"]["brand"] == [{"value": "cerave", "count": 3}]
+        assert result["facets"]["price"] == [
+            {"from": 100000.0, "to": 150000.0, "count": 2}]
+        assert result["facets"]["tags"] == []
+
+    @pytest.mark.asyncio
+    async def test_cursor_mode_returns_next_cursor(self):
+        """Trang đầy đủ → next_cursor chứa sort values của hit cuối."""
+        mock_response = {
+            "hits": {
+                "total": {"value": 5},
+                "hits": [
+                    {"_source": {"id": "p1"}, "sort": [1.0, "p1"]},
+                    {"_source": {"id": "p2"}, "sort": [0.5, "p2"]}
+                ]
+            }
+        }
+        with patch("app.services.products.product_service.async_search_products_query",
+                   new=AsyncMock(return_value=mock_response)) as mock_search:
+            result = await ProductService.search_products_with_es(
+                keyword="kem", min_price=None, max_price=None,
+                limit=2, page=1, cursor_mode=True
+            )
+        assert mock_search.call_args.kwargs["cursor_mode"] is True
+        assert result["meta"]["has_more"] is True
+        assert result["meta"]["total"] == 5
+        assert decode_cursor(result["meta"]["next_cursor"]) == {"after": [0.5, "p2"]}
+
+    @pytest.mark.asyncio
+    async def test_last_cursor_page_closes_pit(self):
+        """Trang cuối → next_cursor None và đóng PIT."""
+        cursor = encode_cursor({"after": [0.5, "p2"], "pit": "pit-1"})
+        mock_response = {
+            "pit_id": "pit-2",
+            "hits": {"hits": [{"_source": {"id": "p3"}, "sort": [0.1, "p3"]}]}
+        }
+        with patch("app.services.products.product_service.async_search_products_query",
+                   new=AsyncMock(return_value=mock_response)) as mock_search, \
+                patch("app.services.products.product_service.close_search_pit",
+                      new=AsyncMock()) as mock_close:
+            result = await ProductService.search_products_with_es(
+                keyword="kem", min_price=None, max_price=None,
+                limit=2, page=1, cursor=cursor
+            )
+        assert mock_search.call_args.kwargs["search_after"] == [0.5, "p2"]
+        assert mock_search.call_args.kwargs["pit_id"] == "pit-1"
+        mock_close.assert_awaited_once_with("pit-2")
+        assert result["meta"]["next_cursor"] is None
+        assert "total" not in result["meta"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_raises_http_400(self):
+        with pytest.raises(HTTPException) as exc:
+            await ProductService.search_products_with_es(
+                keyword="kem", min_price=None, max_price=None,
+                limit=2, page=1, cursor="not-a-cursor"
+            )
+        assert exc.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_es_exception_raises_http_400(self):
         """ES raise exception → ResponseHandler.error_response → HTTPException 400."""
-        with patch("app.services.products.product_service.search_products_query",
-                   side_effect=Exception("ES down")):
+        with patch("app.services.products.product_service.async_search_products_query",
+                   new=AsyncMock(side_effect=Exception("ES down"))):
             with pytest.raises(HTTPException) as exc:
-                ProductService.search_products_with_es(
+                await ProductService.search_products_with_es(
                     keyword="test", min_price=None, max_price=None,
                     limit=20, page=1
                 )
@@ -567,6 +646,25 @@ class TestUpdateStock:
                 mock_db, product_id, UpdateStockRequest(quantity=10), mock_admin_user.id)
         assert exc.value.status_code == 404
 
+
+@pytest.mark.parametrize("call", [
+    lambda db, pid, uid: ProductService.toggle_availability(db, pid, uid),
+    lambda db, pid, uid: ProductService.toggle_featured(db, pid, uid),
+    lambda db, pid, uid: ProductService.update_stock(
+        db, pid, UpdateStockRequest(quantity=3), uid),
+], ids=["toggle_availability", "toggle_featured", "update_stock"])
+def test_mutation_invalidates_product_caches(
+    call, mock_db, mock_product, product_id, mock_admin_user
+):
+    """Đổi availability / featured / stock → xoá cache tag products (count, category tree)."""
+    mock_db.query.return_value = build_q(first=mock_product)
+    mock_db.refresh.side_effect = lambda obj: None
+
+    with patch("app.services.products.product_service.invalidate") as inv:
+        call(mock_db, product_id, mock_admin_user.id)
+
+    inv.assert_called_once_with("products")
+
 # get_product_stats
 
 
@@ -92,12 +92,12 @@ def mock_current_user(mock_admin_user):
 #  TestClient
 
 @pytest.fixture
-def client(mock_current_user):
+def client(mock_current_user, as_principal):
     """Tất cả endpoints đều PROTECTED → dùng fixture này."""
     app = FastAPI()
     app.include_router(router)
-    app.dependency_overrides[get_current_user] = lambda: mock_current_user
-    app.dependency_overrides[get_current_active_user] = lambda: mock_current_user
+    app.dependency_overrides[get_current_user] = lambda: as_principal(mock_current_user)
+    app.dependency_overrides[get_current_active_user] = lambda: as_principal(mock_current_user)
     app.dependency_overrides[get_db] = lambda: MagicMock()
     return TestClient(app)
 